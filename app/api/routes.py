@@ -1,13 +1,28 @@
-from fastapi import APIRouter, HTTPException, Form, Depends
+from fastapi import APIRouter, HTTPException, Form, Depends, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 import logging
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, HttpUrl
 from app.core.web_analyzer import WebAnalyzer
-from app.core.test_generator import TestCaseGenerator
+from app.core.test_generator import TestCaseGenerator, page_indexes
 from app.core.code_generator import CodeGenerator
+from app.core.graph_index import graph_indexes
+from app.core.graph_clustering import site_maps
+from app.core.graph_data import graph_artifacts, webgl_graph_artifacts
+from app.core.exploration_diff import exploration_snapshots, diff_snapshots
+from app.core.crawl_events import crawl_events
+from app.core.explorations import is_valid_exploration_id, is_generated_exploration_id, new_exploration_id, structure_path, compact_structure_path, exploration_dir, delete_exploration_files
+from app.core.structure_cache import structures
+from app.core.async_storage import get_async_storage, StorageUnavailableError
+from app.core.storage import InvalidCursorError
+from app.core.search_index import get_search_index, SEARCH_KINDS
+from app.core.persistence_queue import get_persistence_queue
+from app.utils.http_cache import bytes_response, file_response
 import json
 import os
 import time
+import asyncio
 
 # Set up logger
 logger = logging.getLogger("web-analysis-framework.api")
@@ -16,10 +31,12 @@ router = APIRouter()
 
 class UrlInput(BaseModel):
     url: HttpUrl
+    exploration_id: Optional[str] = None  # Chosen by the client to follow /crawl-events/{exploration_id}
 
 class NodeInput(BaseModel):
     url: HttpUrl
     node_url: Optional[str] = None
+    exploration_id: Optional[str] = None  # Reuse a saved analysis instead of crawling again
 
 class TestCase(BaseModel):
     id: int
@@ -32,61 +49,214 @@ class GeneratedCode(BaseModel):
     test_case_id: int
     code: str
 
+# Analyses running now, so no second analysis can start under the same exploration ID
+_active_analyses = set()
+
+# Seconds /analyze waits for the database to say whether a client-chosen ID is taken
+EXISTS_CHECK_TIMEOUT = 2.0
+
+async def _exploration_exists(exploration_id: str) -> bool:
+    """Whether an exploration ID is taken by saved files, a queued result or a saved exploration"""
+    if os.path.isdir(exploration_dir(exploration_id)) or get_persistence_queue().status(exploration_id):
+        return True
+    # Every analysis writes its files, so an ID in the generated format without them
+    # is new and the database is not asked before every crawl
+    if is_generated_exploration_id(exploration_id):
+        return False
+    try:
+        saved = await asyncio.wait_for(get_async_storage().get_exploration(exploration_id, False, False),
+                                       EXISTS_CHECK_TIMEOUT)
+        return saved is not None
+    except (StorageUnavailableError, asyncio.TimeoutError) as e:
+        # The files are the copy every read goes through, so they decide while storage is down
+        logger.warning(f"Could not check for a saved exploration {exploration_id}: {str(e) or 'timed out'}")
+        return False
+
+async def _structure_file(exploration_id: str) -> str:
+    """Get the website structure file of an exploration, rejecting malformed IDs
+
+    Analysis results are written behind the response, so a read that arrives
+    before the files of its exploration are written waits for them first.
+    """
+    if not is_valid_exploration_id(exploration_id):
+        raise HTTPException(status_code=400, detail=f"Invalid exploration ID: {exploration_id}")
+    persistence_queue = get_persistence_queue()
+    if persistence_queue.files_pending(exploration_id):
+        await run_in_threadpool(persistence_queue.wait_for_files, exploration_id, persistence_queue.files_wait)
+    return structure_path(exploration_id)
+
+async def _load_structure(exploration_id: str) -> Dict[str, Any]:
+    """Load the website structure saved by an exploration, shared with other requests so read-only"""
+    structure = await run_in_threadpool(structures.get, await _structure_file(exploration_id))
+    if structure is None:
+        raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found. Please analyze a website first.")
+    return structure
+
+def _crawl_event_publisher(stream_id: str, held: List[Dict[str, Any]]):
+    """Build the analyzer callback that forwards crawl events to a stream
+
+    The final "done" event is appended to held instead: viewers reload the
+    exploration on it, so the route sends it once the result is queued.
+    """
+    def publish(event):
+        if event["type"] == "done":
+            held.append(event)
+        else:
+            crawl_events.publish(stream_id, event)
+    return publish
+
 @router.post("/analyze")
 async def analyze_website(url_input: UrlInput):
     logger.info(f"API request: Analyze website {url_input.url}")
+    exploration_id = url_input.exploration_id or new_exploration_id()
+    if not is_valid_exploration_id(exploration_id):
+        raise HTTPException(status_code=400, detail=f"Invalid exploration ID: {exploration_id}")
+    if exploration_id in _active_analyses:
+        raise HTTPException(status_code=409, detail=f"Exploration {exploration_id} is already being analyzed")
+    _active_analyses.add(exploration_id)
+    held_events = []
+    streaming = False
     try:
-        analyzer = WebAnalyzer(str(url_input.url))
-        result = analyzer.analyze()
+        # A client-chosen ID must not overwrite an earlier exploration
+        if url_input.exploration_id and await _exploration_exists(exploration_id):
+            raise HTTPException(status_code=409, detail=f"Exploration {exploration_id} already exists")
+        analyzer = WebAnalyzer(str(url_input.url), event_callback=_crawl_event_publisher(exploration_id, held_events),
+                               exploration_id=exploration_id, persist_structure=False)
+        streaming = True
+        # Crawl in a worker thread so the event loop keeps serving the live graph stream
+        result = await run_in_threadpool(analyzer.analyze)
         logger.info(f"Analysis completed successfully for {url_input.url}")
+        # Answer now, the files and the database copy are written in the background
+        result["persistence"] = get_persistence_queue().submit(exploration_id, analyzer.structure)
+        # Reads of the exploration wait for its queued files from here on
+        crawl_events.close(exploration_id, held_events[-1])
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analysis failed for {url_input.url}: {str(e)}", exc_info=True)
+        if streaming:
+            crawl_events.close(exploration_id, {"type": "done", "status": "failed", "error": str(e)})
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    finally:
+        _active_analyses.discard(exploration_id)
+
+@router.get("/crawl-events/{exploration_id}")
+async def stream_crawl_events(exploration_id: str, request: Request):
+    """Stream the pages found by a running analysis as server-sent events
+
+    Each "node" event carries a page and its parent, so the viewer can add the
+    node and its incoming edge. The stream ends with a "done" event. Events sent
+    before the client connected are replayed first.
+    """
+    logger.info(f"API request: Stream crawl events {exploration_id}")
+
+    async def event_source():
+        async for event in crawl_events.subscribe(exploration_id, heartbeat=15):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                # Keep proxies from closing an idle connection while a slow page loads
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/persistence/{exploration_id}")
+async def get_persistence_status(exploration_id: str):
+    """Get how far the results of an analysis have been persisted
+
+    state is "pending" or "retrying" while queued, then "durable" once the
+    structure files and the database copy are written, or "failed" after the
+    last retry. files and storage give the state of each step.
+    """
+    logger.info(f"API request: Get persistence status of {exploration_id}")
+    if not is_valid_exploration_id(exploration_id):
+        raise HTTPException(status_code=400, detail=f"Invalid exploration ID: {exploration_id}")
+    status = get_persistence_queue().status(exploration_id)
+    if status is not None:
+        return status
+    # Not queued since startup: durable if its files were written before
+    if os.path.exists(structure_path(exploration_id)):
+        return {"exploration_id": exploration_id, "state": "durable", "files": "done", "storage": "unknown"}
+    raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found")
 
 @router.get("/website-structure")
-async def get_website_structure():
-    """Get the stored website structure"""
-    logger.info("API request: Get website structure")
+async def get_website_structure(request: Request, exploration_id: str, format: str = "json"):
+    """Get the website structure stored by an exploration
+
+    The stored file is streamed as is, or its precompressed .gz copy when the
+    client accepts gzip, so nothing is parsed or serialized. An unchanged
+    structure is answered with a 304. format=compact returns the compact
+    structure file instead, which is already compressed.
+    """
+    logger.info(f"API request: Get website structure of {exploration_id} ({format})")
+    if format not in ("json", "compact"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'compact'")
     try:
-        structure_file = "app/static/website_structure.json"
+        structure_file = await _structure_file(exploration_id)
+        if format == "compact":
+            structure_file = compact_structure_path(exploration_id)
         if not os.path.exists(structure_file):
-            raise HTTPException(status_code=404, detail="No website structure available. Please analyze a website first.")
-            
-        with open(structure_file, 'r', encoding='utf-8') as f:
-            structure = json.load(f)
-            
-        return structure
+            raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found. Please analyze a website first.")
+        media_type = "application/octet-stream" if format == "compact" else "application/json"
+        return file_response(request, structure_file, media_type)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving website structure: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving website structure: {str(e)}")
 
+@router.get("/graph-data")
+async def get_graph_data(request: Request, exploration_id: str, view: str = "vis"):
+    """Get the nodes, edges and options rendered by the graph viewer
+
+    Built from the website structure on first request and kept in memory until
+    the structure changes, an unchanged graph is answered with a 304. The
+    "webgl" view holds every page in columnar arrays for the WebGL renderer.
+    """
+    logger.info(f"API request: Get graph data of {exploration_id} ({view} view)")
+    if view not in ("vis", "webgl"):
+        raise HTTPException(status_code=400, detail="view must be 'vis' or 'webgl'")
+    try:
+        registry = webgl_graph_artifacts if view == "webgl" else graph_artifacts
+        artifact = await run_in_threadpool(registry.get, await _structure_file(exploration_id))
+        if artifact is None:
+            raise HTTPException(status_code=404, detail="No graph available yet. Please analyze a website first.")
+        return bytes_response(request, artifact.body, artifact.etag, "application/json", gzip_body=artifact.gzip_body)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building graph data: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error building graph data: {str(e)}")
+
+async def _test_generator_for(node_input: NodeInput) -> TestCaseGenerator:
+    """Get a test case generator for the saved structure of the requested exploration,
+    or for a new analysis of the site if none is given"""
+    if node_input.exploration_id:
+        logger.info(f"Using website structure of exploration {node_input.exploration_id}")
+        structure = await _load_structure(node_input.exploration_id)
+        if structure.get("url") != str(node_input.url):
+            raise HTTPException(status_code=400, detail=f"Exploration {node_input.exploration_id} is not an analysis of {node_input.url}")
+        # The page index is built once per structure and shared by later requests
+        page_index = await run_in_threadpool(page_indexes.get, await _structure_file(node_input.exploration_id))
+        return TestCaseGenerator(structure, page_index)
+    logger.info("No exploration given, doing new analysis")
+    analyzer = WebAnalyzer(str(node_input.url), persist_structure=False)
+    # Only used to generate the tests of this request, so neither the files nor the database keep it
+    result = await run_in_threadpool(analyzer.analyze)
+    return TestCaseGenerator(result)
+
 @router.post("/generate-tests")
 async def generate_test_cases(node_input: NodeInput):
     logger.info(f"API request: Generate test cases for {node_input.url}")
     try:
-        # Check if we need to do a full analysis or can use existing data
-        website_structure_path = os.path.join("app", "static", "website_structure.json")
-        
-        if os.path.exists(website_structure_path):
-            logger.info(f"Using existing website structure from {website_structure_path}")
-            
-            # Load existing structure
-            with open(website_structure_path, "r", encoding="utf-8") as f:
-                analysis_result = json.load(f)
-                
-            # Check if this is for the same URL - if not, do a new analysis
-            if analysis_result.get("url") != str(node_input.url):
-                logger.info(f"Existing structure is for different URL, doing new analysis")
-                analyzer = WebAnalyzer(str(node_input.url))
-                analysis_result = analyzer.analyze()
-        else:
-            # No existing data, do a full analysis
-            logger.info(f"No existing structure found, doing new analysis")
-            analyzer = WebAnalyzer(str(node_input.url))
-            analysis_result = analyzer.analyze()
-        
-        test_generator = TestCaseGenerator(analysis_result)
+        test_generator = await _test_generator_for(node_input)
         
         # If node_url is provided, generate tests for that specific node
         if node_input.node_url:
@@ -98,6 +268,8 @@ async def generate_test_cases(node_input: NodeInput):
             
         logger.info(f"Generated {len(test_cases)} test cases")
         return test_cases
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Test case generation failed for {node_input.url}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Test case generation failed: {str(e)}")
@@ -106,9 +278,7 @@ async def generate_test_cases(node_input: NodeInput):
 async def generate_code(test_case_id: int, node_input: NodeInput):
     logger.info(f"API request: Generate code for test case {test_case_id} on {node_input.url}")
     try:
-        analyzer = WebAnalyzer(str(node_input.url))
-        analysis_result = analyzer.analyze()
-        test_generator = TestCaseGenerator(analysis_result)
+        test_generator = await _test_generator_for(node_input)
         
         # Generate test cases based on node if provided
         if node_input.node_url:
@@ -154,7 +324,7 @@ async def preview_page(url: str):
         raise HTTPException(status_code=500, detail=f"Error generating preview: {str(e)}")
 
 @router.get("/page-info/{encoded_url:path}")
-async def get_page_info(encoded_url: str):
+async def get_page_info(encoded_url: str, exploration_id: str):
     """Get detailed information about a specific page from website structure
     
     This endpoint returns metadata and analysis for a single page
@@ -169,30 +339,20 @@ async def get_page_info(encoded_url: str):
         decoded_url = base64.b64decode(encoded_url).decode('utf-8')
         url = urllib.parse.unquote(decoded_url)
         
-        # Load website structure
-        structure_file = "app/static/website_structure.json"
-        if not os.path.exists(structure_file):
-            raise HTTPException(status_code=404, detail="No website structure available")
-            
-        with open(structure_file, 'r', encoding='utf-8') as f:
-            structure = json.load(f)
+        # Load the graph index for the website structure
+        index = await run_in_threadpool(graph_indexes.get, await _structure_file(exploration_id))
+        if index is None:
+            raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found")
             
         # Find the page in the structure
-        if url not in structure["pages"]:
+        if url not in index:
             raise HTTPException(status_code=404, detail=f"Page {url} not found in website structure")
             
         # Return page info
-        page_info = structure["pages"][url]
+        page_info = index.pages[url]
         
         # Enhance with path information
-        paths = []
-        for page_url, info in structure["pages"].items():
-            if info.get("parent") == url:
-                paths.append({
-                    "url": page_url,
-                    "title": info.get("title", "Unknown"),
-                    "path": info.get("path", "/")
-                })
+        paths = [index.node_summary(child_url) for child_url in index.get_tree_children(url)]
         
         # Add child pages
         return {
@@ -207,6 +367,257 @@ async def get_page_info(encoded_url: str):
         logger.error(f"Error retrieving page info: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving page info: {str(e)}")
 
+async def _load_graph_index(exploration_id: str, url: str):
+    """Load the graph index of an exploration and check that url is one of its pages"""
+    index = await run_in_threadpool(graph_indexes.get, await _structure_file(exploration_id))
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found. Please analyze a website first.")
+    if url not in index:
+        raise HTTPException(status_code=404, detail=f"Page {url} not found in website structure")
+    return index
+
+@router.get("/graph/children")
+async def get_graph_children(exploration_id: str, url: str):
+    """Get the pages linked from a page"""
+    logger.info(f"API request: Get graph children of {url}")
+    try:
+        index = await _load_graph_index(exploration_id, url)
+        return {"url": url, "children": [index.node_summary(child) for child in index.get_children(url)]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving graph children: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving graph children: {str(e)}")
+
+@router.get("/graph/parents")
+async def get_graph_parents(exploration_id: str, url: str):
+    """Get the pages linking to a page, plus its crawl-tree ancestors"""
+    logger.info(f"API request: Get graph parents of {url}")
+    try:
+        index = await _load_graph_index(exploration_id, url)
+        return {
+            "url": url,
+            "parents": [index.node_summary(parent) for parent in index.get_parents(url)],
+            "ancestors": [index.node_summary(ancestor) for ancestor in index.get_ancestors(url)]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving graph parents: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving graph parents: {str(e)}")
+
+@router.get("/graph/neighborhood")
+async def get_graph_neighborhood(exploration_id: str, url: str, k: int = 1):
+    """Get every page within k hops of a page"""
+    logger.info(f"API request: Get {k}-hop neighborhood of {url}")
+    if k < 0 or k > 10:
+        raise HTTPException(status_code=400, detail="k must be between 0 and 10")
+    try:
+        index = await _load_graph_index(exploration_id, url)
+        return index.neighborhood(url, k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving graph neighborhood: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving graph neighborhood: {str(e)}")
+
+@router.get("/graph/path")
+async def get_graph_path(exploration_id: str, source: str, target: str):
+    """Get the shortest link path between two pages"""
+    logger.info(f"API request: Get shortest path from {source} to {target}")
+    try:
+        await _load_graph_index(exploration_id, source)
+        index = await _load_graph_index(exploration_id, target)
+        path = await run_in_threadpool(index.shortest_path, source, target)
+        if path is None:
+            raise HTTPException(status_code=404, detail=f"No path from {source} to {target}")
+        return {
+            "source": source,
+            "target": target,
+            "length": len(path) - 1,
+            "path": [index.node_summary(node) for node in path]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving graph path: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving graph path: {str(e)}")
+
+@router.get("/graph/cluster")
+async def expand_graph_cluster(exploration_id: str, id: str, limit: int = 50):
+    """Get the nodes that replace a site map cluster when it is expanded"""
+    logger.info(f"API request: Expand graph cluster {id}")
+    if limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    try:
+        site_map = await run_in_threadpool(site_maps.get, await _structure_file(exploration_id))
+        if site_map is None:
+            raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found. Please analyze a website first.")
+        expansion = site_map.expand(id, limit=limit)
+        if expansion is None:
+            raise HTTPException(status_code=404, detail=f"Cluster {id} not found")
+        return expansion
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error expanding graph cluster: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error expanding graph cluster: {str(e)}")
+
+@router.get("/diff")
+async def diff_explorations(base: str, target: str, limit: int = Query(1000, ge=0)):
+    """Compare two explorations of the same site
+
+    Lists the pages added, removed and changed in target relative to base,
+    the link edges added and removed and whether the site category changed.
+    Pages are compared by content hash and edges by interned URL IDs, both
+    cached per exploration, so repeated diffs cost only set operations.
+    """
+    logger.info(f"API request: Diff explorations {base} and {target}")
+    try:
+        snapshots = []
+        for exploration_id in (base, target):
+            snapshot = await run_in_threadpool(exploration_snapshots.get, await _structure_file(exploration_id))
+            if snapshot is None:
+                raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found. Please analyze a website first.")
+            snapshots.append(snapshot)
+        if snapshots[0].domain != snapshots[1].domain:
+            raise HTTPException(status_code=400, detail="Explorations are of different sites")
+        diff = await run_in_threadpool(diff_snapshots, snapshots[0], snapshots[1], limit)
+        return {"base": base, "target": target, **diff}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error comparing explorations: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error comparing explorations: {str(e)}")
+
+@router.get("/explorations")
+async def list_saved_explorations(limit: int = Query(20, ge=1, le=200), cursor: Optional[str] = None):
+    """List saved explorations without their data, most recent first
+
+    Pass the returned next_cursor to get the following page; it is null on the last page.
+    """
+    logger.info("API request: List saved explorations")
+    try:
+        page = await get_async_storage().list_explorations_page(limit, cursor)
+        return {"status": "success", "explorations": page["items"], "next_cursor": page["next_cursor"]}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing explorations: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error listing explorations: {str(e)}")
+
+@router.get("/explorations/{exploration_id}")
+async def get_saved_exploration(exploration_id: str, include_pages: bool = False, include_graph: bool = False):
+    """Get a saved exploration, by default only its header and summary"""
+    logger.info(f"API request: Get saved exploration {exploration_id}")
+    try:
+        exploration = await get_async_storage().get_exploration(exploration_id, include_pages, include_graph)
+        if exploration is None:
+            raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found")
+        return exploration
+    except HTTPException:
+        raise
+    except StorageUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error retrieving exploration: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving exploration: {str(e)}")
+
+@router.delete("/explorations/{exploration_id}")
+async def delete_saved_exploration(exploration_id: str):
+    """Delete a saved exploration with its test cases, generated code and structure files"""
+    logger.info(f"API request: Delete saved exploration {exploration_id}")
+    if not is_valid_exploration_id(exploration_id):
+        raise HTTPException(status_code=400, detail=f"Invalid exploration ID: {exploration_id}")
+    if exploration_id in _active_analyses or get_persistence_queue().files_pending(exploration_id):
+        raise HTTPException(status_code=409, detail=f"Exploration {exploration_id} is still being analyzed or saved")
+    try:
+        deleted = await get_async_storage().delete_exploration(exploration_id)
+        files_deleted = await run_in_threadpool(delete_exploration_files, exploration_id)
+        if not (deleted or files_deleted):
+            raise HTTPException(status_code=404, detail=f"Exploration {exploration_id} not found")
+        return {"status": "success", "exploration_id": exploration_id}
+    except HTTPException:
+        raise
+    except StorageUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error deleting exploration: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error deleting exploration: {str(e)}")
+
+@router.get("/explorations/{exploration_id}/test-cases")
+async def list_saved_test_cases(exploration_id: str, limit: int = Query(50, ge=1, le=500),
+                                cursor: Optional[str] = None):
+    """List the test cases of a saved exploration in creation order, paginated like /explorations"""
+    logger.info(f"API request: List test cases of {exploration_id}")
+    try:
+        page = await get_async_storage().list_test_cases_page(exploration_id, limit, cursor)
+        return {"status": "success", "test_cases": page["items"], "next_cursor": page["next_cursor"]}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing test cases: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error listing test cases: {str(e)}")
+
+@router.get("/explorations/{exploration_id}/generated-code")
+async def list_saved_generated_code(exploration_id: str, limit: int = Query(50, ge=1, le=500),
+                                    cursor: Optional[str] = None):
+    """List the code versions generated for a saved exploration without the code, newest first"""
+    logger.info(f"API request: List generated code of {exploration_id}")
+    try:
+        page = await get_async_storage().list_generated_code_page(exploration_id, limit, cursor)
+        return {"status": "success", "generated_code": page["items"], "next_cursor": page["next_cursor"]}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing generated code: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error listing generated code: {str(e)}")
+
+@router.get("/explorations/{exploration_id}/test-cases-with-code")
+async def get_saved_test_cases_with_code(exploration_id: str):
+    """Get the test cases of a saved exploration with their latest generated code"""
+    logger.info(f"API request: Get test cases with code of {exploration_id}")
+    try:
+        test_cases = await get_async_storage().get_test_cases_with_code(exploration_id)
+        return {"status": "success", "test_cases": test_cases}
+    except StorageUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error retrieving test cases with code: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error retrieving test cases with code: {str(e)}")
+
+@router.get("/search")
+async def search_saved_explorations(q: str = Query(..., min_length=1), kind: Optional[str] = None,
+                                    exploration_id: Optional[str] = None,
+                                    limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None):
+    """Search saved page titles, headers and text, test cases and generated code
+
+    Returns the results containing every word of q, best matches first, paginated
+    like /explorations. kind limits results to "page", "test_case" or "code".
+    """
+    logger.info(f"API request: Search {q!r}")
+    try:
+        if kind is not None and kind not in SEARCH_KINDS:
+            raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(SEARCH_KINDS)}")
+        search_index = await run_in_threadpool(get_search_index)
+        if search_index is None:
+            raise HTTPException(status_code=503, detail="Search is disabled")
+        page = await run_in_threadpool(search_index.search, q, kind, exploration_id, limit, cursor)
+        return {"status": "success", "results": page["items"], "next_cursor": page["next_cursor"]}
+    except HTTPException:
+        raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
+
 @router.post("/execute-test")
 async def execute_test_code(request: dict):
     """Execute generated test code using Selenium WebDriver
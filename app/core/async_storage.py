@@ -0,0 +1,145 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable
+from app.core.storage import StorageBackend, get_storage, load_storage_config
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.async-storage")
+
+class StorageUnavailableError(Exception):
+    """The storage backend could not be reached"""
+
+class StorageTimeoutError(StorageUnavailableError):
+    """A storage operation did not finish within the configured timeout"""
+
+class AsyncStorage:
+    """Awaitable version of the StorageBackend API for the async request handlers
+
+    The backends use blocking drivers, so every call runs on a dedicated
+    thread pool instead of the event loop; a slow database then only holds
+    up the requests waiting for it. The pool is separate from the one
+    run_in_threadpool uses, so queued database calls cannot starve crawls
+    and other offloaded work.
+    """
+
+    def __init__(self, backend_factory: Callable[[], StorageBackend] = get_storage,
+                 max_workers: int = 8, timeout: Optional[float] = 30.0):
+        """Create the adapter
+
+        Args:
+            backend_factory: Returns the backend, called on a worker thread so
+                that connecting never blocks the event loop
+            max_workers: Number of threads running storage calls concurrently
+            timeout: Seconds to wait for a call before raising StorageTimeoutError,
+                None to wait indefinitely
+        """
+        self.backend_factory = backend_factory
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+
+    async def _call(self, method: str, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._run, method, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._executor, call), self.timeout)
+        except asyncio.TimeoutError:
+            # The worker thread keeps running until the driver's own timeout ends it
+            logger.error(f"Storage call {method} timed out after {self.timeout}s")
+            raise StorageTimeoutError(f"Storage call {method} timed out after {self.timeout}s")
+
+    def _run(self, method: str, *args, **kwargs):
+        backend = self.backend_factory()
+        try:
+            return getattr(backend, method)(*args, **kwargs)
+        except backend.unavailable_errors as e:
+            raise StorageUnavailableError(f"Storage unavailable: {str(e)}") from e
+
+    async def save_exploration(self, url: str, data: Dict[str, Any], exploration_id: Optional[str] = None) -> str:
+        return await self._call("save_exploration", url, data, exploration_id)
+
+    async def get_exploration(self, exploration_id: str, include_pages: bool = True,
+                              include_graph: bool = True) -> Optional[Dict[str, Any]]:
+        return await self._call("get_exploration", exploration_id, include_pages, include_graph)
+
+    async def get_exploration_by_url(self, url: str, include_pages: bool = True,
+                                     include_graph: bool = True) -> Optional[Dict[str, Any]]:
+        return await self._call("get_exploration_by_url", url, include_pages, include_graph)
+
+    async def get_page(self, exploration_id: str, page_url: str) -> Optional[Dict[str, Any]]:
+        return await self._call("get_page", exploration_id, page_url)
+
+    async def get_pages(self, exploration_id: str, urls: Optional[List[str]] = None,
+                        skip: int = 0, limit: int = 0) -> Dict[str, Dict[str, Any]]:
+        return await self._call("get_pages", exploration_id, urls, skip, limit)
+
+    async def get_page_hashes(self, exploration_id: str) -> Dict[str, str]:
+        return await self._call("get_page_hashes", exploration_id)
+
+    async def get_graph(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+        return await self._call("get_graph", exploration_id)
+
+    async def list_explorations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        return await self._call("list_explorations", limit)
+
+    async def list_explorations_page(self, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self._call("list_explorations_page", limit, cursor)
+
+    async def list_test_cases_page(self, exploration_id: str, limit: int = 50,
+                                   cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self._call("list_test_cases_page", exploration_id, limit, cursor)
+
+    async def list_generated_code_page(self, exploration_id: str, limit: int = 50,
+                                       cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self._call("list_generated_code_page", exploration_id, limit, cursor)
+
+    async def delete_exploration(self, exploration_id: str) -> bool:
+        return await self._call("delete_exploration", exploration_id)
+
+    async def save_test_cases(self, exploration_id: str, test_cases: List[Dict[str, Any]]) -> List[str]:
+        return await self._call("save_test_cases", exploration_id, test_cases)
+
+    async def save_generated_code(self, exploration_id: str, test_case_id: int, code: str) -> str:
+        return await self._call("save_generated_code", exploration_id, test_case_id, code)
+
+    async def get_test_cases(self, exploration_id: str) -> List[Dict[str, Any]]:
+        return await self._call("get_test_cases", exploration_id)
+
+    async def get_generated_code(self, exploration_id: str, test_case_id: int) -> Optional[Dict[str, Any]]:
+        return await self._call("get_generated_code", exploration_id, test_case_id)
+
+    async def get_all_generated_code(self, exploration_id: str) -> List[Dict[str, Any]]:
+        return await self._call("get_all_generated_code", exploration_id)
+
+    async def get_test_cases_with_code(self, exploration_id: str) -> List[Dict[str, Any]]:
+        return await self._call("get_test_cases_with_code", exploration_id)
+
+    async def ping(self) -> bool:
+        """Readiness probe: True if the backend answers within the timeout"""
+        try:
+            return await self._call("ping")
+        except Exception as e:
+            logger.warning(f"Storage readiness check failed: {str(e)}")
+            return False
+
+    def shutdown(self):
+        """Stop the worker threads, waiting for running calls"""
+        self._executor.shutdown(wait=True)
+
+_async_storage = None
+_async_storage_lock = threading.Lock()
+
+def get_async_storage() -> AsyncStorage:
+    """Get the async adapter for the configured backend, sized by storage.worker_threads
+    and storage.operation_timeout in config.yaml"""
+    global _async_storage
+    with _async_storage_lock:
+        if _async_storage is None:
+            storage_config = load_storage_config()
+            _async_storage = AsyncStorage(
+                max_workers=storage_config.get("worker_threads", 8),
+                timeout=storage_config.get("operation_timeout", 30.0)
+            )
+        return _async_storage
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, AsyncIterator, Optional
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.crawl-events")
+
+class _Channel:
+    """Events of one crawl, replayed to every subscriber"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.subscribers = []
+        self.closed = False
+
+class CrawlEventBroker:
+    """Fans crawl progress out from the analysis thread to server-sent event streams
+
+    Publishing is thread-safe and never blocks the crawler. Each stream keeps
+    its history, so a viewer that connects late still sees the whole graph.
+    """
+
+    def __init__(self, max_finished: int = 20):
+        self.max_finished = max_finished
+        self._channels: Dict[str, _Channel] = {}
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, stream_id):
+        channel = self._channels.get(stream_id)
+        if channel is None:
+            channel = _Channel()
+            self._channels[stream_id] = channel
+        return channel
+
+    def publish(self, stream_id: str, event: Dict[str, Any]):
+        """Record an event and push it to the current subscribers"""
+        with self._lock:
+            channel = self._channel(stream_id)
+            if channel.closed:
+                return
+            channel.events.append(event)
+            subscribers = list(channel.subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def close(self, stream_id: str, event: Dict[str, Any]):
+        """Publish the final event of a stream and stop accepting new ones"""
+        self.publish(stream_id, event)
+        with self._lock:
+            channel = self._channels.pop(stream_id, None)
+            if channel is None:
+                return
+            channel.closed = True
+            # Keep a few finished streams around for viewers that connect after the crawl
+            self._finished[stream_id] = channel
+            while len(self._finished) > self.max_finished:
+                self._finished.popitem(last=False)
+
+    async def subscribe(self, stream_id: str, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield the stream's past events followed by live ones until it is closed
+
+        With a heartbeat interval, None is yielded whenever no event arrived
+        for that many seconds, so the caller can keep the connection alive.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        with self._lock:
+            channel = self._finished.get(stream_id) or self._channel(stream_id)
+            history = list(channel.events)
+            closed = channel.closed
+            if not closed:
+                channel.subscribers.append((loop, queue))
+
+        try:
+            for event in history:
+                yield event
+            if closed:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event.get("type") == "done":
+                    return
+        finally:
+            with self._lock:
+                if (loop, queue) in channel.subscribers:
+                    channel.subscribers.remove((loop, queue))
+                # Forget streams a viewer waited on but no crawl ever published to
+                if not channel.closed and not channel.subscribers and not channel.events:
+                    if self._channels.get(stream_id) is channel:
+                        del self._channels[stream_id]
+
+# Create a singleton instance
+crawl_events = CrawlEventBroker()
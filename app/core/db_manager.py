@@ -1,15 +1,55 @@
 import logging
 import os
+import threading
 import json
 import yaml
-from datetime import datetime
-from pymongo import MongoClient
+from datetime import datetime, timedelta
+from pymongo import MongoClient, IndexModel, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import ConnectionFailure
 from bson import ObjectId
 from typing import Dict, List, Optional, Any
+from app.core.storage import StorageBackend, InvalidCursorError, page_blob, page_content_hash, split_page_record, join_page_record, encode_cursor, decode_cursor, PAGE_FIELDS, GRAPH_FIELDS, split_exploration_data, join_exploration_data
 
 # Set up logger
 logger = logging.getLogger("web-analysis-framework.db-manager")
 
+# TTL index on generated_code.superseded_at, created from retention.superseded_code_ttl_days
+SUPERSEDED_CODE_TTL_INDEX = "superseded_at_ttl"
+
+# Compound indexes behind every query the manager runs, created at startup
+REQUIRED_INDEXES = {
+    "explorations": [
+        IndexModel([("url", ASCENDING), ("created_at", DESCENDING)], name="url_created_at"),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id")
+    ],
+    "exploration_pages": [
+        IndexModel([("exploration_id", ASCENDING), ("url", ASCENDING)], name="exploration_url", unique=True),
+        IndexModel([("exploration_id", ASCENDING), ("position", ASCENDING)], name="exploration_position")
+    ],
+    "exploration_graphs": [
+        IndexModel([("exploration_id", ASCENDING)], name="exploration", unique=True)
+    ],
+    "test_cases": [
+        IndexModel([("exploration_id", ASCENDING), ("id", ASCENDING)], name="exploration_test_case"),
+        IndexModel([("exploration_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                   name="exploration_created_at_id")
+    ],
+    "generated_code": [
+        IndexModel([("exploration_id", ASCENDING), ("test_case_id", ASCENDING), ("created_at", DESCENDING)],
+                   name="exploration_test_case_created_at"),
+        IndexModel([("exploration_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="exploration_created_at_id")
+    ]
+}
+
+def _document_key(document_id: str):
+    """The _id of a document from its string form
+    
+    Documents get an ObjectId unless they were saved under an ID of their
+    own, like explorations saved under the ID of their analysis.
+    """
+    return ObjectId(document_id) if ObjectId.is_valid(document_id) else document_id
+
 # JSON Encoder to handle ObjectId and dates
 class MongoJSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -19,58 +59,186 @@ class MongoJSONEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super(MongoJSONEncoder, self).default(obj)
 
-class DatabaseManager:
-    def __init__(self):
-        """Initialize MongoDB connection"""
+class DatabaseManager(StorageBackend):
+    unavailable_errors = (ConnectionFailure,)
+
+    def __init__(self, mongo_uri: Optional[str] = None, db_name: Optional[str] = None):
+        """Initialize MongoDB connection
+        
+        Args:
+            mongo_uri: Connection URI, defaults to mongodb.uri in config.yaml
+            db_name: Database name, defaults to mongodb.database in config.yaml
+        """
         # Load configuration from config.yaml
         try:
             with open("config.yaml", "r") as file:
                 config = yaml.safe_load(file)
                 
             # Get MongoDB connection settings from config
-            mongo_uri = config["mongodb"]["uri"]
-            db_name = config["mongodb"]["database"]
-            
-            # Establish connection
-            self.client = MongoClient(mongo_uri)
+            mongo_config = config["mongodb"]
+            retention_config = config.get("retention") or {}
+            self.superseded_code_ttl_days = retention_config.get("superseded_code_ttl_days", 0)
+            mongo_uri = mongo_uri or mongo_config["uri"]
+            db_name = db_name or mongo_config["database"]
+            
+            # Establish connection, with the pool sized and bounded by config.yaml
+            self.client = MongoClient(
+                mongo_uri,
+                maxPoolSize=mongo_config.get("max_pool_size", 100),
+                minPoolSize=mongo_config.get("min_pool_size", 0),
+                connectTimeoutMS=mongo_config.get("connect_timeout_ms", 20000),
+                serverSelectionTimeoutMS=mongo_config.get("server_selection_timeout_ms", 30000),
+                socketTimeoutMS=mongo_config.get("socket_timeout_ms")
+            )
             self.db = self.client[db_name]
             self.explorations = self.db["explorations"]
+            self.pages = self.db["exploration_pages"]
+            self.page_blobs = self.db["page_blobs"]
+            self.graphs = self.db["exploration_graphs"]
             self.test_cases = self.db["test_cases"]
             self.generated_code = self.db["generated_code"]
-            logger.info(f"Connected to MongoDB database: {db_name}")
+            # MongoClient connects in the background, so nothing here waits for the server
+            self.indexes_ready = False
+            self._index_lock = threading.Lock()
+            logger.info(f"Configured MongoDB database: {db_name}")
         except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {str(e)}", exc_info=True)
+            logger.error(f"Failed to configure MongoDB client: {str(e)}", exc_info=True)
             raise
     
-    def save_exploration(self, url: str, data: Dict[str, Any]) -> str:
+    def ping(self) -> bool:
+        """Check that the server answers, creating the indexes the first time it does
+        
+        Returns:
+            bool: True if the database is reachable
+        """
+        try:
+            self.client.admin.command("ping")
+        except Exception as e:
+            logger.warning(f"MongoDB is not reachable: {str(e)}")
+            return False
+        
+        if not self.indexes_ready:
+            with self._index_lock:
+                if not self.indexes_ready:
+                    self.indexes_ready = self.ensure_indexes()
+        return True
+    
+    def ensure_indexes(self) -> bool:
+        """Create the required indexes if missing and verify that they exist
+        
+        Returns:
+            bool: True if every required index is in place
+        """
+        try:
+            complete = True
+            for collection_name, indexes in REQUIRED_INDEXES.items():
+                collection = self.db[collection_name]
+                # create_indexes is a no-op for indexes that already exist with the same keys
+                collection.create_indexes(indexes)
+                existing = set(collection.index_information())
+                missing = [index.document["name"] for index in indexes if index.document["name"] not in existing]
+                if missing:
+                    complete = False
+                    logger.warning(f"Missing indexes on {collection_name}: {', '.join(missing)}")
+            if not self._ensure_superseded_code_ttl():
+                complete = False
+            if complete:
+                logger.info("Verified MongoDB indexes")
+            return complete
+        except Exception as e:
+            # Queries still work without the indexes, only slower
+            logger.error(f"Error creating MongoDB indexes: {str(e)}", exc_info=True)
+            return False
+    
+    def _ensure_superseded_code_ttl(self) -> bool:
+        """Keep the TTL index that expires replaced code versions in line with
+        retention.superseded_code_ttl_days, dropping it when that is 0"""
+        try:
+            existing = self.generated_code.index_information().get(SUPERSEDED_CODE_TTL_INDEX)
+            ttl_seconds = int(self.superseded_code_ttl_days * 86400)
+            if not ttl_seconds:
+                if existing:
+                    self.generated_code.drop_index(SUPERSEDED_CODE_TTL_INDEX)
+                return True
+            if existing is None:
+                # Only superseded versions have superseded_at, so current code never expires
+                self.generated_code.create_index([("superseded_at", ASCENDING)], name=SUPERSEDED_CODE_TTL_INDEX,
+                                                 expireAfterSeconds=ttl_seconds)
+            elif existing.get("expireAfterSeconds") != ttl_seconds:
+                self.db.command("collMod", self.generated_code.name,
+                                index={"name": SUPERSEDED_CODE_TTL_INDEX, "expireAfterSeconds": ttl_seconds})
+            return True
+        except Exception as e:
+            logger.error(f"Error updating the generated code TTL index: {str(e)}", exc_info=True)
+            return False
+    
+    def save_exploration(self, url: str, data: Dict[str, Any], exploration_id: Optional[str] = None) -> str:
         """Save website exploration data to MongoDB
         
+        The exploration is stored as a header document, one document per page
+        in exploration_pages and a graph document in exploration_graphs, so no
+        single document grows with the size of the site. Page documents keep
+        the position of the page in the crawl and reference its content by
+        hash; each distinct page content is stored once in page_blobs with the
+        IDs of the explorations referencing it.
+        
+        Every write is an upsert or a replacement keyed on the exploration ID,
+        so saving again under the same ID, e.g. retrying a save that failed
+        halfway, replaces the earlier attempt instead of duplicating it.
+        
         Args:
             url: The URL of the explored website
             data: The exploration data (structure, pages, etc.)
+            exploration_id: ID to save the exploration under, a new one if None
             
         Returns:
             str: The ID of the saved exploration
         """
         try:
-            # Add metadata
-            exploration = {
-                "url": url,
-                "domain": data.get("domain", ""),
-                "name": data.get("domain", url),
-                "created_at": datetime.now(),
-                "data": data,
-                "summary": {
-                    "page_count": len(data.get("pages", {})),
-                    "has_test_cases": False,
-                    "has_generated_code": False,
-                    "test_case_count": 0
-                }
-            }
+            header, pages_field, pages, graph = split_exploration_data(data)
+            exploration_id = exploration_id or str(ObjectId())
+            
+            # Add metadata; what a later save must not reset is only set on insert
+            self.explorations.update_one(
+                {"_id": _document_key(exploration_id)},
+                {
+                    "$set": {
+                        "url": url,
+                        "domain": data.get("domain", ""),
+                        "name": data.get("domain", url),
+                        "data": header,
+                        "pages_field": pages_field,
+                        "summary.page_count": len(pages)
+                    },
+                    "$setOnInsert": {
+                        "created_at": datetime.now(),
+                        "summary.has_test_cases": False,
+                        "summary.has_generated_code": False,
+                        "summary.test_case_count": 0
+                    }
+                },
+                upsert=True
+            )
             
-            # Insert into database
-            result = self.explorations.insert_one(exploration)
-            exploration_id = str(result.inserted_id)
+            # Pages left by an earlier attempt are replaced, the content they alone referenced released
+            previous = self._page_hashes(exploration_id)
+            split = {page_url: split_page_record(page) for page_url, page in pages.items()}
+            contents = {page_url: content for page_url, (content, _) in split.items()}
+            hashes = {page_url: page_blob(content)[0] for page_url, content in contents.items()}
+            # Content first, so page documents never point to content that is not stored
+            self._add_page_blob_refs(exploration_id, contents, hashes)
+            self.pages.delete_many({"exploration_id": exploration_id})
+            if pages:
+                self.pages.insert_many([
+                    {"exploration_id": exploration_id, "url": page_url, "position": position,
+                     "content_hash": hashes[page_url], "placement": split[page_url][1]}
+                    for position, page_url in enumerate(pages)
+                ])
+            self._release_page_blob_refs(exploration_id, list(set(previous) - set(hashes.values())))
+            self.graphs.replace_one({"exploration_id": exploration_id},
+                                    {"exploration_id": exploration_id, **graph}, upsert=True)
+            if pages:
+                self._update_search_index("index_pages", exploration_id, pages, hashes)
             
             logger.info(f"Saved exploration for {url} with ID: {exploration_id}")
             return exploration_id
@@ -78,22 +246,77 @@ class DatabaseManager:
             logger.error(f"Error saving exploration for {url}: {str(e)}", exc_info=True)
             raise
     
-    def get_exploration(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+    def _page_hashes(self, exploration_id: str) -> List[str]:
+        """Content hashes referenced by the page documents of an exploration"""
+        return [page["content_hash"] for page in self.pages.find(
+            {"exploration_id": exploration_id}, projection={"_id": 0, "content_hash": 1}
+        )]
+    
+    def _add_page_blob_refs(self, exploration_id: str, pages: Dict[str, Any], hashes: Dict[str, str]):
+        """Store the page contents not stored yet and record that the exploration references them
+        
+        Adding the exploration to a set rather than counting references makes
+        this safe to repeat.
+        """
+        records = {hashes[page_url]: page for page_url, page in pages.items()}
+        if not records:
+            return
+        self.page_blobs.bulk_write([
+            UpdateOne({"_id": content_hash}, {"$setOnInsert": {"data": record},
+                                              "$addToSet": {"explorations": exploration_id}}, upsert=True)
+            for content_hash, record in records.items()
+        ], ordered=False)
+    
+    def _release_page_blob_refs(self, exploration_id: str, hashes: List[str]):
+        """Drop the references of an exploration to page contents, deleting the contents nobody references"""
+        hashes = list(set(hashes))
+        if not hashes:
+            return
+        self.page_blobs.update_many({"_id": {"$in": hashes}}, {"$pull": {"explorations": exploration_id}})
+        self.page_blobs.delete_many({"_id": {"$in": hashes}, "explorations": {"$size": 0}})
+    
+    def _assemble_exploration(self, exploration: Dict[str, Any], include_pages: bool,
+                              include_graph: bool) -> Dict[str, Any]:
+        """Attach the requested page and graph documents to an exploration header"""
+        exploration_id = str(exploration["_id"])
+        exploration["_id"] = exploration_id
+        
+        if "pages_field" not in exploration:
+            # Stored before explorations were split, everything is embedded in data
+            data = exploration.get("data", {})
+            if not include_pages:
+                for field in PAGE_FIELDS:
+                    if isinstance(data.get(field), dict):
+                        data.pop(field)
+            if not include_graph:
+                for field in GRAPH_FIELDS:
+                    data.pop(field, None)
+            return exploration
+        
+        pages_field = exploration.pop("pages_field")
+        pages = self.get_pages(exploration_id) if include_pages else None
+        graph = self.get_graph(exploration_id) if include_graph else None
+        exploration["data"] = join_exploration_data(exploration.get("data", {}), pages_field, pages, graph)
+        return exploration
+    
+    def get_exploration(self, exploration_id: str, include_pages: bool = True,
+                        include_graph: bool = True) -> Optional[Dict[str, Any]]:
         """Get exploration by ID
         
         Args:
             exploration_id: The ID of the exploration to retrieve
+            include_pages: Load the page records, which is most of the data of a large site
+            include_graph: Load the hierarchy, paths and layout
             
         Returns:
             Optional[Dict[str, Any]]: The exploration data or None if not found
         """
         try:
             # Find exploration by ID
-            exploration = self.explorations.find_one({"_id": ObjectId(exploration_id)})
+            exploration = self.explorations.find_one({"_id": _document_key(exploration_id)})
             
             if exploration:
-                # Convert ObjectId to string for serialization
-                exploration["_id"] = str(exploration["_id"])
+                exploration = self._assemble_exploration(exploration, include_pages, include_graph)
                 logger.info(f"Retrieved exploration with ID: {exploration_id}")
                 return exploration
             
@@ -103,11 +326,14 @@ class DatabaseManager:
             logger.error(f"Error retrieving exploration {exploration_id}: {str(e)}", exc_info=True)
             raise
     
-    def get_exploration_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+    def get_exploration_by_url(self, url: str, include_pages: bool = True,
+                               include_graph: bool = True) -> Optional[Dict[str, Any]]:
         """Get the most recent exploration for a URL
         
         Args:
             url: The URL to look for
+            include_pages: Load the page records
+            include_graph: Load the hierarchy, paths and layout
             
         Returns:
             Optional[Dict[str, Any]]: The exploration data or None if not found
@@ -120,8 +346,7 @@ class DatabaseManager:
             )
             
             if exploration:
-                # Convert ObjectId to string for serialization
-                exploration["_id"] = str(exploration["_id"])
+                exploration = self._assemble_exploration(exploration, include_pages, include_graph)
                 logger.info(f"Retrieved most recent exploration for URL: {url}")
                 return exploration
             
@@ -131,6 +356,121 @@ class DatabaseManager:
             logger.error(f"Error retrieving exploration for URL {url}: {str(e)}", exc_info=True)
             raise
     
+    def get_page(self, exploration_id: str, page_url: str) -> Optional[Dict[str, Any]]:
+        """Get the record of a single page of an exploration
+        
+        Args:
+            exploration_id: The ID of the exploration
+            page_url: The URL of the page
+            
+        Returns:
+            Optional[Dict[str, Any]]: The page record or None if not found
+        """
+        return self.get_pages(exploration_id, urls=[page_url]).get(page_url)
+    
+    def get_pages(self, exploration_id: str, urls: Optional[List[str]] = None,
+                  skip: int = 0, limit: int = 0) -> Dict[str, Dict[str, Any]]:
+        """Get page records of an exploration in crawl order
+        
+        Args:
+            exploration_id: The ID of the exploration
+            urls: Only return these pages, all pages if None
+            skip: Number of pages to skip, for loading pages in batches
+            limit: Maximum number of pages to return, 0 for no limit
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Page records keyed by URL
+        """
+        try:
+            query = {"exploration_id": exploration_id}
+            if urls is not None:
+                query["url"] = {"$in": list(urls)}
+            cursor = self.pages.find(
+                query,
+                projection={"_id": 0, "url": 1, "content_hash": 1, "placement": 1},
+                sort=[("position", 1)],
+                skip=skip,
+                limit=limit
+            )
+            page_docs = list(cursor)
+            
+            hashes = list({page["content_hash"] for page in page_docs})
+            records = {blob["_id"]: blob["data"] for blob in self.page_blobs.find({"_id": {"$in": hashes}})} if hashes else {}
+            pages = {page["url"]: join_page_record(records[page["content_hash"]], page["placement"])
+                     for page in page_docs}
+            
+            if not pages and skip == 0:
+                # Explorations stored before the split keep their pages embedded
+                legacy = self._legacy_pages(exploration_id)
+                if legacy:
+                    items = [(url, page) for url, page in legacy.items() if urls is None or url in urls]
+                    pages = dict(items[:limit] if limit else items)
+            return pages
+        except Exception as e:
+            logger.error(f"Error retrieving pages of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+    
+    def _legacy_pages(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+        """Pages embedded in an exploration stored before explorations were split"""
+        exploration = self.explorations.find_one(
+            {"_id": _document_key(exploration_id), "pages_field": {"$exists": False}},
+            projection={"data.pages": 1, "data.page_content": 1}
+        )
+        if not exploration:
+            return None
+        data = exploration.get("data", {})
+        return next((data[field] for field in PAGE_FIELDS if isinstance(data.get(field), dict)), None)
+    
+    def get_page_hashes(self, exploration_id: str) -> Dict[str, str]:
+        """Get the content hash of every page of an exploration
+        
+        Args:
+            exploration_id: The ID of the exploration
+            
+        Returns:
+            Dict[str, str]: Content hashes keyed by URL, in crawl order
+        """
+        try:
+            cursor = self.pages.find(
+                {"exploration_id": exploration_id},
+                projection={"_id": 0, "url": 1, "content_hash": 1},
+                sort=[("position", 1)]
+            )
+            hashes = {page["url"]: page["content_hash"] for page in cursor}
+            if not hashes:
+                legacy = self._legacy_pages(exploration_id) or {}
+                hashes = {url: page_content_hash(page) for url, page in legacy.items()}
+            return hashes
+        except Exception as e:
+            logger.error(f"Error retrieving page hashes of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+    
+    def get_graph(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+        """Get the hierarchy, paths and layout of an exploration
+        
+        Args:
+            exploration_id: The ID of the exploration
+            
+        Returns:
+            Optional[Dict[str, Any]]: The graph fields or None if not found
+        """
+        try:
+            graph = self.graphs.find_one({"exploration_id": exploration_id}, projection={"_id": 0, "exploration_id": 0})
+            if graph is not None:
+                return graph
+            
+            # Explorations stored before the split keep their graph embedded
+            exploration = self.explorations.find_one(
+                {"_id": _document_key(exploration_id), "pages_field": {"$exists": False}},
+                projection={f"data.{field}": 1 for field in GRAPH_FIELDS}
+            )
+            if not exploration:
+                return None
+            return exploration.get("data", {})
+        except Exception as e:
+            logger.error(f"Error retrieving graph of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+    
     def list_explorations(self, limit: int = 10) -> List[Dict[str, Any]]:
         """List saved explorations, most recent first
         
@@ -167,6 +507,106 @@ class DatabaseManager:
             logger.error(f"Error listing explorations: {str(e)}", exc_info=True)
             raise
     
+    def _keyset_page(self, collection, query: Dict[str, Any], limit: int, cursor: Optional[str] = None,
+                     descending: bool = False, projection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fetch one page of a (created_at, _id) ordered listing
+        
+        The cursor holds the position of the last document of the previous page,
+        so the query starts right after it on the index instead of skipping.
+        """
+        order = DESCENDING if descending else ASCENDING
+        if cursor:
+            created_at, key = decode_cursor(cursor)
+            if not isinstance(key, str):
+                raise InvalidCursorError(f"Invalid cursor: {cursor}")
+            after = "$lt" if descending else "$gt"
+            query = {"$and": [query, {"$or": [
+                {"created_at": {after: created_at}},
+                {"created_at": created_at, "_id": {after: _document_key(key)}}
+            ]}]}
+        
+        # One extra document tells whether there is a next page
+        documents = list(collection.find(query, projection=projection,
+                                         sort=[("created_at", order), ("_id", order)], limit=limit + 1))
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1]["created_at"], str(documents[-1]["_id"]))
+        for document in documents:
+            document["_id"] = str(document["_id"])
+        return {"items": documents, "next_cursor": next_cursor}
+    
+    def list_explorations_page(self, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List saved explorations a page at a time, most recent first
+        
+        Args:
+            limit: Maximum number of explorations in the page
+            cursor: next_cursor of the previous page, None for the first page
+            
+        Returns:
+            Dict[str, Any]: {"items": explorations, "next_cursor": cursor or None}
+        """
+        try:
+            page = self._keyset_page(
+                self.explorations, {}, limit, cursor, descending=True,
+                projection={"url": 1, "domain": 1, "name": 1, "created_at": 1, "summary": 1}
+            )
+            logger.info(f"Retrieved {len(page['items'])} explorations")
+            return page
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing explorations: {str(e)}", exc_info=True)
+            raise
+    
+    def list_test_cases_page(self, exploration_id: str, limit: int = 50,
+                             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List the test cases of an exploration a page at a time, in creation order
+        
+        Args:
+            exploration_id: The ID of the exploration
+            limit: Maximum number of test cases in the page
+            cursor: next_cursor of the previous page, None for the first page
+            
+        Returns:
+            Dict[str, Any]: {"items": test cases, "next_cursor": cursor or None}
+        """
+        try:
+            page = self._keyset_page(self.test_cases, {"exploration_id": exploration_id}, limit, cursor)
+            for test_case in page["items"]:
+                if test_case.get("latest_code_id"):
+                    test_case["latest_code_id"] = str(test_case["latest_code_id"])
+            logger.info(f"Retrieved {len(page['items'])} test cases for exploration {exploration_id}")
+            return page
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing test cases for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+    
+    def list_generated_code_page(self, exploration_id: str, limit: int = 50,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List the code generated for an exploration a page at a time, newest first
+        
+        Args:
+            exploration_id: The ID of the exploration
+            limit: Maximum number of code versions in the page
+            cursor: next_cursor of the previous page, None for the first page
+            
+        Returns:
+            Dict[str, Any]: {"items": code versions without "code", "next_cursor": cursor or None}
+        """
+        try:
+            page = self._keyset_page(self.generated_code, {"exploration_id": exploration_id}, limit, cursor,
+                                     descending=True, projection={"code": 0})
+            logger.info(f"Retrieved {len(page['items'])} generated code items for exploration {exploration_id}")
+            return page
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing generated code for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+    
     def delete_exploration(self, exploration_id: str) -> bool:
         """Delete an exploration by ID
         
@@ -178,11 +618,16 @@ class DatabaseManager:
         """
         try:
             # Delete exploration by ID
-            result = self.explorations.delete_one({"_id": ObjectId(exploration_id)})
+            result = self.explorations.delete_one({"_id": _document_key(exploration_id)})
             
-            # Also delete associated test cases and generated code
+            # Also delete its pages, graph, test cases and generated code
+            hashes = self._page_hashes(exploration_id)
+            self.pages.delete_many({"exploration_id": exploration_id})
+            self._release_page_blob_refs(exploration_id, hashes)
+            self.graphs.delete_many({"exploration_id": exploration_id})
             self.test_cases.delete_many({"exploration_id": exploration_id})
             self.generated_code.delete_many({"exploration_id": exploration_id})
+            self._update_search_index("remove_exploration", exploration_id)
             
             if result.deleted_count > 0:
                 logger.info(f"Deleted exploration with ID: {exploration_id}")
@@ -205,18 +650,27 @@ class DatabaseManager:
             List[str]: List of test case IDs
         """
         try:
-            # Verificar que la exploración existe
-            exploration = self.explorations.find_one({"_id": ObjectId(exploration_id)})
-            if not exploration:
+            # Actualizar el resumen en la exploración, que también comprueba que existe
+            result = self.explorations.update_one(
+                {"_id": _document_key(exploration_id)},
+                {
+                    "$set": {
+                        "summary.has_test_cases": True,
+                        "summary.test_case_count": len(test_cases)
+                    }
+                }
+            )
+            if result.matched_count == 0:
                 logger.warning(f"Exploration {exploration_id} not found when saving test cases")
                 return []
                 
-            # Guardar cada test case como documento individual
-            test_case_ids = []
+            # Guardar cada test case como documento individual, en una sola escritura
+            created_at = datetime.now()
+            documents = []
             for test_case in test_cases:
-                test_case_data = {
+                documents.append({
                     "exploration_id": exploration_id,
-                    "created_at": datetime.now(),
+                    "created_at": created_at,
                     "title": test_case.get("title", "Untitled Test Case"),
                     "description": test_case.get("description", ""),
                     "steps": test_case.get("steps", []),
@@ -224,21 +678,13 @@ class DatabaseManager:
                     "id": test_case.get("id"),  # ID numérico para referencia en el frontend
                     "status": "created",
                     "has_generated_code": False
-                }
-                
-                result = self.test_cases.insert_one(test_case_data)
-                test_case_ids.append(str(result.inserted_id))
+                })
             
-            # Actualizar el resumen en la exploración
-            self.explorations.update_one(
-                {"_id": ObjectId(exploration_id)},
-                {
-                    "$set": {
-                        "summary.has_test_cases": True,
-                        "summary.test_case_count": len(test_cases)
-                    }
-                }
-            )
+            test_case_ids = []
+            if documents:
+                result = self.test_cases.insert_many(documents)
+                test_case_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+                self._update_search_index("index_test_cases", exploration_id, documents)
             
             logger.info(f"Saved {len(test_cases)} test cases for exploration {exploration_id}")
             return test_case_ids
@@ -258,27 +704,21 @@ class DatabaseManager:
             str: The ID of the saved code
         """
         try:
-            # Verificar que la exploración existe
-            exploration = self.explorations.find_one({"_id": ObjectId(exploration_id)})
-            if not exploration:
+            # Actualizar el resumen en la exploración, que también comprueba que existe
+            result = self.explorations.update_one(
+                {"_id": _document_key(exploration_id)},
+                {"$set": {"summary.has_generated_code": True}}
+            )
+            if result.matched_count == 0:
                 logger.warning(f"Exploration {exploration_id} not found when saving generated code")
                 return ""
                 
-            # Buscar el test case por su ID numérico
-            test_case = self.test_cases.find_one({
-                "exploration_id": exploration_id,
-                "id": test_case_id
-            })
-            
-            test_case_mongo_id = None
-            if test_case:
-                test_case_mongo_id = str(test_case["_id"])
-                
-                # Actualizar el test case para indicar que tiene código generado
-                self.test_cases.update_one(
-                    {"_id": test_case["_id"]},
-                    {"$set": {"has_generated_code": True}}
-                )
+            # Obtener el _id del test case (por su ID numérico)
+            test_case = self.test_cases.find_one(
+                {"exploration_id": exploration_id, "id": test_case_id},
+                projection={"_id": 1}
+            )
+            test_case_mongo_id = str(test_case["_id"]) if test_case else None
             
             # Guardar el código generado como documento independiente
             code_data = {
@@ -294,11 +734,22 @@ class DatabaseManager:
             result = self.generated_code.insert_one(code_data)
             code_id = str(result.inserted_id)
             
-            # Actualizar el resumen en la exploración
-            self.explorations.update_one(
-                {"_id": ObjectId(exploration_id)},
-                {"$set": {"summary.has_generated_code": True}}
+            # Solo ahora que el código existe, marcar el test case como con código generado
+            # y apuntarlo a él. Los ObjectId crecen con el tiempo, así que $max deja el
+            # puntero en la versión más reciente aunque haya escrituras concurrentes
+            if test_case:
+                self.test_cases.update_one(
+                    {"_id": test_case["_id"]},
+                    {"$set": {"has_generated_code": True}, "$max": {"latest_code_id": result.inserted_id}}
+                )
+            
+            # Las versiones anteriores quedan reemplazadas; el índice TTL las expira
+            self.generated_code.update_many(
+                {"exploration_id": exploration_id, "test_case_id": test_case_id,
+                 "_id": {"$lt": result.inserted_id}, "superseded_at": {"$exists": False}},
+                {"$set": {"superseded_at": code_data["created_at"]}}
             )
+            self._update_search_index("index_code", exploration_id, test_case_id, code)
             
             logger.info(f"Saved generated code for test case {test_case_id} in exploration {exploration_id}")
             return code_id
@@ -306,6 +757,44 @@ class DatabaseManager:
             logger.error(f"Error saving generated code for exploration {exploration_id}: {str(e)}", exc_info=True)
             raise
 
+    def compact_generated_code(self, keep_versions: int, superseded_ttl_days: float = 0) -> int:
+        """Delete old generated code versions
+        
+        Args:
+            keep_versions: Number of most recent versions kept per test case, at least 1
+            superseded_ttl_days: Also delete versions replaced longer ago than this, 0 to keep them
+            
+        Returns:
+            int: Number of deleted versions
+        """
+        try:
+            keep_versions = max(1, keep_versions)
+            removed = 0
+            
+            # Solo los test cases con más versiones de las que se conservan
+            crowded = self.generated_code.aggregate([
+                {"$group": {"_id": {"exploration_id": "$exploration_id", "test_case_id": "$test_case_id"},
+                            "versions": {"$sum": 1}}},
+                {"$match": {"versions": {"$gt": keep_versions}}}
+            ], allowDiskUse=True)
+            for group in crowded:
+                stale = [code["_id"] for code in self.generated_code.find(
+                    group["_id"], projection={"_id": 1},
+                    sort=[("created_at", DESCENDING), ("_id", DESCENDING)], skip=keep_versions
+                )]
+                removed += self.generated_code.delete_many({"_id": {"$in": stale}}).deleted_count
+            
+            # The TTL monitor does this too, but only about once a minute and only with the index in place
+            if superseded_ttl_days:
+                cutoff = datetime.now() - timedelta(days=superseded_ttl_days)
+                removed += self.generated_code.delete_many({"superseded_at": {"$lt": cutoff}}).deleted_count
+            
+            logger.info(f"Compacted generated code, {removed} versions deleted")
+            return removed
+        except Exception as e:
+            logger.error(f"Error compacting generated code: {str(e)}", exc_info=True)
+            raise
+    
     def get_test_cases(self, exploration_id: str) -> List[Dict[str, Any]]:
         """Get test cases for an exploration
         
@@ -319,13 +808,16 @@ class DatabaseManager:
             # Buscar todos los test cases para esta exploración
             cursor = self.test_cases.find(
                 {"exploration_id": exploration_id},
-                sort=[("created_at", 1)]  # Ordenar por fecha de creación
+                # Ordenar por fecha de creación; _id desempata los guardados en la misma escritura
+                sort=[("created_at", 1), ("_id", 1)]
             )
             
             # Convertir ObjectId a string para serialización
             test_cases = []
             for test_case in cursor:
                 test_case["_id"] = str(test_case["_id"])
+                if test_case.get("latest_code_id"):
+                    test_case["latest_code_id"] = str(test_case["latest_code_id"])
                 test_cases.append(test_case)
                 
             logger.info(f"Retrieved {len(test_cases)} test cases for exploration {exploration_id}")
@@ -351,7 +843,7 @@ class DatabaseManager:
                     "exploration_id": exploration_id,
                     "test_case_id": test_case_id
                 },
-                sort=[("created_at", -1)]  # Más reciente primero
+                sort=[("created_at", -1), ("_id", -1)]  # Más reciente primero, _id desempata
             )
             
             if code:
@@ -376,7 +868,7 @@ class DatabaseManager:
             # Buscar todo el código generado para esta exploración
             cursor = self.generated_code.find(
                 {"exploration_id": exploration_id},
-                sort=[("test_case_id", 1), ("created_at", -1)]  # Ordenar por test case ID y luego por fecha
+                sort=[("test_case_id", 1), ("created_at", -1), ("_id", -1)]  # Ordenar por test case ID y luego por fecha
             )
             
             # Convertir ObjectId a string para serialización
@@ -401,31 +893,40 @@ class DatabaseManager:
             List[Dict[str, Any]]: List of test cases with code
         """
         try:
-            # Obtener todos los test cases
             test_cases = self.get_test_cases(exploration_id)
-            
-            # Obtener todo el código generado
-            all_code = self.get_all_generated_code(exploration_id)
-            
-            # Crear un diccionario para mapear test_case_id a código
+
+            # Cada test case apunta a su código más reciente, así que solo se
+            # leen las versiones actuales y no todo el historial
+            latest_ids = [ObjectId(tc["latest_code_id"]) for tc in test_cases if tc.get("latest_code_id")]
             code_map = {}
-            for code in all_code:
-                test_id = code["test_case_id"]
-                if test_id not in code_map:
-                    code_map[test_id] = code
-            
-            # Asociar el código con cada test case
+            for code in self.generated_code.find({"_id": {"$in": latest_ids}}):
+                code["_id"] = str(code["_id"])
+                code_map[code["_id"]] = code
+
             for test_case in test_cases:
-                test_id = test_case["id"]
-                if test_id in code_map:
-                    test_case["generated_code"] = code_map[test_id]
+                latest_id = test_case.get("latest_code_id")
+                if latest_id:
+                    test_case["generated_code"] = code_map.get(latest_id)
+                elif test_case.get("has_generated_code"):
+                    # Test cases guardados antes de mantener el puntero
+                    test_case["generated_code"] = self.get_generated_code(exploration_id, test_case["id"])
                 else:
                     test_case["generated_code"] = None
-            
+
             return test_cases
         except Exception as e:
             logger.error(f"Error retrieving test cases with code for exploration {exploration_id}: {str(e)}", exc_info=True)
             raise
 
-# Create a singleton instance
-db_manager = DatabaseManager() 
\ No newline at end of file
+_db_manager = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    """Get the shared DatabaseManager, created on first use so importing this
+    module never touches the database"""
+    global _db_manager
+    with _db_manager_lock:
+        if _db_manager is None:
+            _db_manager = DatabaseManager()
+        return _db_manager
+ 
\ No newline at end of file
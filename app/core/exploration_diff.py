@@ -0,0 +1,113 @@
+import logging
+from typing import Dict, List, Any
+from urllib.parse import urlparse
+from app.core.storage import page_content_hash
+from app.core.structure_cache import StructureViewRegistry, load_structure
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.exploration-diff")
+
+def _edge(source: int, target: int) -> int:
+    return source << 32 | target
+
+def _edge_ends(edge: int):
+    return edge >> 32, edge & 0xFFFFFFFF
+
+class ExplorationSnapshot:
+    """What a diff needs from one exploration: page hashes and edges by URL ID
+
+    Built once per structure file and cached, so a diff only does set
+    operations on integers and compares hashes. URL IDs are the positions
+    of the pages in urls and belong to this snapshot alone, so they go
+    away with it when the snapshot is evicted.
+    """
+
+    def __init__(self, structure: Dict[str, Any]):
+        self.root = structure.get("url")
+        self.category = structure.get("category")
+        pages = structure.get("pages", {})
+        self.urls: List[str] = list(pages)
+        self.ids: Dict[str, int] = {url: page_id for page_id, url in enumerate(self.urls)}
+        self.hashes: Dict[int, str] = {}
+        edges = set()
+
+        ids = self.ids
+        for url, info in pages.items():
+            page_id = ids[url]
+            # Content only: where the page sits in the crawl is compared through the edges
+            self.hashes[page_id] = page_content_hash(info)
+
+            # Same edges as the graph index: crawl tree and links between crawled pages
+            parent = info.get("parent")
+            if parent in ids:
+                edges.add(_edge(ids[parent], page_id))
+            for link in info.get("links", []):
+                if link in ids and link != url:
+                    edges.add(_edge(page_id, ids[link]))
+        self.edges = frozenset(edges)
+
+    @property
+    def domain(self) -> str:
+        return urlparse(self.root or "").netloc.lower()
+
+def diff_snapshots(base: ExplorationSnapshot, target: ExplorationSnapshot, limit: int = 1000) -> Dict[str, Any]:
+    """Compare two explorations of a site
+
+    Args:
+        base: The earlier exploration
+        target: The exploration compared against it
+        limit: Maximum number of entries listed per kind of change, 0 for all;
+            the counts always cover every change
+
+    Returns:
+        Dict[str, Any]: Counts and lists of added, removed and changed pages,
+        added and removed edges, and the site category of both; pages carry no
+        category of their own, so only the site's is compared
+    """
+    # Bring the target's URL IDs into the base's, URLs new in the target after the base's
+    urls = list(base.urls)
+    mapping = []
+    for url in target.urls:
+        url_id = base.ids.get(url)
+        if url_id is None:
+            url_id = len(urls)
+            urls.append(url)
+        mapping.append(url_id)
+    target_hashes = {mapping[page_id]: content_hash for page_id, content_hash in target.hashes.items()}
+    target_edges = {_edge(mapping[source], mapping[dest]) for source, dest in map(_edge_ends, target.edges)}
+
+    def edge_urls(edge: int) -> Dict[str, str]:
+        source, dest = _edge_ends(edge)
+        return {"source": urls[source], "target": urls[dest]}
+
+    base_ids = base.hashes.keys()
+    target_ids = target_hashes.keys()
+    added = target_ids - base_ids
+    removed = base_ids - target_ids
+    common = base_ids & target_ids
+    changed = [page_id for page_id in common if base.hashes[page_id] != target_hashes[page_id]]
+    edges_added = target_edges - base.edges
+    edges_removed = base.edges - target_edges
+
+    def listed(items):
+        items = sorted(items)
+        return items[:limit] if limit else items
+
+    return {
+        "counts": {
+            "pages_added": len(added),
+            "pages_removed": len(removed),
+            "pages_changed": len(changed),
+            "pages_unchanged": len(common) - len(changed),
+            "edges_added": len(edges_added),
+            "edges_removed": len(edges_removed)
+        },
+        "site_category": {"from": base.category, "to": target.category, "changed": base.category != target.category},
+        "pages_added": [urls[page_id] for page_id in listed(added)],
+        "pages_removed": [urls[page_id] for page_id in listed(removed)],
+        "pages_changed": [urls[page_id] for page_id in listed(changed)],
+        "edges_added": [edge_urls(edge) for edge in listed(edges_added)],
+        "edges_removed": [edge_urls(edge) for edge in listed(edges_removed)]
+    }
+
+exploration_snapshots = StructureViewRegistry(ExplorationSnapshot, loader=load_structure)
@@ -0,0 +1,134 @@
+import os
+import re
+import uuid
+import shutil
+import logging
+from typing import Dict, List, Optional, Any
+from app.core.structure_store import write_structure
+from app.utils.http_cache import write_json_with_gzip
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.explorations")
+
+# Every analysis writes its artifacts into its own directory under here. Not
+# under app/static: the files are only served through the API routes
+EXPLORATIONS_DIR = os.path.join("data", "explorations")
+# Where explorations were written before, moved by migrate_legacy_explorations
+LEGACY_EXPLORATIONS_DIR = os.path.join("app", "static", "explorations")
+
+STRUCTURE_FILE = "website_structure.json"
+COMPACT_STRUCTURE_FILE = "website_structure.wsb"
+
+# IDs end up in file paths, so only plain tokens (uuid hex, Mongo ObjectIds, ...) are accepted
+_EXPLORATION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# The format of the IDs new_exploration_id creates
+_GENERATED_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+def new_exploration_id() -> str:
+    """Create a new exploration ID"""
+    return uuid.uuid4().hex
+
+def is_valid_exploration_id(exploration_id: Optional[str]) -> bool:
+    """Check that an exploration ID is safe to use as a directory name"""
+    return bool(exploration_id) and _EXPLORATION_ID_PATTERN.match(exploration_id) is not None
+
+def is_generated_exploration_id(exploration_id: Optional[str]) -> bool:
+    """Check whether an exploration ID has the format of the IDs new_exploration_id creates"""
+    return bool(exploration_id) and _GENERATED_ID_PATTERN.match(exploration_id) is not None
+
+def exploration_dir(exploration_id: str, create: bool = False) -> str:
+    """Get the artifact directory of an exploration
+
+    Args:
+        exploration_id: The ID of the exploration
+        create: Create the directory if it does not exist yet
+
+    Returns:
+        str: Path of the exploration directory
+    """
+    if not is_valid_exploration_id(exploration_id):
+        raise ValueError(f"Invalid exploration ID: {exploration_id!r}")
+    path = os.path.join(EXPLORATIONS_DIR, exploration_id)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+def structure_path(exploration_id: str) -> str:
+    """Get the path of the website structure saved by an exploration"""
+    return os.path.join(exploration_dir(exploration_id), STRUCTURE_FILE)
+
+def compact_structure_path(exploration_id: str) -> str:
+    """Get the path of the compact copy of an exploration's website structure"""
+    return os.path.join(exploration_dir(exploration_id), COMPACT_STRUCTURE_FILE)
+
+def save_structure(exploration_id: str, structure: Dict[str, Any]):
+    """Write the website structure of an exploration: its JSON file with a gzip
+    copy and the compact file with separately readable pages"""
+    exploration_dir(exploration_id, create=True)
+    write_structure(compact_structure_path(exploration_id), structure)
+    # Compact and with a gzip copy so it can be served straight from disk
+    write_json_with_gzip(structure_path(exploration_id), structure)
+
+def delete_exploration_files(exploration_id: str) -> bool:
+    """Delete the artifact directory of an exploration
+
+    Returns:
+        bool: True if it existed
+    """
+    path = exploration_dir(exploration_id)
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    logger.info(f"Deleted the files of exploration {exploration_id}")
+    return True
+
+def list_exploration_files() -> List[Dict[str, Any]]:
+    """List the exploration directories with their size and last modification time"""
+    explorations = []
+    if not os.path.isdir(EXPLORATIONS_DIR):
+        return explorations
+    with os.scandir(EXPLORATIONS_DIR) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False) or not is_valid_exploration_id(entry.name):
+                continue
+            size = 0
+            modified = None
+            with os.scandir(entry.path) as files:
+                for file in files:
+                    if file.is_file(follow_symlinks=False):
+                        stat = file.stat(follow_symlinks=False)
+                        size += stat.st_size
+                        modified = stat.st_mtime if modified is None else max(modified, stat.st_mtime)
+            if modified is None:
+                modified = entry.stat(follow_symlinks=False).st_mtime
+            explorations.append({"exploration_id": entry.name, "bytes": size, "modified": modified})
+    return explorations
+
+def latest_structure_path() -> Optional[str]:
+    """Get the website structure file of the most recently written exploration, or None if there is none"""
+    explorations = [exploration for exploration in list_exploration_files()
+                    if os.path.exists(structure_path(exploration["exploration_id"]))]
+    if not explorations:
+        return None
+    return structure_path(max(explorations, key=lambda exploration: exploration["modified"])["exploration_id"])
+
+def migrate_legacy_explorations() -> int:
+    """Move exploration directories left under app/static to EXPLORATIONS_DIR
+
+    Returns:
+        int: Number of explorations moved
+    """
+    if not os.path.isdir(LEGACY_EXPLORATIONS_DIR):
+        return 0
+    moved = 0
+    os.makedirs(EXPLORATIONS_DIR, exist_ok=True)
+    for name in os.listdir(LEGACY_EXPLORATIONS_DIR):
+        source = os.path.join(LEGACY_EXPLORATIONS_DIR, name)
+        target = os.path.join(EXPLORATIONS_DIR, name)
+        if not is_valid_exploration_id(name) or not os.path.isdir(source) or os.path.exists(target):
+            continue
+        shutil.move(source, target)
+        moved += 1
+    if moved:
+        logger.info(f"Moved {moved} explorations from {LEGACY_EXPLORATIONS_DIR} to {EXPLORATIONS_DIR}")
+    return moved
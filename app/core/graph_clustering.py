@@ -0,0 +1,265 @@
+import re
+import logging
+from collections import deque
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Any
+from app.core.structure_cache import StructureViewRegistry, load_structure
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.graph-clustering")
+
+CLUSTER_PREFIX = "cluster:"
+
+# Path segments that vary per item (ids, hashes, uuids) are grouped under one template
+TEMPLATE_SEGMENT = "{id}"
+_TEMPLATE_PATTERNS = [
+    re.compile(r"^\d+$"),
+    re.compile(r"^[0-9a-f]{8,}$", re.IGNORECASE),
+    re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE),
+]
+
+def _normalize_segment(segment):
+    """Replace variable path segments with a template placeholder"""
+    if any(pattern.match(segment) for pattern in _TEMPLATE_PATTERNS):
+        return TEMPLATE_SEGMENT
+    return segment
+
+def page_node(url: str, info: Dict[str, Any], position: Optional[List[float]] = None) -> Dict[str, Any]:
+    """Build the vis.js node for a single page"""
+    title = info.get('title', 'No Title')
+    path = info.get('path', '/')
+    depth = info.get('depth', 0)
+
+    # Use shortened labels for better visualization
+    label = path[:15] + "..." if len(path) > 15 else path
+    if label == "" or label == "/":
+        label = "Home"
+
+    node = {
+        "id": url,
+        "label": label,
+        "title": f"<div><strong>{title}</strong><br>{url}</div>",
+        "value": (10-depth) * 2,
+        "level": depth,
+        "url": url,
+        "color": "#4CAF50" if depth == 0 else "#2196F3"
+    }
+    if position:
+        node["x"], node["y"] = position
+    return node
+
+class _PathNode:
+    """A path prefix in the site map trie"""
+
+    __slots__ = ("prefix", "pages", "children", "total", "sum_x", "sum_y", "placed", "depth")
+
+    def __init__(self, prefix, depth):
+        self.prefix = prefix
+        self.depth = depth
+        self.pages = []
+        self.children = {}
+        self.total = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.placed = 0
+
+class SiteMap:
+    """Level-of-detail view of a website, collapsing path prefixes into clusters
+
+    Pages are grouped in a trie by URL path (with variable segments templated),
+    so the initial view and every expansion have a bounded number of nodes no
+    matter how large the site is.
+    """
+
+    def __init__(self, root_url: str, pages: Dict[str, Dict[str, Any]], layout: Optional[Dict[str, List[float]]] = None,
+                 paths: Optional[Dict[str, List[List[str]]]] = None):
+        self.root_url = root_url
+        self.pages = pages
+        self.layout = layout or {}
+        self.paths = paths
+        self.root = _PathNode("/", 0)
+        self._nodes = {"/": self.root}
+        self._build()
+
+    @classmethod
+    def from_structure(cls, structure: Dict[str, Any]) -> "SiteMap":
+        return cls(structure.get("url"), structure.get("pages", {}), structure.get("layout"))
+
+    def _build(self):
+        """Insert every page into the trie and aggregate subtree counts and positions"""
+        for url in self.pages:
+            segments = [_normalize_segment(s) for s in urlparse(url).path.split("/") if s]
+            node = self.root
+            for segment in segments:
+                child = node.children.get(segment)
+                if child is None:
+                    prefix = node.prefix.rstrip("/") + "/" + segment
+                    child = _PathNode(prefix, node.depth + 1)
+                    node.children[segment] = child
+                    self._nodes[prefix] = child
+                node = child
+            node.pages.append(url)
+
+        # Post-order aggregation, deepest prefixes first
+        for node in sorted(self._nodes.values(), key=lambda n: n.depth, reverse=True):
+            node.total += len(node.pages)
+            for url in node.pages:
+                if url in self.layout:
+                    node.sum_x += self.layout[url][0]
+                    node.sum_y += self.layout[url][1]
+                    node.placed += 1
+            for child in node.children.values():
+                node.total += child.total
+                node.sum_x += child.sum_x
+                node.sum_y += child.sum_y
+                node.placed += child.placed
+
+    @property
+    def page_count(self):
+        return self.root.total
+
+    def _single_page(self, node):
+        """Return the only page below a prefix that holds exactly one page"""
+        while not node.pages:
+            node = next(iter(node.children.values()))
+        return node.pages[0]
+
+    def _cluster_node(self, node, offset=0, count=None):
+        count = node.total if count is None else count
+        cluster_id = CLUSTER_PREFIX + node.prefix + (f"|{offset}" if offset else "")
+        cluster = {
+            "id": cluster_id,
+            "label": f"{node.prefix} ({count})" if not offset else f"{node.prefix} (+{count})",
+            "title": f"<div><strong>{node.prefix}</strong><br>{count} pages - click to expand</div>",
+            "cluster": True,
+            "count": count,
+            "shape": "box",
+            "level": node.depth,
+            "color": "#FF9800"
+        }
+        if node.placed:
+            cluster["x"] = round(node.sum_x / node.placed, 1)
+            cluster["y"] = round(node.sum_y / node.placed, 1)
+        return cluster
+
+    def _page_node(self, url):
+        return page_node(url, self.pages.get(url, {}), self.layout.get(url))
+
+    def _page_paths(self, url):
+        if self.paths is not None:
+            return self.paths.get(url, [])
+        return self.pages.get(url, {}).get("paths", [])
+
+    def parse_cluster_id(self, cluster_id: str):
+        """Split a cluster id into its trie node and item offset"""
+        if not cluster_id.startswith(CLUSTER_PREFIX):
+            return None, 0
+        prefix = cluster_id[len(CLUSTER_PREFIX):]
+        offset = 0
+        if "|" in prefix:
+            head, _, tail = prefix.rpartition("|")
+            if tail.isdigit():
+                prefix, offset = head, int(tail)
+        return self._nodes.get(prefix), offset
+
+    def expand(self, cluster_id: str, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """Return the nodes that replace a cluster when it is expanded
+
+        Args:
+            cluster_id: Identifier of the cluster node
+            limit: Maximum number of nodes to return, the rest stay in a "more" cluster
+
+        Returns:
+            Optional[Dict[str, Any]]: The anchor page, nodes, edges and paths, or None if unknown
+        """
+        node, offset = self.parse_cluster_id(cluster_id)
+        if node is None:
+            return None
+
+        # The prefix's own pages first, then child prefixes (largest subtrees first)
+        items = list(node.pages) + sorted(node.children.values(), key=lambda child: -child.total)
+        window = items[offset:offset + limit]
+        remaining = len(items) - offset - len(window)
+
+        nodes = []
+        for item in window:
+            if isinstance(item, str):
+                nodes.append(self._page_node(item))
+            elif item.total == 1:
+                nodes.append(self._page_node(self._single_page(item)))
+            else:
+                nodes.append(self._cluster_node(item))
+        if remaining > 0:
+            # The items that did not fit stay behind a "more" cluster for the next page
+            rest = items[offset + len(window):]
+            count = sum(1 if isinstance(item, str) else item.total for item in rest)
+            nodes.append(self._cluster_node(node, offset + len(window), count))
+
+        # The site root, or a prefix's single page, links to the other nodes
+        anchor = None
+        page_ids = [n["id"] for n in nodes if not n.get("cluster")]
+        if self.root_url in page_ids:
+            anchor = self.root_url
+        elif len(node.pages) == 1 and node.pages[0] in page_ids:
+            anchor = node.pages[0]
+
+        edges = [{"from": anchor, "to": n["id"]} for n in nodes if anchor and n["id"] != anchor]
+        paths = {page_id: self._page_paths(page_id) for page_id in page_ids}
+        return {"cluster": cluster_id, "anchor": anchor, "nodes": nodes, "edges": edges, "paths": paths}
+
+    def initial_view(self, budget: int = 200) -> Dict[str, Any]:
+        """Expand clusters breadth-first from the root while the view stays within budget
+
+        Args:
+            budget: Maximum number of visible nodes
+
+        Returns:
+            Dict[str, Any]: Nodes, edges and paths for the initial render
+        """
+        first = self.expand(CLUSTER_PREFIX + "/", limit=budget - 1)
+        nodes = {n["id"]: n for n in first["nodes"]}
+        incoming = {n["id"]: set() for n in first["nodes"]}
+        outgoing = {n["id"]: set() for n in first["nodes"]}
+        for edge in first["edges"]:
+            outgoing[edge["from"]].add(edge["to"])
+            incoming[edge["to"]].add(edge["from"])
+        paths = dict(first["paths"])
+
+        queue = deque(n["id"] for n in first["nodes"] if n.get("cluster"))
+        while queue and len(nodes) < budget:
+            cluster_id = queue.popleft()
+            expansion = self.expand(cluster_id)
+            # Only expand clusters that fit entirely, smaller ones later in the queue may still fit
+            if not expansion["nodes"] or len(nodes) - 1 + len(expansion["nodes"]) > budget:
+                continue
+
+            # Replace the cluster with its expansion, rewiring the edges that pointed at it
+            sources = incoming.pop(cluster_id)
+            for source in sources:
+                outgoing[source].discard(cluster_id)
+            del nodes[cluster_id]
+            del outgoing[cluster_id]
+
+            anchor = expansion["anchor"]
+            for n in expansion["nodes"]:
+                nodes[n["id"]] = n
+                incoming.setdefault(n["id"], set())
+                outgoing.setdefault(n["id"], set())
+                if n.get("cluster"):
+                    queue.append(n["id"])
+            targets = [anchor] if anchor else [n["id"] for n in expansion["nodes"]]
+            for source in sources:
+                for target in targets:
+                    outgoing[source].add(target)
+                    incoming[target].add(source)
+            for edge in expansion["edges"]:
+                outgoing[edge["from"]].add(edge["to"])
+                incoming[edge["to"]].add(edge["from"])
+            paths.update(expansion["paths"])
+
+        edges = [{"from": source, "to": target} for source, targets in outgoing.items() for target in targets]
+        logger.info(f"Site map initial view has {len(nodes)} nodes for {self.page_count} pages")
+        return {"nodes": list(nodes.values()), "edges": edges, "paths": paths}
+
+# Create a singleton instance
+site_maps = StructureViewRegistry(SiteMap.from_structure, loader=load_structure)
@@ -0,0 +1,179 @@
+import gzip
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional, Any
+from app.core.graph_clustering import SiteMap, page_node
+from app.core.structure_cache import StructureViewRegistry, load_structure
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.graph-data")
+
+# Above this many pages the graph starts as a clustered site map
+LOD_THRESHOLD = 300
+
+# Above this many pages the viewer switches to the WebGL renderer
+WEBGL_THRESHOLD = 5000
+
+# vis-network options shared by every graph, physics is off because layouts are precomputed
+GRAPH_OPTIONS = {
+    "nodes": {
+        "font": {
+            "size": 12
+        },
+        "borderWidth": 2,
+        "shadow": True
+    },
+    "edges": {
+        "color": {
+            "color": "#1E90FF",
+            "highlight": "#FF0000"
+        },
+        "smooth": {
+            "type": "continuous"
+        },
+        "arrows": {
+            "to": {
+                "enabled": True,
+                "scaleFactor": 0.5
+            }
+        }
+    },
+    "physics": {
+        "enabled": False
+    },
+    "interaction": {
+        "hover": True,
+        "hoverConnectedEdges": True,
+        "navigationButtons": True,
+        "keyboard": True,
+        "selectConnectedEdges": True,
+        "tooltipDelay": 300
+    }
+}
+
+def build_graph_data(root_url: str, pages: Dict[str, Dict[str, Any]], layout: Optional[Dict[str, List[float]]] = None,
+                     paths: Optional[Dict[str, List[List[str]]]] = None, lod_threshold: int = LOD_THRESHOLD) -> Dict[str, Any]:
+    """Build the data the graph viewer renders
+
+    Args:
+        root_url: URL the analysis started from
+        pages: Page records keyed by URL (title, path, depth, parent, ...)
+        layout: Precomputed [x, y] coordinates keyed by URL
+        paths: Paths from the root to each page, defaults to the "paths" of each page record
+        lod_threshold: Page count above which the graph is clustered
+
+    Returns:
+        Dict[str, Any]: Nodes, edges, paths and vis-network options
+    """
+    layout = layout or {}
+    if paths is None:
+        paths = {url: info.get("paths", []) for url, info in pages.items()}
+
+    if len(pages) > lod_threshold:
+        # Only the initial clustered view is shipped, clusters are fetched when expanded
+        view = SiteMap(root_url, pages, layout, paths).initial_view()
+        mode = "clustered"
+        nodes_data = view["nodes"]
+        edges_data = view["edges"]
+        paths_data = view["paths"]
+    else:
+        mode = "full"
+        nodes_data = [page_node(url, info, layout.get(url)) for url, info in pages.items()]
+        edges_data = [
+            {"from": info["parent"], "to": url}
+            for url, info in pages.items()
+            if info.get("parent") in pages
+        ]
+        paths_data = paths
+
+    logger.info(f"Built {mode} graph data with {len(nodes_data)} nodes for {len(pages)} pages")
+    return {
+        "root": root_url,
+        "mode": mode,
+        "renderer": "webgl" if len(pages) > WEBGL_THRESHOLD else "vis",
+        "page_count": len(pages),
+        "nodes": nodes_data,
+        "edges": edges_data,
+        "paths": paths_data,
+        "options": GRAPH_OPTIONS
+    }
+
+def build_webgl_data(root_url: str, pages: Dict[str, Dict[str, Any]],
+                     layout: Optional[Dict[str, List[float]]] = None) -> Dict[str, Any]:
+    """Build the columnar graph data used by the WebGL renderer
+
+    Every page is included, edges refer to pages by their position in the
+    arrays so the browser can load them straight into typed arrays.
+
+    Args:
+        root_url: URL the analysis started from
+        pages: Page records keyed by URL
+        layout: Precomputed [x, y] coordinates keyed by URL
+
+    Returns:
+        Dict[str, Any]: Parallel node arrays and a flat [from, to, ...] edge array
+    """
+    layout = layout or {}
+    urls = list(pages)
+    position_of = {url: i for i, url in enumerate(urls)}
+
+    labels, titles, xs, ys, depths, edges = [], [], [], [], [], []
+    for i, url in enumerate(urls):
+        info = pages[url]
+        node = page_node(url, info)
+        labels.append(node["label"])
+        titles.append(info.get("title", "No Title"))
+        x, y = layout.get(url, (0.0, 0.0))
+        xs.append(x)
+        ys.append(y)
+        depths.append(info.get("depth", 0))
+        parent = position_of.get(info.get("parent"))
+        if parent is not None:
+            edges.extend((parent, i))
+
+    logger.info(f"Built WebGL graph data with {len(urls)} nodes and {len(edges) // 2} edges")
+    return {
+        "root": root_url,
+        "mode": "webgl",
+        "page_count": len(urls),
+        "urls": urls,
+        "labels": labels,
+        "titles": titles,
+        "x": xs,
+        "y": ys,
+        "depth": depths,
+        "edges": edges
+    }
+
+def graph_data_from_structure(structure: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the graph data for a saved website structure"""
+    graph_data = build_graph_data(structure.get("url"), structure.get("pages", {}), structure.get("layout"))
+    graph_data["exploration_id"] = structure.get("exploration_id")
+    return graph_data
+
+def webgl_data_from_structure(structure: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the WebGL graph data for a saved website structure"""
+    graph_data = build_webgl_data(structure.get("url"), structure.get("pages", {}), structure.get("layout"))
+    graph_data["exploration_id"] = structure.get("exploration_id")
+    return graph_data
+
+class GraphArtifact:
+    """Serialized graph data for one structure version, ready to be served"""
+
+    def __init__(self, graph_data: Dict[str, Any]):
+        self.body = json.dumps(graph_data, separators=(",", ":")).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=6)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+    @classmethod
+    def from_structure(cls, structure: Dict[str, Any]) -> "GraphArtifact":
+        return cls(graph_data_from_structure(structure))
+
+    @classmethod
+    def webgl_from_structure(cls, structure: Dict[str, Any]) -> "GraphArtifact":
+        return cls(webgl_data_from_structure(structure))
+
+# Built on the first /api/graph-data request and kept until the structure file changes
+graph_artifacts = StructureViewRegistry(GraphArtifact.from_structure, loader=load_structure)
+webgl_graph_artifacts = StructureViewRegistry(GraphArtifact.webgl_from_structure, loader=load_structure)
@@ -0,0 +1,191 @@
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Any
+from app.core.structure_cache import StructureViewRegistry, load_structure
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.graph-index")
+
+class GraphIndex:
+    """In-memory adjacency indexes over a saved website structure
+
+    Built once per exploration so that neighbourhood and path queries only
+    touch the nodes they return instead of scanning every page.
+    """
+
+    def __init__(self, structure: Dict[str, Any]):
+        self.root = structure.get("url")
+        self.pages = structure.get("pages", {})
+        self.children: Dict[str, List[str]] = {}
+        self.parents: Dict[str, List[str]] = {}
+        self.tree_children: Dict[str, List[str]] = {}
+        self.ancestors: Dict[str, List[str]] = {}
+        self._build()
+
+    def _build(self):
+        """Build child, parent and ancestor indexes from the page records"""
+        children = {url: {} for url in self.pages}
+        parents = {url: {} for url in self.pages}
+        tree_children = {url: [] for url in self.pages}
+
+        for url, info in self.pages.items():
+            parent = info.get("parent")
+            if parent in self.pages:
+                tree_children[parent].append(url)
+                children[parent][url] = None
+                parents[url][parent] = None
+
+            # Link edges are only kept when both ends were crawled
+            for link in info.get("links", []):
+                if link in self.pages and link != url:
+                    children[url][link] = None
+                    parents[link][url] = None
+
+        self.children = {url: list(targets) for url, targets in children.items()}
+        self.parents = {url: list(sources) for url, sources in parents.items()}
+        self.tree_children = tree_children
+
+        # Ancestors follow the crawl tree, so each chain is at most the crawl depth
+        for url in self.pages:
+            self._ancestor_chain(url)
+
+    def _ancestor_chain(self, url):
+        """Resolve the crawl-tree ancestors of a page, reusing cached chains"""
+        chain = []
+        current = url
+        seen = {url}
+        while True:
+            if current in self.ancestors and current != url:
+                chain.extend(self.ancestors[current])
+                break
+            parent = self.pages.get(current, {}).get("parent")
+            if parent not in self.pages or parent in seen:
+                break
+            chain.append(parent)
+            seen.add(parent)
+            current = parent
+        self.ancestors[url] = chain
+        return chain
+
+    def __contains__(self, url):
+        return url in self.pages
+
+    def node_summary(self, url: str) -> Dict[str, Any]:
+        """Return the lightweight representation used in query responses"""
+        info = self.pages.get(url, {})
+        return {
+            "url": url,
+            "title": info.get("title", "Unknown"),
+            "path": info.get("path", "/"),
+            "depth": info.get("depth", 0)
+        }
+
+    def get_children(self, url: str) -> List[str]:
+        return self.children.get(url, [])
+
+    def get_parents(self, url: str) -> List[str]:
+        return self.parents.get(url, [])
+
+    def get_tree_children(self, url: str) -> List[str]:
+        return self.tree_children.get(url, [])
+
+    def get_ancestors(self, url: str) -> List[str]:
+        return self.ancestors.get(url, [])
+
+    def neighborhood(self, url: str, k: int = 1) -> Dict[str, Any]:
+        """Return every page within k hops of url, following edges in both directions
+
+        Args:
+            url: The page at the centre of the neighbourhood
+            k: Maximum number of hops
+
+        Returns:
+            Dict[str, Any]: Nodes with their hop distance and the edges between them
+        """
+        distances = {url: 0}
+        queue = deque([url])
+        while queue:
+            current = queue.popleft()
+            if distances[current] >= k:
+                continue
+            for neighbour in self.children.get(current, []) + self.parents.get(current, []):
+                if neighbour not in distances:
+                    distances[neighbour] = distances[current] + 1
+                    queue.append(neighbour)
+
+        edges = [
+            {"from": source, "to": target}
+            for source in distances
+            for target in self.children.get(source, [])
+            if target in distances
+        ]
+        nodes = []
+        for node_url, distance in distances.items():
+            node = self.node_summary(node_url)
+            node["distance"] = distance
+            nodes.append(node)
+        return {"center": url, "k": k, "nodes": nodes, "edges": edges}
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Find the shortest directed path between two pages with a bidirectional BFS
+
+        Args:
+            source: URL the path starts from
+            target: URL the path ends at
+
+        Returns:
+            Optional[List[str]]: The URLs along the path, or None if unreachable
+        """
+        if source not in self.pages or target not in self.pages:
+            return None
+        if source == target:
+            return [source]
+
+        forward = {source: None}
+        backward = {target: None}
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        while forward_frontier and backward_frontier:
+            # Always expand the smaller frontier to keep the search balanced
+            if len(forward_frontier) <= len(backward_frontier):
+                next_frontier = []
+                for node in forward_frontier:
+                    for child in self.children.get(node, []):
+                        if child in forward:
+                            continue
+                        forward[child] = node
+                        if child in backward:
+                            return self._join_path(child, forward, backward)
+                        next_frontier.append(child)
+                forward_frontier = next_frontier
+            else:
+                next_frontier = []
+                for node in backward_frontier:
+                    for parent in self.parents.get(node, []):
+                        if parent in backward:
+                            continue
+                        backward[parent] = node
+                        if parent in forward:
+                            return self._join_path(parent, forward, backward)
+                        next_frontier.append(parent)
+                backward_frontier = next_frontier
+
+        return None
+
+    def _join_path(self, meeting, forward, backward):
+        """Stitch the two BFS trees together at the meeting node"""
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = forward[node]
+        path.reverse()
+        node = backward[meeting]
+        while node is not None:
+            path.append(node)
+            node = backward[node]
+        return path
+
+# Create a singleton instance
+graph_indexes = StructureViewRegistry(GraphIndex, loader=load_structure)
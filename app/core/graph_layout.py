@@ -0,0 +1,124 @@
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.graph-layout")
+
+# Spacing between nodes in vis.js canvas units
+LEVEL_SEPARATION = 200
+NODE_SPACING = 150
+
+# The spring layout is O(n^2) in memory, larger graphs fall back to hierarchical
+MAX_SPRING_NODES = 2000
+
+def hierarchical_layout(nodes: List[str], depths: Dict[str, int], parents: Dict[str, Optional[str]]) -> np.ndarray:
+    """Place nodes in rows by crawl depth, keeping siblings next to their parent
+
+    Args:
+        nodes: Node identifiers, defining the row order of the result
+        depths: Crawl depth of each node
+        parents: Crawl-tree parent of each node (None for the root)
+
+    Returns:
+        np.ndarray: An (n, 2) array of x, y coordinates
+    """
+    n = len(nodes)
+    positions = np.zeros((n, 2), dtype=np.float64)
+    if n == 0:
+        return positions
+
+    position_of = {node: i for i, node in enumerate(nodes)}
+    depth = np.array([depths.get(node, 0) or 0 for node in nodes], dtype=np.int64)
+    parent_idx = np.array([position_of.get(parents.get(node), -1) for node in nodes], dtype=np.int64)
+
+    positions[:, 1] = depth * LEVEL_SEPARATION
+    for level in np.unique(depth):
+        members = np.flatnonzero(depth == level)
+        # Order each row by the x of the parent, so subtrees stay together
+        has_parent = parent_idx[members] >= 0
+        keys = np.where(has_parent, positions[parent_idx[members], 0], 0.0)
+        order = members[np.argsort(keys, kind="stable")]
+        offsets = np.arange(len(order), dtype=np.float64) - (len(order) - 1) / 2.0
+        positions[order, 0] = offsets * NODE_SPACING
+
+    return positions
+
+def spring_layout(nodes: List[str], edges: List[Tuple[str, str]], initial: Optional[np.ndarray] = None,
+                  iterations: int = 50) -> np.ndarray:
+    """Fruchterman-Reingold force-directed layout computed with dense NumPy arrays
+
+    Args:
+        nodes: Node identifiers, defining the row order of the result
+        edges: Directed edges, treated as undirected springs
+        initial: Optional (n, 2) starting positions
+        iterations: Number of cooling steps
+
+    Returns:
+        np.ndarray: An (n, 2) array of x, y coordinates
+    """
+    n = len(nodes)
+    if n <= 1:
+        return np.zeros((n, 2), dtype=np.float64)
+
+    position_of = {node: i for i, node in enumerate(nodes)}
+    adjacency = np.zeros((n, n), dtype=np.float64)
+    for source, target in edges:
+        i, j = position_of.get(source), position_of.get(target)
+        if i is not None and j is not None and i != j:
+            adjacency[i, j] = adjacency[j, i] = 1.0
+
+    rng = np.random.default_rng(0)
+    if initial is None:
+        positions = rng.random((n, 2))
+    else:
+        span = np.ptp(initial, axis=0)
+        span[span == 0] = 1.0
+        positions = (initial - initial.min(axis=0)) / span
+        positions += rng.random((n, 2)) * 1e-3
+
+    k = np.sqrt(1.0 / n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        delta = positions[:, None, :] - positions[None, :, :]
+        distance = np.linalg.norm(delta, axis=-1)
+        np.clip(distance, 0.01, None, out=distance)
+        # Repulsion between every pair, attraction along edges
+        force = k * k / distance - adjacency * distance * distance / k
+        displacement = np.einsum("ijk,ij->ik", delta, force / distance)
+        length = np.linalg.norm(displacement, axis=-1)
+        np.clip(length, 0.01, None, out=length)
+        positions += displacement * (temperature / length)[:, None]
+        temperature -= cooling
+
+    # Scale to canvas units so node spacing is comparable to the hierarchical layout
+    positions -= positions.mean(axis=0)
+    scale = np.sqrt(n) * NODE_SPACING / max(np.ptp(positions, axis=0).max(), 1e-9)
+    return positions * scale
+
+def compute_layout(nodes: List[str], edges: List[Tuple[str, str]], depths: Dict[str, int],
+                   parents: Dict[str, Optional[str]], method: str = "hierarchical") -> Dict[str, List[float]]:
+    """Compute node coordinates for the graph visualization
+
+    Args:
+        nodes: Node identifiers
+        edges: Directed edges between nodes
+        depths: Crawl depth of each node
+        parents: Crawl-tree parent of each node
+        method: "hierarchical" or "spring"
+
+    Returns:
+        Dict[str, List[float]]: Map of node to [x, y]
+    """
+    positions = hierarchical_layout(nodes, depths, parents)
+    if method == "spring":
+        if len(nodes) <= MAX_SPRING_NODES:
+            positions = spring_layout(nodes, edges, initial=positions)
+        else:
+            logger.warning(f"Graph has {len(nodes)} nodes, using hierarchical layout instead of spring")
+    elif method != "hierarchical":
+        logger.warning(f"Unknown layout method '{method}', using hierarchical layout")
+
+    return {node: [round(float(x), 1), round(float(y), 1)] for node, (x, y) in zip(nodes, positions)}
@@ -0,0 +1,249 @@
+import time
+import logging
+import threading
+import yaml
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Optional, Any, Callable
+from app.core.explorations import save_structure
+from app.core.storage import StorageBackend, get_storage
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.persistence")
+
+def load_persistence_config(config_file: str = "config.yaml") -> Dict[str, Any]:
+    """Read the persistence section of the configuration file"""
+    with open(config_file, "r") as file:
+        config = yaml.safe_load(file) or {}
+    return config.get("persistence") or {}
+
+class _Job:
+    """An analysis result waiting to be persisted, and its durability status"""
+
+    def __init__(self, exploration_id: str, structure: Dict[str, Any], save_to_storage: bool):
+        self.exploration_id = exploration_id
+        self.structure = structure
+        self.status = {
+            "exploration_id": exploration_id,
+            "state": "pending",
+            "files": "pending",
+            "storage": "pending" if save_to_storage else "skipped",
+            "storage_id": None,
+            "attempts": 0,
+            "error": None,
+            "queued_at": datetime.now().isoformat(),
+            "persisted_at": None
+        }
+        self.next_attempt = 0.0
+        self.files_written = threading.Event()
+
+class PersistenceQueue:
+    """Write-behind persistence of analysis results
+
+    submit() only records the result, so a request can answer as soon as
+    the analysis is done. A background thread then writes the structure
+    files and saves the exploration to the storage backend, a batch of
+    results at a time, retrying failed steps with exponential backoff.
+    status() reports how far each exploration got.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 storage_factory: Callable[[], StorageBackend] = get_storage):
+        """Create the queue
+
+        Args:
+            config: Persistence settings, defaults to the persistence section of config.yaml
+            storage_factory: Returns the backend explorations are saved to
+        """
+        self.config = config if config is not None else load_persistence_config()
+        self.storage_factory = storage_factory
+        self.save_to_storage = self.config.get("save_to_storage", True)
+        self.batch_size = self.config.get("batch_size", 8)
+        self.max_attempts = self.config.get("max_attempts", 5)
+        self.retry_delay = self.config.get("retry_delay_seconds", 2.0)
+        self.max_tracked = self.config.get("max_tracked", 1000)
+        # How long a read of a just-analyzed exploration waits for its files
+        self.files_wait = self.config.get("files_wait_seconds", 30.0)
+        self._queue = deque()
+        self._jobs: Dict[str, _Job] = {}
+        # Finished jobs, oldest first, trimmed to max_tracked
+        self._finished = OrderedDict()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def submit(self, exploration_id: str, structure: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue the website structure of an analysis for persistence
+
+        Returns:
+            Dict[str, Any]: The durability status of the exploration
+        """
+        job = _Job(exploration_id, structure, self.save_to_storage)
+        with self._condition:
+            self._finished.pop(exploration_id, None)
+            self._jobs[exploration_id] = job
+            self._queue.append(job)
+            self._condition.notify()
+            return dict(job.status)
+
+    def status(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+        """Get the durability status of an exploration, or None if it was not submitted recently"""
+        with self._condition:
+            job = self._jobs.get(exploration_id) or self._finished.get(exploration_id)
+            return dict(job.status) if job else None
+
+    def wait_for_files(self, exploration_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until the structure files of a queued exploration are written
+
+        Returns:
+            bool: False if they are still not written after timeout seconds
+        """
+        with self._condition:
+            job = self._jobs.get(exploration_id)
+        return job is None or job.files_written.wait(timeout)
+
+    def files_pending(self, exploration_id: str) -> bool:
+        """Whether the structure files of an exploration are queued but not written yet"""
+        with self._condition:
+            job = self._jobs.get(exploration_id)
+        return job is not None and not job.files_written.is_set()
+
+    def _next_batch(self):
+        """Wait for jobs that are due and take up to batch_size of them, or None once stopped and empty"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                due = [job for job in self._queue if self._stopping or job.next_attempt <= now]
+                if due:
+                    batch = due[:self.batch_size]
+                    for job in batch:
+                        self._queue.remove(job)
+                    return batch
+                if self._stopping:
+                    return None
+                wake = min((job.next_attempt for job in self._queue), default=None)
+                self._condition.wait(None if wake is None else max(wake - now, 0))
+
+    def _write_files(self, job: _Job):
+        if job.status["files"] == "done":
+            return
+        save_structure(job.exploration_id, job.structure)
+        job.status["files"] = "done"
+        job.files_written.set()
+
+    def _save(self, job: _Job, storage: StorageBackend):
+        if job.status["storage"] != "pending":
+            return
+        # Saved under the ID of the analysis, so a retry after a partial save replaces it
+        job.status["storage_id"] = storage.save_exploration(job.structure.get("url", ""), job.structure,
+                                                            job.exploration_id)
+        job.status["storage"] = "done"
+
+    def _finish(self, job: _Job, state: str):
+        with self._condition:
+            job.status["state"] = state
+            job.status["persisted_at"] = datetime.now().isoformat() if state == "durable" else None
+            # Nothing reads the result any more, only its status is kept
+            job.structure = None
+            # Unless the exploration was analyzed again in the meantime
+            if self._jobs.get(job.exploration_id) is job:
+                del self._jobs[job.exploration_id]
+                self._finished[job.exploration_id] = job
+                while len(self._finished) > self.max_tracked:
+                    self._finished.popitem(last=False)
+        # Readers waiting for files that could not be written get their 404 now
+        job.files_written.set()
+
+    def _retry(self, job: _Job, error: Exception):
+        job.status["error"] = str(error)
+        if job.status["attempts"] >= self.max_attempts or self._stopping:
+            logger.error(f"Giving up persisting exploration {job.exploration_id} after "
+                         f"{job.status['attempts']} attempts: {str(error)}")
+            for step in ("files", "storage"):
+                if job.status[step] == "pending":
+                    job.status[step] = "failed"
+            self._finish(job, "failed")
+            return
+        delay = self.retry_delay * 2 ** (job.status["attempts"] - 1)
+        logger.warning(f"Persisting exploration {job.exploration_id} failed, retrying in {delay:g}s: {str(error)}")
+        with self._condition:
+            job.status["state"] = "retrying"
+            job.next_attempt = time.monotonic() + delay
+            self._queue.append(job)
+
+    def _process_batch(self, batch):
+        """Persist a batch of jobs: files first, then one storage check for all database saves"""
+        storage = None
+        storage_error = None
+        for job in batch:
+            job.status["attempts"] += 1
+            try:
+                self._write_files(job)
+            except Exception as e:
+                logger.error(f"Error writing files of exploration {job.exploration_id}: {str(e)}", exc_info=True)
+                self._retry(job, e)
+                continue
+
+            if job.status["storage"] == "pending":
+                if storage is None and storage_error is None:
+                    try:
+                        storage = self.storage_factory()
+                        if not storage.ping():
+                            storage_error = ConnectionError("Storage unavailable")
+                    except Exception as e:
+                        storage_error = e
+                if storage_error is not None:
+                    self._retry(job, storage_error)
+                    continue
+                try:
+                    self._save(job, storage)
+                except Exception as e:
+                    logger.error(f"Error saving exploration {job.exploration_id}: {str(e)}", exc_info=True)
+                    self._retry(job, e)
+                    continue
+
+            job.status["error"] = None
+            self._finish(job, "durable")
+            logger.info(f"Persisted exploration {job.exploration_id}")
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._process_batch(batch)
+            except Exception as e:
+                # Never let the worker die with jobs in the queue
+                logger.error(f"Error in persistence worker: {str(e)}", exc_info=True)
+
+    def start(self):
+        """Start the background worker"""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="persistence-queue", daemon=True)
+            self._thread.start()
+        logger.info("Persistence queue started")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Persist what is still queued, without waiting for retry delays, then stop the worker"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+_persistence_queue = None
+_persistence_queue_lock = threading.Lock()
+
+def get_persistence_queue() -> PersistenceQueue:
+    """Get the shared queue configured in the persistence section of config.yaml, started on first use"""
+    global _persistence_queue
+    with _persistence_queue_lock:
+        if _persistence_queue is None:
+            _persistence_queue = PersistenceQueue()
+        _persistence_queue.start()
+        return _persistence_queue
@@ -0,0 +1,210 @@
+import os
+import time
+import logging
+import threading
+import yaml
+from typing import Dict, Optional, Any, Callable
+from app.core.storage import StorageBackend, get_storage
+from app.core.explorations import EXPLORATIONS_DIR, list_exploration_files, delete_exploration_files
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.retention")
+
+DEFAULT_ARTIFACT_DIRS = [
+    {"path": "./app/static/temp", "max_megabytes": 50, "max_age_days": 7},
+    {"path": "./app/static/test_cases", "max_megabytes": 200, "max_age_days": 30}
+]
+
+def load_retention_config(config_file: str = "config.yaml") -> Dict[str, Any]:
+    """Read the retention section of the configuration file"""
+    with open(config_file, "r") as file:
+        config = yaml.safe_load(file) or {}
+    return config.get("retention") or {}
+
+def evict_directory(path: str, max_bytes: Optional[int] = None,
+                    max_age_seconds: Optional[float] = None) -> Dict[str, int]:
+    """Delete the files of a directory that are too old or do not fit its size budget
+
+    Files older than max_age_seconds go first, then the oldest remaining files
+    until the directory holds at most max_bytes. Subdirectories and hidden
+    files are left alone.
+
+    Args:
+        path: Directory to clean
+        max_bytes: Size budget for the files of the directory, None for no limit
+        max_age_seconds: Maximum file age by modification time, None for no limit
+
+    Returns:
+        Dict[str, int]: Number of files deleted, bytes freed and bytes kept
+    """
+    report = {"files": 0, "bytes": 0, "kept_bytes": 0}
+    if not os.path.isdir(path):
+        return report
+
+    files = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    oldest_allowed = time.time() - max_age_seconds if max_age_seconds else None
+    for mtime, size, file_path in files:
+        too_old = oldest_allowed is not None and mtime < oldest_allowed
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            # Files are sorted by age, so everything from here on is kept
+            break
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not delete {file_path}: {str(e)}")
+            continue
+        total -= size
+        report["files"] += 1
+        report["bytes"] += size
+
+    report["kept_bytes"] = total
+    return report
+
+def evict_explorations(max_bytes: Optional[int] = None,
+                       max_age_seconds: Optional[float] = None) -> Dict[str, int]:
+    """Delete the exploration directories that are too old or do not fit the size budget
+
+    Works like evict_directory, but an exploration's files are deleted
+    together, by the time its newest file was written.
+
+    Args:
+        max_bytes: Size budget for all exploration files, None for no limit
+        max_age_seconds: Maximum exploration age, None for no limit
+
+    Returns:
+        Dict[str, int]: Number of explorations deleted, bytes freed and bytes kept
+    """
+    report = {"explorations": 0, "bytes": 0, "kept_bytes": 0}
+    explorations = sorted(list_exploration_files(), key=lambda exploration: exploration["modified"])
+
+    total = sum(exploration["bytes"] for exploration in explorations)
+    oldest_allowed = time.time() - max_age_seconds if max_age_seconds else None
+    for exploration in explorations:
+        too_old = oldest_allowed is not None and exploration["modified"] < oldest_allowed
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big):
+            break
+        try:
+            delete_exploration_files(exploration["exploration_id"])
+        except OSError as e:
+            logger.warning(f"Could not delete exploration {exploration['exploration_id']}: {str(e)}")
+            continue
+        total -= exploration["bytes"]
+        report["explorations"] += 1
+        report["bytes"] += exploration["bytes"]
+
+    report["kept_bytes"] = total
+    return report
+
+class RetentionCompactor:
+    """Keeps stored artifacts within the limits of the retention configuration
+
+    Each run trims the artifact directories and the exploration files by age
+    and size and deletes old generated code versions from the storage
+    backend. start() repeats the run on a daemon thread every
+    compaction_interval_minutes.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 storage_factory: Callable[[], StorageBackend] = get_storage):
+        """Create the compactor
+
+        Args:
+            config: Retention settings, defaults to the retention section of config.yaml
+            storage_factory: Returns the backend whose generated code is compacted
+        """
+        self.config = config if config is not None else load_retention_config()
+        self.storage_factory = storage_factory
+        self.interval = self.config.get("compaction_interval_minutes", 60) * 60
+        self._stop = threading.Event()
+        self._thread = None
+
+    def compact_artifacts(self) -> Dict[str, Dict[str, int]]:
+        """Apply the size and age limits of every configured artifact directory"""
+        reports = {}
+        for directory in self.config.get("artifact_dirs", DEFAULT_ARTIFACT_DIRS):
+            max_megabytes = directory.get("max_megabytes")
+            max_age_days = directory.get("max_age_days")
+            reports[directory["path"]] = evict_directory(
+                directory["path"],
+                max_bytes=int(max_megabytes * 1024 * 1024) if max_megabytes else None,
+                max_age_seconds=max_age_days * 86400 if max_age_days else None
+            )
+        return reports
+
+    def compact_explorations(self) -> Dict[str, int]:
+        """Apply the size and age limits of the explorations setting to the exploration files"""
+        limits = self.config.get("explorations") or {}
+        max_megabytes = limits.get("max_megabytes")
+        max_age_days = limits.get("max_age_days")
+        return evict_explorations(
+            max_bytes=int(max_megabytes * 1024 * 1024) if max_megabytes else None,
+            max_age_seconds=max_age_days * 86400 if max_age_days else None
+        )
+
+    def compact_storage(self) -> Optional[int]:
+        """Delete old generated code versions, or return None if the backend is unavailable"""
+        storage = self.storage_factory()
+        if not storage.ping():
+            logger.warning("Storage unavailable, skipping generated code compaction")
+            return None
+        return storage.compact_generated_code(
+            self.config.get("code_versions_per_test_case", 5),
+            self.config.get("superseded_code_ttl_days", 0)
+        )
+
+    def run_once(self) -> Dict[str, Any]:
+        """Run one compaction pass and return what it deleted"""
+        report = {"artifacts": {}, "explorations": None, "code_versions_deleted": None}
+        try:
+            report["artifacts"] = self.compact_artifacts()
+            freed = sum(r["bytes"] for r in report["artifacts"].values())
+            files = sum(r["files"] for r in report["artifacts"].values())
+            logger.info(f"Evicted {files} artifact files ({freed} bytes)")
+        except Exception as e:
+            logger.error(f"Error evicting artifact files: {str(e)}", exc_info=True)
+        try:
+            report["explorations"] = self.compact_explorations()
+            logger.info(f"Evicted {report['explorations']['explorations']} explorations from {EXPLORATIONS_DIR} "
+                        f"({report['explorations']['bytes']} bytes)")
+        except Exception as e:
+            logger.error(f"Error evicting exploration files: {str(e)}", exc_info=True)
+        try:
+            report["code_versions_deleted"] = self.compact_storage()
+        except Exception as e:
+            logger.error(f"Error compacting stored code: {str(e)}", exc_info=True)
+        return report
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Run the compaction now and then every interval on a background thread,
+        unless compaction_interval_minutes is 0"""
+        if not self.interval or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention-compactor", daemon=True)
+        self._thread.start()
+        logger.info(f"Retention compactor started, every {self.interval / 60:g} minutes")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread after its current pass"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
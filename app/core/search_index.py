@@ -0,0 +1,318 @@
+import os
+import re
+import json
+import base64
+import sqlite3
+import logging
+import threading
+import yaml
+from typing import Dict, List, Optional, Any
+from app.core.storage import InvalidCursorError, page_content_hash
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.search-index")
+
+SEARCH_KINDS = ("page", "test_case", "code")
+
+_SCHEMA = """
+-- One row per indexed text; pages are keyed by content hash so a page shared
+-- by several explorations is tokenized and stored once
+CREATE TABLE IF NOT EXISTS search_docs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_text USING fts5 (
+    title, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+
+-- Where each text appears: page URL or test case ID within an exploration
+CREATE TABLE IF NOT EXISTS search_refs (
+    doc_id INTEGER NOT NULL,
+    exploration_id TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    PRIMARY KEY (exploration_id, ref, doc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_search_refs_doc ON search_refs (doc_id);
+"""
+
+# SQLite's default limit of host parameters per statement is 999 on older builds
+_BATCH = 500
+
+def load_search_config(config_file: str = "config.yaml") -> Dict[str, Any]:
+    """Read the search section of the configuration file"""
+    with open(config_file, "r") as file:
+        config = yaml.safe_load(file) or {}
+    return config.get("search") or {}
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching records that contain every word
+
+    Words are quoted, so FTS5 operators and punctuation typed by the user are
+    searched as text. Returns None if the text has no words.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+def _text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(item) for item in value)
+    return str(value) if value is not None else ""
+
+def _page_text(page: Dict[str, Any]):
+    body = "\n".join(filter(None, (_text(page.get("headers")), _text(page.get("text_content")))))
+    return _text(page.get("title")), body
+
+def _test_case_text(test_case: Dict[str, Any]):
+    body = "\n".join(filter(None, (_text(test_case.get("description")), _text(test_case.get("steps")),
+                                    _text(test_case.get("expected_results")))))
+    return _text(test_case.get("title")), body
+
+def _encode_offset(offset: int) -> str:
+    raw = json.dumps(["search", offset]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_offset(cursor: str) -> int:
+    try:
+        tag, offset = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if tag != "search" or not isinstance(offset, int) or offset < 0:
+            raise ValueError(cursor)
+        return offset
+    except Exception:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+
+class SearchIndex:
+    """Full-text index of saved page titles, headers and text, test cases and generated code
+
+    Kept in its own SQLite FTS5 file next to whichever storage backend is in
+    use, and updated by the backend's save and delete methods. Only the
+    newest code of each test case is indexed. The index holds nothing that
+    is not in storage, so it can be deleted and rebuilt with rebuild().
+    """
+
+    def __init__(self, path: str = "./data/search_index.db"):
+        """Open (and create if needed) the index
+
+        Args:
+            path: Index file, or ":memory:" for a private in-memory index
+        """
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.path = path
+            # One connection shared by the worker threads, serialized by a lock
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(_SCHEMA)
+            self._lock = threading.RLock()
+            logger.info(f"Opened search index: {path}")
+        except Exception as e:
+            logger.error(f"Failed to open search index {path}: {str(e)}", exc_info=True)
+            raise
+
+    def _doc_ids(self, keys: List[str]) -> Dict[str, int]:
+        doc_ids = {}
+        for start in range(0, len(keys), _BATCH):
+            batch = keys[start:start + _BATCH]
+            rows = self.conn.execute(
+                f"SELECT key, id FROM search_docs WHERE key IN ({', '.join('?' * len(batch))})", batch
+            )
+            doc_ids.update((row["key"], row["id"]) for row in rows)
+        return doc_ids
+
+    def _put_doc(self, kind: str, key: str, title: str, body: str) -> int:
+        """Insert or replace the text stored under key and return its doc ID"""
+        row = self.conn.execute("SELECT id FROM search_docs WHERE key = ?", (key,)).fetchone()
+        if row:
+            self.conn.execute("UPDATE search_text SET title = ?, body = ? WHERE rowid = ?", (title, body, row["id"]))
+            return row["id"]
+        doc_id = self.conn.execute("INSERT INTO search_docs (kind, key) VALUES (?, ?)", (kind, key)).lastrowid
+        self.conn.execute("INSERT INTO search_text (rowid, title, body) VALUES (?, ?, ?)", (doc_id, title, body))
+        return doc_id
+
+    def _drop_unreferenced(self, doc_ids: List[int]):
+        """Remove the texts of doc_ids that no exploration refers to any more"""
+        for start in range(0, len(doc_ids), _BATCH):
+            batch = doc_ids[start:start + _BATCH]
+            orphans = [(row["id"],) for row in self.conn.execute(
+                f"SELECT id FROM search_docs WHERE id IN ({', '.join('?' * len(batch))}) "
+                "AND NOT EXISTS (SELECT 1 FROM search_refs WHERE doc_id = search_docs.id)", batch
+            )]
+            self.conn.executemany("DELETE FROM search_text WHERE rowid = ?", orphans)
+            self.conn.executemany("DELETE FROM search_docs WHERE id = ?", orphans)
+
+    def index_pages(self, exploration_id: str, pages: Dict[str, Dict[str, Any]],
+                    hashes: Optional[Dict[str, str]] = None):
+        """Index the pages of a saved exploration
+
+        Only pages whose content is not indexed yet are tokenized; the rest
+        just get a reference to the existing text.
+
+        Args:
+            exploration_id: The ID of the exploration
+            pages: Page records keyed by URL
+            hashes: Content hash of each page if already computed, see page_content_hash
+        """
+        try:
+            hashes = hashes or {page_url: page_content_hash(page) for page_url, page in pages.items()}
+            keys = {page_url: f"page:{content_hash}" for page_url, content_hash in hashes.items()}
+            with self._lock, self.conn:
+                doc_ids = self._doc_ids(list(set(keys.values())))
+                for page_url, key in keys.items():
+                    if key not in doc_ids:
+                        doc_ids[key] = self._put_doc("page", key, *_page_text(pages[page_url]))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO search_refs (doc_id, exploration_id, ref) VALUES (?, ?, ?)",
+                    ((doc_ids[key], exploration_id, page_url) for page_url, key in keys.items())
+                )
+            logger.info(f"Indexed {len(pages)} pages of exploration {exploration_id}")
+        except Exception as e:
+            logger.error(f"Error indexing pages of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def index_test_cases(self, exploration_id: str, test_cases: List[Dict[str, Any]]):
+        """Index the test cases of an exploration, replacing earlier text for the same test case IDs"""
+        try:
+            with self._lock, self.conn:
+                for test_case in test_cases:
+                    ref = str(test_case.get("id"))
+                    doc_id = self._put_doc("test_case", f"test_case:{exploration_id}:{ref}", *_test_case_text(test_case))
+                    self.conn.execute("INSERT OR IGNORE INTO search_refs (doc_id, exploration_id, ref) VALUES (?, ?, ?)",
+                                      (doc_id, exploration_id, ref))
+            logger.info(f"Indexed {len(test_cases)} test cases of exploration {exploration_id}")
+        except Exception as e:
+            logger.error(f"Error indexing test cases of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def index_code(self, exploration_id: str, test_case_id: int, code: str):
+        """Index the newest code generated for a test case, replacing the previous version"""
+        try:
+            ref = str(test_case_id)
+            with self._lock, self.conn:
+                doc_id = self._put_doc("code", f"code:{exploration_id}:{ref}", f"Test case {ref}", code)
+                self.conn.execute("INSERT OR IGNORE INTO search_refs (doc_id, exploration_id, ref) VALUES (?, ?, ?)",
+                                  (doc_id, exploration_id, ref))
+        except Exception as e:
+            logger.error(f"Error indexing code of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def remove_exploration(self, exploration_id: str):
+        """Remove an exploration from the index, and the texts no other exploration shares"""
+        try:
+            with self._lock, self.conn:
+                doc_ids = [row["doc_id"] for row in self.conn.execute(
+                    "SELECT DISTINCT doc_id FROM search_refs WHERE exploration_id = ?", (exploration_id,)
+                )]
+                self.conn.execute("DELETE FROM search_refs WHERE exploration_id = ?", (exploration_id,))
+                self._drop_unreferenced(doc_ids)
+        except Exception as e:
+            logger.error(f"Error removing exploration {exploration_id} from the index: {str(e)}", exc_info=True)
+            raise
+
+    def search(self, query: str, kind: Optional[str] = None, exploration_id: Optional[str] = None,
+               limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Find pages, test cases and code containing every word of query, best matches first
+
+        Args:
+            query: Free text, matched word by word ignoring case and accents
+            kind: Only return "page", "test_case" or "code" results
+            exploration_id: Only return results of this exploration
+            limit: Maximum number of results
+            cursor: next_cursor of the previous page of results
+
+        Returns:
+            Dict[str, Any]: {"items": [...], "next_cursor": str or None}; each item
+            has kind, exploration_id, ref (page URL or test case ID), title and a
+            snippet with the matches in [brackets]
+        """
+        try:
+            offset = _decode_offset(cursor) if cursor else 0
+            expression = match_expression(query)
+            if expression is None:
+                return {"items": [], "next_cursor": None}
+
+            sql = ("SELECT d.kind, r.exploration_id, r.ref, t.title, "
+                   "snippet(search_text, 1, '[', ']', '...', 16) AS snippet "
+                   "FROM search_text t JOIN search_docs d ON d.id = t.rowid JOIN search_refs r ON r.doc_id = t.rowid "
+                   "WHERE search_text MATCH ?")
+            params = [expression]
+            if kind:
+                sql += " AND d.kind = ?"
+                params.append(kind)
+            if exploration_id:
+                sql += " AND r.exploration_id = ?"
+                params.append(exploration_id)
+            # One extra row tells whether there is a next page
+            sql += " ORDER BY t.rank, t.rowid, r.exploration_id, r.ref LIMIT ? OFFSET ?"
+            params.extend((limit + 1, offset))
+
+            with self._lock:
+                rows = self.conn.execute(sql, params).fetchall()
+            items = [dict(row) for row in rows[:limit]]
+            return {"items": items, "next_cursor": _encode_offset(offset + limit) if len(rows) > limit else None}
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error searching for {query!r}: {str(e)}", exc_info=True)
+            raise
+
+    def rebuild(self, storage) -> int:
+        """Empty the index and index everything in a storage backend again
+
+        Args:
+            storage: The StorageBackend to read from
+
+        Returns:
+            int: Number of explorations indexed
+        """
+        try:
+            with self._lock, self.conn:
+                for table in ("search_refs", "search_docs", "search_text"):
+                    self.conn.execute(f"DELETE FROM {table}")
+
+            count = 0
+            cursor = None
+            while True:
+                page = storage.list_explorations_page(100, cursor)
+                for exploration in page["items"]:
+                    exploration_id = exploration["_id"]
+                    self.index_pages(exploration_id, storage.get_pages(exploration_id))
+                    self.index_test_cases(exploration_id, storage.get_test_cases(exploration_id))
+                    # Newest code of each test case comes first
+                    indexed = set()
+                    for code in storage.get_all_generated_code(exploration_id):
+                        if code["test_case_id"] not in indexed:
+                            indexed.add(code["test_case_id"])
+                            self.index_code(exploration_id, code["test_case_id"], code["code"])
+                    count += 1
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+            logger.info(f"Rebuilt search index with {count} explorations")
+            return count
+        except Exception as e:
+            logger.error(f"Error rebuilding search index: {str(e)}", exc_info=True)
+            raise
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+def get_search_index() -> Optional[SearchIndex]:
+    """Get the index configured in the search section of config.yaml, or None if disabled"""
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            search_config = load_search_config()
+            if not search_config.get("enabled", True):
+                return None
+            _search_index = SearchIndex(search_config.get("index_path", "./data/search_index.db"))
+        return _search_index
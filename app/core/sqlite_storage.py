@@ -0,0 +1,763 @@
+import os
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any
+from app.core.storage import StorageBackend, InvalidCursorError, page_blob, split_page_record, join_page_record, encode_cursor, decode_cursor, split_exploration_data, join_exploration_data
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.sqlite-storage")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS explorations (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    domain TEXT,
+    name TEXT,
+    created_at TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    pages_field TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_explorations_url_created ON explorations (url, created_at);
+CREATE INDEX IF NOT EXISTS idx_explorations_created ON explorations (created_at);
+
+-- Each distinct page content once, refs counts the pages rows pointing to it
+CREATE TABLE IF NOT EXISTS page_blobs (
+    hash TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    refs INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS pages (
+    exploration_id TEXT NOT NULL REFERENCES explorations (id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    placement TEXT NOT NULL,  -- position fields of the record (parent, depth, paths, links) in this exploration
+    PRIMARY KEY (exploration_id, url)
+);
+
+CREATE TRIGGER IF NOT EXISTS pages_add_blob_ref AFTER INSERT ON pages BEGIN
+    UPDATE page_blobs SET refs = refs + 1 WHERE hash = NEW.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS pages_release_blob_ref AFTER DELETE ON pages BEGIN
+    UPDATE page_blobs SET refs = refs - 1 WHERE hash = OLD.content_hash;
+    DELETE FROM page_blobs WHERE hash = OLD.content_hash AND refs <= 0;
+END;
+
+CREATE TABLE IF NOT EXISTS graphs (
+    exploration_id TEXT PRIMARY KEY REFERENCES explorations (id) ON DELETE CASCADE,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS test_cases (
+    id TEXT PRIMARY KEY,
+    exploration_id TEXT NOT NULL REFERENCES explorations (id) ON DELETE CASCADE,
+    test_case_id INTEGER,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_test_cases_exploration_test_case ON test_cases (exploration_id, test_case_id);
+CREATE INDEX IF NOT EXISTS idx_test_cases_exploration_created ON test_cases (exploration_id, created_at);
+
+CREATE TABLE IF NOT EXISTS generated_code (
+    id TEXT PRIMARY KEY,
+    exploration_id TEXT NOT NULL REFERENCES explorations (id) ON DELETE CASCADE,
+    test_case_id INTEGER,
+    test_case_mongo_id TEXT,
+    created_at TEXT NOT NULL,
+    code TEXT NOT NULL,
+    language TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_generated_code_exploration_test_case
+    ON generated_code (exploration_id, test_case_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_generated_code_exploration_created ON generated_code (exploration_id, created_at);
+"""
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+def _page_from_row(row) -> Dict[str, Any]:
+    return join_page_record(json.loads(row["data"]), json.loads(row["placement"]))
+
+class SQLiteStorage(StorageBackend):
+    """Storage backend on a local SQLite file, for single-node deployments and tests
+
+    Each page of an exploration is its own row and the graph fields are kept
+    in a separate table, so either can be read without the rest. Page rows
+    keep the position of the page in the crawl and point to its content in
+    page_blobs by hash, so a page whose content is the same in several
+    explorations is stored once.
+    """
+
+    def __init__(self, path: str = "./data/web_analysis.db"):
+        """Open (and create if needed) the SQLite database
+
+        Args:
+            path: Database file, or ":memory:" for a private in-memory database
+        """
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.path = path
+            # One connection shared by the worker threads, serialized by a lock
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            self.conn.executescript(_SCHEMA)
+            self._lock = threading.RLock()
+            logger.info(f"Opened SQLite database: {path}")
+        except Exception as e:
+            logger.error(f"Failed to open SQLite database {path}: {str(e)}", exc_info=True)
+            raise
+
+    def _insert_pages(self, pages):
+        """Insert (exploration_id, url, position, record) rows, storing each distinct content once"""
+        rows = []
+        blobs = {}
+        for exploration_id, page_url, position, page in pages:
+            content, placement = split_page_record(page)
+            content_hash, canonical = page_blob(content)
+            blobs[content_hash] = canonical
+            rows.append((exploration_id, page_url, position, content_hash, _dumps(placement)))
+        self.conn.executemany("INSERT INTO page_blobs (hash, data) VALUES (?, ?) ON CONFLICT (hash) DO NOTHING",
+                              blobs.items())
+        # The pages_add_blob_ref trigger counts the references
+        self.conn.executemany(
+            "INSERT INTO pages (exploration_id, url, position, content_hash, placement) VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+    def _exploration_from_row(self, row, include_data: bool = False, include_pages: bool = True,
+                              include_graph: bool = True) -> Dict[str, Any]:
+        exploration = {
+            "_id": row["id"],
+            "url": row["url"],
+            "domain": row["domain"],
+            "name": row["name"],
+            "created_at": datetime.fromisoformat(row["created_at"]),
+            "summary": json.loads(row["summary"])
+        }
+        if include_data:
+            pages = self._load_pages(row["id"]) if include_pages else None
+            graph = self._load_graph(row["id"]) if include_graph else None
+            exploration["data"] = join_exploration_data(json.loads(row["data"]), row["pages_field"], pages, graph)
+        return exploration
+
+    def _load_pages(self, exploration_id: str, urls: Optional[List[str]] = None,
+                    skip: int = 0, limit: int = 0) -> Dict[str, Any]:
+        query = ("SELECT p.url, p.placement, b.data FROM pages p JOIN page_blobs b ON b.hash = p.content_hash "
+                 "WHERE p.exploration_id = ?")
+        params = [exploration_id]
+        if urls is not None:
+            urls = list(urls)
+            query += f" AND p.url IN ({', '.join('?' * len(urls))})"
+            params.extend(urls)
+        query += " ORDER BY p.position LIMIT ? OFFSET ?"
+        params.extend((limit if limit > 0 else -1, skip))
+        rows = self.conn.execute(query, params)
+        return {row["url"]: _page_from_row(row) for row in rows}
+
+    def _load_graph(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT data FROM graphs WHERE exploration_id = ?", (exploration_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def _update_summary(self, exploration_id: str, **fields):
+        row = self.conn.execute("SELECT summary FROM explorations WHERE id = ?", (exploration_id,)).fetchone()
+        if row:
+            summary = json.loads(row["summary"])
+            summary.update(fields)
+            self.conn.execute("UPDATE explorations SET summary = ? WHERE id = ?", (_dumps(summary), exploration_id))
+
+    def save_exploration(self, url: str, data: Dict[str, Any], exploration_id: Optional[str] = None) -> str:
+        """Save website exploration data
+
+        Saving again under the same ID replaces the pages and graph of the
+        earlier save and keeps its creation time, test cases and code.
+
+        Args:
+            url: The URL of the explored website
+            data: The exploration data (structure, pages, etc.)
+            exploration_id: ID to save the exploration under, a new one if None
+
+        Returns:
+            str: The ID of the saved exploration
+        """
+        try:
+            exploration_id = exploration_id or _new_id()
+            header, pages_field, pages, graph = split_exploration_data(data)
+            summary = {
+                "page_count": len(pages),
+                "has_test_cases": False,
+                "has_generated_code": False,
+                "test_case_count": 0
+            }
+
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT INTO explorations (id, url, domain, name, created_at, summary, pages_field, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET url = excluded.url, domain = excluded.domain, "
+                    "name = excluded.name, pages_field = excluded.pages_field, data = excluded.data, "
+                    "summary = json_set(summary, '$.page_count', ?)",
+                    (exploration_id, url, data.get("domain", ""), data.get("domain", url),
+                     datetime.now().isoformat(), _dumps(summary), pages_field, _dumps(header), len(pages))
+                )
+                self.conn.execute("INSERT OR REPLACE INTO graphs (exploration_id, data) VALUES (?, ?)",
+                                  (exploration_id, _dumps(graph)))
+                self.conn.execute("DELETE FROM pages WHERE exploration_id = ?", (exploration_id,))
+                self._insert_pages((exploration_id, page_url, position, page)
+                                   for position, (page_url, page) in enumerate(pages.items()))
+            if pages:
+                self._update_search_index("index_pages", exploration_id, pages)
+
+            logger.info(f"Saved exploration for {url} with ID: {exploration_id}")
+            return exploration_id
+        except Exception as e:
+            logger.error(f"Error saving exploration for {url}: {str(e)}", exc_info=True)
+            raise
+
+    def get_exploration(self, exploration_id: str, include_pages: bool = True,
+                        include_graph: bool = True) -> Optional[Dict[str, Any]]:
+        """Get exploration by ID
+
+        Args:
+            exploration_id: The ID of the exploration to retrieve
+            include_pages: Load the page records
+            include_graph: Load the hierarchy, paths and layout
+
+        Returns:
+            Optional[Dict[str, Any]]: The exploration data or None if not found
+        """
+        try:
+            with self._lock:
+                row = self.conn.execute("SELECT * FROM explorations WHERE id = ?", (exploration_id,)).fetchone()
+                if not row:
+                    logger.warning(f"Exploration with ID {exploration_id} not found")
+                    return None
+                exploration = self._exploration_from_row(row, True, include_pages, include_graph)
+            logger.info(f"Retrieved exploration with ID: {exploration_id}")
+            return exploration
+        except Exception as e:
+            logger.error(f"Error retrieving exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def get_exploration_by_url(self, url: str, include_pages: bool = True,
+                               include_graph: bool = True) -> Optional[Dict[str, Any]]:
+        """Get the most recent exploration for a URL
+
+        Args:
+            url: The URL to look for
+            include_pages: Load the page records
+            include_graph: Load the hierarchy, paths and layout
+
+        Returns:
+            Optional[Dict[str, Any]]: The exploration data or None if not found
+        """
+        try:
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT * FROM explorations WHERE url = ? ORDER BY created_at DESC LIMIT 1", (url,)
+                ).fetchone()
+                if not row:
+                    logger.info(f"No exploration found for URL: {url}")
+                    return None
+                exploration = self._exploration_from_row(row, True, include_pages, include_graph)
+            logger.info(f"Retrieved most recent exploration for URL: {url}")
+            return exploration
+        except Exception as e:
+            logger.error(f"Error retrieving exploration for URL {url}: {str(e)}", exc_info=True)
+            raise
+
+    def get_page(self, exploration_id: str, page_url: str) -> Optional[Dict[str, Any]]:
+        """Get the record of a single page of an exploration
+
+        Args:
+            exploration_id: The ID of the exploration
+            page_url: The URL of the page
+
+        Returns:
+            Optional[Dict[str, Any]]: The page record or None if not found
+        """
+        try:
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT p.placement, b.data FROM pages p JOIN page_blobs b ON b.hash = p.content_hash "
+                    "WHERE p.exploration_id = ? AND p.url = ?", (exploration_id, page_url)
+                ).fetchone()
+            return _page_from_row(row) if row else None
+        except Exception as e:
+            logger.error(f"Error retrieving page {page_url} of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def get_pages(self, exploration_id: str, urls: Optional[List[str]] = None,
+                  skip: int = 0, limit: int = 0) -> Dict[str, Dict[str, Any]]:
+        """Get page records of an exploration in crawl order
+
+        Args:
+            exploration_id: The ID of the exploration
+            urls: Only return these pages, all pages if None
+            skip: Number of pages to skip, for loading pages in batches
+            limit: Maximum number of pages to return, 0 for no limit
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Page records keyed by URL
+        """
+        try:
+            with self._lock:
+                return self._load_pages(exploration_id, urls, skip, limit)
+        except Exception as e:
+            logger.error(f"Error retrieving pages of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def get_page_hashes(self, exploration_id: str) -> Dict[str, str]:
+        """Get the content hash of every page of an exploration
+
+        Args:
+            exploration_id: The ID of the exploration
+
+        Returns:
+            Dict[str, str]: Content hashes keyed by URL, in crawl order
+        """
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT url, content_hash FROM pages WHERE exploration_id = ? ORDER BY position", (exploration_id,)
+                ).fetchall()
+            return {row["url"]: row["content_hash"] for row in rows}
+        except Exception as e:
+            logger.error(f"Error retrieving page hashes of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def get_graph(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+        """Get the hierarchy, paths and layout of an exploration
+
+        Args:
+            exploration_id: The ID of the exploration
+
+        Returns:
+            Optional[Dict[str, Any]]: The graph fields or None if not found
+        """
+        try:
+            with self._lock:
+                return self._load_graph(exploration_id)
+        except Exception as e:
+            logger.error(f"Error retrieving graph of exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def list_explorations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """List saved explorations, most recent first
+
+        Args:
+            limit: Maximum number of explorations to return
+
+        Returns:
+            List[Dict[str, Any]]: List of explorations
+        """
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT id, url, domain, name, created_at, summary FROM explorations ORDER BY created_at DESC LIMIT ?",
+                    (limit,)
+                ).fetchall()
+            explorations = [self._exploration_from_row(row) for row in rows]
+            logger.info(f"Retrieved {len(explorations)} explorations")
+            return explorations
+        except Exception as e:
+            logger.error(f"Error listing explorations: {str(e)}", exc_info=True)
+            raise
+
+    def _keyset_page(self, table: str, columns: str, where: str, params: tuple, limit: int,
+                     cursor: Optional[str], descending: bool, convert) -> Dict[str, Any]:
+        """Fetch one page of a (created_at, rowid) ordered listing
+
+        Every index on created_at also holds the rowid, so the query starts right
+        after the cursor's position on the index instead of skipping rows.
+        """
+        order = "DESC" if descending else "ASC"
+        query = f"SELECT rowid AS _rowid, {columns} FROM {table} WHERE {where}"
+        params = list(params)
+        if cursor:
+            created_at, key = decode_cursor(cursor)
+            if not isinstance(key, int):
+                raise InvalidCursorError(f"Invalid cursor: {cursor}")
+            query += f" AND (created_at, rowid) {'<' if descending else '>'} (?, ?)"
+            params.extend((created_at.isoformat(), key))
+        query += f" ORDER BY created_at {order}, rowid {order} LIMIT ?"
+        # One extra row tells whether there is a next page
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(datetime.fromisoformat(rows[-1]["created_at"]), rows[-1]["_rowid"])
+        return {"items": [convert(row) for row in rows], "next_cursor": next_cursor}
+
+    def list_explorations_page(self, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List saved explorations a page at a time, most recent first
+
+        Args:
+            limit: Maximum number of explorations in the page
+            cursor: next_cursor of the previous page, None for the first page
+
+        Returns:
+            Dict[str, Any]: {"items": explorations, "next_cursor": cursor or None}
+        """
+        try:
+            page = self._keyset_page("explorations", "id, url, domain, name, created_at, summary", "1", (),
+                                     limit, cursor, True, self._exploration_from_row)
+            logger.info(f"Retrieved {len(page['items'])} explorations")
+            return page
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing explorations: {str(e)}", exc_info=True)
+            raise
+
+    def list_test_cases_page(self, exploration_id: str, limit: int = 50,
+                             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List the test cases of an exploration a page at a time, in creation order
+
+        Args:
+            exploration_id: The ID of the exploration
+            limit: Maximum number of test cases in the page
+            cursor: next_cursor of the previous page, None for the first page
+
+        Returns:
+            Dict[str, Any]: {"items": test cases, "next_cursor": cursor or None}
+        """
+        try:
+            page = self._keyset_page("test_cases", "*", "exploration_id = ?", (exploration_id,),
+                                     limit, cursor, False, self._test_case_from_row)
+            logger.info(f"Retrieved {len(page['items'])} test cases for exploration {exploration_id}")
+            return page
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing test cases for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def list_generated_code_page(self, exploration_id: str, limit: int = 50,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List the code generated for an exploration a page at a time, newest first
+
+        Args:
+            exploration_id: The ID of the exploration
+            limit: Maximum number of code versions in the page
+            cursor: next_cursor of the previous page, None for the first page
+
+        Returns:
+            Dict[str, Any]: {"items": code versions without "code", "next_cursor": cursor or None}
+        """
+        try:
+            page = self._keyset_page(
+                "generated_code", "id, exploration_id, test_case_id, test_case_mongo_id, created_at, language, status",
+                "exploration_id = ?", (exploration_id,), limit, cursor, True, self._code_from_row
+            )
+            logger.info(f"Retrieved {len(page['items'])} generated code items for exploration {exploration_id}")
+            return page
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing generated code for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def delete_exploration(self, exploration_id: str) -> bool:
+        """Delete an exploration by ID, with its pages, test cases and generated code
+
+        Args:
+            exploration_id: The ID of the exploration to delete
+
+        Returns:
+            bool: True if deleted, False if not found
+        """
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.execute("DELETE FROM explorations WHERE id = ?", (exploration_id,))
+            self._update_search_index("remove_exploration", exploration_id)
+            if cursor.rowcount > 0:
+                logger.info(f"Deleted exploration with ID: {exploration_id}")
+                return True
+            logger.warning(f"Exploration with ID {exploration_id} not found for deletion")
+            return False
+        except Exception as e:
+            logger.error(f"Error deleting exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def save_test_cases(self, exploration_id: str, test_cases: List[Dict[str, Any]]) -> List[str]:
+        """Save test cases for an exploration
+
+        Args:
+            exploration_id: The ID of the exploration
+            test_cases: List of test cases to save
+
+        Returns:
+            List[str]: List of test case IDs
+        """
+        try:
+            created_at = datetime.now().isoformat()
+            rows = []
+            for test_case in test_cases:
+                rows.append((_new_id(), exploration_id, test_case.get("id"), created_at, _dumps({
+                    "title": test_case.get("title", "Untitled Test Case"),
+                    "description": test_case.get("description", ""),
+                    "steps": test_case.get("steps", []),
+                    "expected_results": test_case.get("expected_results", []),
+                    "status": "created",
+                    "has_generated_code": False
+                })))
+
+            with self._lock, self.conn:
+                if not self.conn.execute("SELECT 1 FROM explorations WHERE id = ?", (exploration_id,)).fetchone():
+                    logger.warning(f"Exploration {exploration_id} not found when saving test cases")
+                    return []
+                self.conn.executemany(
+                    "INSERT INTO test_cases (id, exploration_id, test_case_id, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._update_summary(exploration_id, has_test_cases=True, test_case_count=len(test_cases))
+            self._update_search_index("index_test_cases", exploration_id, test_cases)
+
+            logger.info(f"Saved {len(test_cases)} test cases for exploration {exploration_id}")
+            return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"Error saving test cases for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def save_generated_code(self, exploration_id: str, test_case_id: int, code: str) -> str:
+        """Save generated code for a test case
+
+        Args:
+            exploration_id: The ID of the exploration
+            test_case_id: The ID of the test case
+            code: The generated code
+
+        Returns:
+            str: The ID of the saved code
+        """
+        try:
+            with self._lock, self.conn:
+                if not self.conn.execute("SELECT 1 FROM explorations WHERE id = ?", (exploration_id,)).fetchone():
+                    logger.warning(f"Exploration {exploration_id} not found when saving generated code")
+                    return ""
+
+                test_case = self.conn.execute(
+                    "SELECT id, data FROM test_cases WHERE exploration_id = ? AND test_case_id = ? ORDER BY created_at, rowid LIMIT 1",
+                    (exploration_id, test_case_id)
+                ).fetchone()
+                test_case_row_id = None
+                if test_case:
+                    test_case_row_id = test_case["id"]
+                    test_case_data = json.loads(test_case["data"])
+                    test_case_data["has_generated_code"] = True
+                    self.conn.execute("UPDATE test_cases SET data = ? WHERE id = ?",
+                                      (_dumps(test_case_data), test_case_row_id))
+
+                code_id = _new_id()
+                self.conn.execute(
+                    "INSERT INTO generated_code (id, exploration_id, test_case_id, test_case_mongo_id, created_at, code, language, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (code_id, exploration_id, test_case_id, test_case_row_id, datetime.now().isoformat(), code, "python", "created")
+                )
+                self._update_summary(exploration_id, has_generated_code=True)
+            self._update_search_index("index_code", exploration_id, test_case_id, code)
+
+            logger.info(f"Saved generated code for test case {test_case_id} in exploration {exploration_id}")
+            return code_id
+        except Exception as e:
+            logger.error(f"Error saving generated code for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def compact_generated_code(self, keep_versions: int, superseded_ttl_days: float = 0) -> int:
+        """Delete old generated code versions
+
+        A version counts as superseded from the creation of the next newer one.
+
+        Args:
+            keep_versions: Number of most recent versions kept per test case, at least 1
+            superseded_ttl_days: Also delete versions replaced longer ago than this, 0 to keep them
+
+        Returns:
+            int: Number of deleted versions
+        """
+        try:
+            keep_versions = max(1, keep_versions)
+            cutoff = (datetime.now() - timedelta(days=superseded_ttl_days)).isoformat() if superseded_ttl_days else ""
+            with self._lock, self.conn:
+                cursor = self.conn.execute(
+                    "DELETE FROM generated_code WHERE rowid IN ("
+                    "  SELECT rowid FROM ("
+                    "    SELECT rowid,"
+                    "      ROW_NUMBER() OVER versions AS version,"
+                    "      LAG(created_at) OVER versions AS superseded_at"
+                    "    FROM generated_code"
+                    "    WINDOW versions AS (PARTITION BY exploration_id, test_case_id ORDER BY created_at DESC, rowid DESC)"
+                    "  ) WHERE version > ? OR superseded_at < ?"
+                    ")",
+                    (keep_versions, cutoff)
+                )
+            logger.info(f"Compacted generated code, {cursor.rowcount} versions deleted")
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error compacting generated code: {str(e)}", exc_info=True)
+            raise
+
+    def _test_case_from_row(self, row) -> Dict[str, Any]:
+        test_case = json.loads(row["data"])
+        test_case.update({
+            "_id": row["id"],
+            "exploration_id": row["exploration_id"],
+            "created_at": datetime.fromisoformat(row["created_at"]),
+            "id": row["test_case_id"]
+        })
+        return test_case
+
+    def _code_from_row(self, row) -> Dict[str, Any]:
+        return {
+            "_id": row["id"],
+            "exploration_id": row["exploration_id"],
+            "test_case_id": row["test_case_id"],
+            "test_case_mongo_id": row["test_case_mongo_id"],
+            "created_at": datetime.fromisoformat(row["created_at"]),
+            "language": row["language"],
+            "status": row["status"],
+            # Listings leave the code itself out
+            **({"code": row["code"]} if "code" in row.keys() else {})
+        }
+
+    def get_test_cases(self, exploration_id: str) -> List[Dict[str, Any]]:
+        """Get test cases for an exploration
+
+        Args:
+            exploration_id: The ID of the exploration
+
+        Returns:
+            List[Dict[str, Any]]: List of test cases
+        """
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT * FROM test_cases WHERE exploration_id = ? ORDER BY created_at, rowid", (exploration_id,)
+                ).fetchall()
+            test_cases = [self._test_case_from_row(row) for row in rows]
+            logger.info(f"Retrieved {len(test_cases)} test cases for exploration {exploration_id}")
+            return test_cases
+        except Exception as e:
+            logger.error(f"Error retrieving test cases for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def get_generated_code(self, exploration_id: str, test_case_id: int) -> Optional[Dict[str, Any]]:
+        """Get generated code for a test case
+
+        Args:
+            exploration_id: The ID of the exploration
+            test_case_id: The ID of the test case
+
+        Returns:
+            Optional[Dict[str, Any]]: The generated code or None if not found
+        """
+        try:
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT * FROM generated_code WHERE exploration_id = ? AND test_case_id = ? "
+                    "ORDER BY created_at DESC, rowid DESC LIMIT 1",
+                    (exploration_id, test_case_id)
+                ).fetchone()
+            return self._code_from_row(row) if row else None
+        except Exception as e:
+            logger.error(f"Error retrieving generated code for exploration {exploration_id}, test case {test_case_id}: {str(e)}", exc_info=True)
+            raise
+
+    def get_all_generated_code(self, exploration_id: str) -> List[Dict[str, Any]]:
+        """Get all generated code for an exploration
+
+        Args:
+            exploration_id: The ID of the exploration
+
+        Returns:
+            List[Dict[str, Any]]: List of generated code
+        """
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT * FROM generated_code WHERE exploration_id = ? "
+                    "ORDER BY test_case_id, created_at DESC, rowid DESC",
+                    (exploration_id,)
+                ).fetchall()
+            code_list = [self._code_from_row(row) for row in rows]
+            logger.info(f"Retrieved {len(code_list)} generated code items for exploration {exploration_id}")
+            return code_list
+        except Exception as e:
+            logger.error(f"Error retrieving all generated code for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def get_test_cases_with_code(self, exploration_id: str) -> List[Dict[str, Any]]:
+        """Get test cases with their most recent generated code
+
+        Older code versions are never read: each test case is joined with its
+        newest code row through the (exploration_id, test_case_id, created_at) index.
+
+        Args:
+            exploration_id: The ID of the exploration
+
+        Returns:
+            List[Dict[str, Any]]: List of test cases with code
+        """
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT tc.*, gc.id AS code_id, gc.test_case_mongo_id, gc.created_at AS code_created_at, "
+                    "gc.code, gc.language, gc.status "
+                    "FROM test_cases tc LEFT JOIN generated_code gc ON gc.id = ("
+                    "  SELECT id FROM generated_code WHERE exploration_id = tc.exploration_id "
+                    "  AND test_case_id = tc.test_case_id ORDER BY created_at DESC, rowid DESC LIMIT 1"
+                    ") WHERE tc.exploration_id = ? ORDER BY tc.created_at, tc.rowid",
+                    (exploration_id,)
+                ).fetchall()
+
+            test_cases = []
+            for row in rows:
+                test_case = self._test_case_from_row(row)
+                test_case["generated_code"] = None
+                if row["code_id"] is not None:
+                    test_case["generated_code"] = {
+                        "_id": row["code_id"],
+                        "exploration_id": row["exploration_id"],
+                        "test_case_id": row["test_case_id"],
+                        "test_case_mongo_id": row["test_case_mongo_id"],
+                        "created_at": datetime.fromisoformat(row["code_created_at"]),
+                        "code": row["code"],
+                        "language": row["language"],
+                        "status": row["status"]
+                    }
+                test_cases.append(test_case)
+            return test_cases
+        except Exception as e:
+            logger.error(f"Error retrieving test cases with code for exploration {exploration_id}: {str(e)}", exc_info=True)
+            raise
+
+    def ping(self) -> bool:
+        """Check that the database file can be queried"""
+        try:
+            with self._lock:
+                self.conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception as e:
+            logger.warning(f"SQLite database is not usable: {str(e)}")
+            return False
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,297 @@
+import json
+import base64
+import hashlib
+import logging
+import threading
+import yaml
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.storage")
+
+# Analysis fields that can hold the per-page records, the first dict found is used
+PAGE_FIELDS = ("pages", "page_content")
+
+# Analysis fields stored in the graph part of an exploration
+GRAPH_FIELDS = ("hierarchy", "paths", "layout")
+
+def split_exploration_data(data: Dict[str, Any]):
+    """Split analysis data into header fields, page records and graph fields
+
+    Returns:
+        tuple: (header, pages_field, pages, graph), pages_field is the key the
+        page records came from, or None if the data has none
+    """
+    pages_field = next((field for field in PAGE_FIELDS if isinstance(data.get(field), dict)), None)
+    pages = data[pages_field] if pages_field else {}
+    graph = {field: data[field] for field in GRAPH_FIELDS if field in data}
+    header = {key: value for key, value in data.items() if key != pages_field and key not in graph}
+    return header, pages_field, pages, graph
+
+def join_exploration_data(header: Dict[str, Any], pages_field: Optional[str],
+                          pages: Optional[Dict[str, Any]], graph: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuild analysis data from the parts made by split_exploration_data"""
+    data = dict(header)
+    if pages_field and pages is not None:
+        data[pages_field] = pages
+    if graph:
+        data.update(graph)
+    return data
+
+# Page record fields that place a page within one crawl rather than describe it.
+# They are stored with the exploration's own page rows, the rest of the record
+# is content and is stored once in page_blobs
+PAGE_POSITION_FIELDS = ("parent", "depth", "paths", "links")
+
+def split_page_record(page: Dict[str, Any]):
+    """Split a page record into its content and its position in the crawl
+
+    Returns:
+        tuple: (content, position), position holding only the PAGE_POSITION_FIELDS present
+    """
+    content = {key: value for key, value in page.items() if key not in PAGE_POSITION_FIELDS}
+    position = {key: page[key] for key in PAGE_POSITION_FIELDS if key in page}
+    return content, position
+
+def join_page_record(content: Dict[str, Any], position: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuild a page record from the parts made by split_page_record"""
+    page = dict(content)
+    if position:
+        page.update(position)
+    return page
+
+def page_blob(content: Dict[str, Any]):
+    """Canonical JSON of the content part of a page record and its SHA-256, the key it is stored under
+
+    Identical content gets the same hash whatever its key order, so a page
+    that did not change between explorations is stored once, even if it was
+    reached through a different path.
+
+    Returns:
+        tuple: (content_hash, canonical_json)
+    """
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest(), canonical
+
+def page_content_hash(page: Dict[str, Any]) -> str:
+    """SHA-256 of the content of a page record, ignoring its position fields, see page_blob"""
+    return page_blob(split_page_record(page)[0])[0]
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that was not produced by encode_cursor"""
+
+def encode_cursor(created_at: datetime, key: Any) -> str:
+    """Build the opaque cursor of a listing position
+
+    Args:
+        created_at: Creation time of the last item returned
+        key: Backend tie-breaker of that item, for items created at the same time
+    """
+    raw = json.dumps([created_at.isoformat(), key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Read a cursor made by encode_cursor
+
+    Returns:
+        tuple: (created_at, key)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, key = json.loads(raw)
+        return datetime.fromisoformat(created_at), key
+    except Exception:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+
+class StorageBackend(ABC):
+    """Persistence of explorations, their test cases and generated code
+
+    Explorations are returned as dicts with a string "_id", "url", "domain",
+    "name", "created_at" (datetime), "summary" and "data". An exploration is
+    stored as a header, one record per page and a graph part (hierarchy,
+    paths, layout), so the pages and the graph can be fetched on their own
+    or left out. The content of a page record is stored once per distinct
+    content (see page_content_hash) and shared by the explorations that
+    contain it; its position fields (PAGE_POSITION_FIELDS) are stored per
+    exploration.
+    Test cases and generated code are dicts with a string "_id" and an
+    "exploration_id".
+    """
+
+    # Exceptions meaning the backend cannot be reached, rather than a failed operation
+    unavailable_errors = ()
+
+    # Full-text index kept up to date by the save and delete methods, see app.core.search_index
+    search_index = None
+
+    @abstractmethod
+    def save_exploration(self, url: str, data: Dict[str, Any], exploration_id: Optional[str] = None) -> str:
+        """Save website exploration data and return its ID
+
+        Saved under exploration_id if given, replacing an earlier save under
+        that ID, so a save can be retried safely.
+        """
+
+    @abstractmethod
+    def get_exploration(self, exploration_id: str, include_pages: bool = True,
+                        include_graph: bool = True) -> Optional[Dict[str, Any]]:
+        """Get exploration by ID, or None if not found, optionally without its pages or graph"""
+
+    @abstractmethod
+    def get_exploration_by_url(self, url: str, include_pages: bool = True,
+                               include_graph: bool = True) -> Optional[Dict[str, Any]]:
+        """Get the most recent exploration for a URL, or None if not found"""
+
+    @abstractmethod
+    def get_page(self, exploration_id: str, page_url: str) -> Optional[Dict[str, Any]]:
+        """Get the record of a single page of an exploration, or None if not found"""
+
+    @abstractmethod
+    def get_pages(self, exploration_id: str, urls: Optional[List[str]] = None,
+                  skip: int = 0, limit: int = 0) -> Dict[str, Dict[str, Any]]:
+        """Get page records in crawl order, all or only the given URLs, limit 0 meaning no limit"""
+
+    @abstractmethod
+    def get_page_hashes(self, exploration_id: str) -> Dict[str, str]:
+        """Get the content hash of every page in crawl order, keyed by URL
+
+        Two explorations have the same content for a page exactly when its
+        hashes match, so they can be compared without loading any page. The
+        hash leaves out the position fields, which change with the crawl.
+        """
+
+    @abstractmethod
+    def get_graph(self, exploration_id: str) -> Optional[Dict[str, Any]]:
+        """Get the hierarchy, paths and layout of an exploration"""
+
+    @abstractmethod
+    def list_explorations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """List saved explorations without their data, most recent first"""
+
+    @abstractmethod
+    def list_explorations_page(self, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List explorations without their data, most recent first, a page at a time
+
+        Returns {"items": [...], "next_cursor": str or None}; pass next_cursor
+        back to get the following page. Listing is keyset paginated on
+        (created_at, _id), so every page costs the same however deep it is.
+        """
+
+    @abstractmethod
+    def list_test_cases_page(self, exploration_id: str, limit: int = 50,
+                             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List test cases in creation order, paginated like list_explorations_page"""
+
+    @abstractmethod
+    def list_generated_code_page(self, exploration_id: str, limit: int = 50,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List generated code without the code itself, newest first, paginated like list_explorations_page"""
+
+    @abstractmethod
+    def delete_exploration(self, exploration_id: str) -> bool:
+        """Delete an exploration with its test cases and code, False if not found"""
+
+    @abstractmethod
+    def save_test_cases(self, exploration_id: str, test_cases: List[Dict[str, Any]]) -> List[str]:
+        """Save test cases for an exploration and return their IDs"""
+
+    @abstractmethod
+    def save_generated_code(self, exploration_id: str, test_case_id: int, code: str) -> str:
+        """Save generated code for a test case and return its ID"""
+
+    @abstractmethod
+    def get_test_cases(self, exploration_id: str) -> List[Dict[str, Any]]:
+        """Get the test cases of an exploration in creation order"""
+
+    @abstractmethod
+    def get_generated_code(self, exploration_id: str, test_case_id: int) -> Optional[Dict[str, Any]]:
+        """Get the most recent code generated for a test case"""
+
+    @abstractmethod
+    def get_all_generated_code(self, exploration_id: str) -> List[Dict[str, Any]]:
+        """Get all code generated for an exploration, by test case and newest first"""
+
+    @abstractmethod
+    def compact_generated_code(self, keep_versions: int, superseded_ttl_days: float = 0) -> int:
+        """Delete old generated code versions and return how many were deleted
+
+        Keeps the newest keep_versions versions of each test case (at least one)
+        and, with superseded_ttl_days, drops versions replaced longer ago than that.
+        The newest version of a test case is never deleted.
+        """
+
+    def ping(self) -> bool:
+        """Check that the backend can serve requests"""
+        return True
+
+    def _update_search_index(self, method: str, *args):
+        """Apply a change to the search index, if there is one
+
+        The index only holds copies of stored data and can be rebuilt, so a
+        failure is logged without failing the write that triggered it.
+        """
+        if self.search_index is None:
+            return
+        try:
+            getattr(self.search_index, method)(*args)
+        except Exception as e:
+            logger.warning(f"Search index not updated ({method}): {str(e)}")
+
+    def get_test_cases_with_code(self, exploration_id: str) -> List[Dict[str, Any]]:
+        """Get test cases with their most recent generated code under "generated_code\""""
+        test_cases = self.get_test_cases(exploration_id)
+
+        # get_all_generated_code returns the newest code of each test case first
+        code_map = {}
+        for code in self.get_all_generated_code(exploration_id):
+            code_map.setdefault(code["test_case_id"], code)
+
+        for test_case in test_cases:
+            test_case["generated_code"] = code_map.get(test_case["id"])
+        return test_cases
+
+def load_storage_config(config_file: str = "config.yaml") -> Dict[str, Any]:
+    """Read the storage section of the configuration file"""
+    with open(config_file, "r") as file:
+        config = yaml.safe_load(file) or {}
+    return config.get("storage") or {}
+
+def create_storage_backend(backend: Optional[str] = None) -> StorageBackend:
+    """Create the storage backend selected by storage.backend in config.yaml
+
+    Args:
+        backend: "mongodb" or "sqlite", overrides the configured backend
+
+    Returns:
+        StorageBackend: The backend instance, updating the search index
+        configured in config.yaml when it saves
+    """
+    storage_config = load_storage_config()
+    backend = backend or storage_config.get("backend", "mongodb")
+
+    if backend == "sqlite":
+        from app.core.sqlite_storage import SQLiteStorage
+        instance = SQLiteStorage(storage_config.get("sqlite_path", "./data/web_analysis.db"))
+    elif backend == "mongodb":
+        from app.core.db_manager import get_db_manager
+        instance = get_db_manager()
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    from app.core.search_index import get_search_index
+    instance.search_index = get_search_index()
+    return instance
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def get_storage() -> StorageBackend:
+    """Get the configured storage backend, created on first use"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = create_storage_backend()
+            logger.info(f"Using {type(_storage).__name__} storage backend")
+        return _storage
@@ -0,0 +1,78 @@
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.structure-cache")
+
+def _load_json(structure_file: str) -> Dict[str, Any]:
+    with open(structure_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class StructureViewRegistry:
+    """Keeps one derived view per structure file, rebuilt when the file changes
+
+    Views are keyed by path and checked against the file's mtime and size on
+    every lookup. Only the most recently used max_entries views are kept, and
+    with max_bytes only as many as fit that many bytes of structure files.
+    """
+
+    def __init__(self, builder: Callable[[Dict[str, Any]], Any], max_entries: int = 16,
+                 loader: Optional[Callable[[str], Dict[str, Any]]] = None, max_bytes: Optional[int] = None):
+        self.builder = builder
+        self.max_entries = max_entries
+        self.loader = loader or _load_json
+        self.max_bytes = max_bytes
+        self._views = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, structure_file: str):
+        """Return the view for a structure file, or None if it does not exist"""
+        try:
+            stat = os.stat(structure_file)
+        except FileNotFoundError:
+            return None
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._views.get(structure_file)
+            if cached and cached[0] == version:
+                self._views.move_to_end(structure_file)
+                return cached[1]
+
+        try:
+            structure = self.loader(structure_file)
+        except FileNotFoundError:
+            return None
+        view = self.builder(structure)
+        logger.info(f"Built {self.builder.__name__} for {structure_file}")
+
+        with self._lock:
+            previous = self._views.pop(structure_file, None)
+            if previous:
+                self._total_bytes -= previous[0][1]
+            self._views[structure_file] = (version, view)
+            self._total_bytes += version[1]
+            while len(self._views) > 1 and (
+                    len(self._views) > self.max_entries or
+                    (self.max_bytes is not None and self._total_bytes > self.max_bytes)):
+                _, ((_, evicted_size), _) = self._views.popitem(last=False)
+                self._total_bytes -= evicted_size
+        return view
+
+def parsed_structure(structure: Dict[str, Any]) -> Dict[str, Any]:
+    return structure
+
+# Parsed structures are shared by every reader, so they must be treated as read-only
+structures = StructureViewRegistry(parsed_structure, max_entries=32, max_bytes=64 * 1024 * 1024)
+
+def load_structure(structure_file: str) -> Dict[str, Any]:
+    """Load a structure file through the parsed structure cache"""
+    structure = structures.get(structure_file)
+    if structure is None:
+        raise FileNotFoundError(structure_file)
+    return structure
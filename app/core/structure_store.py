@@ -0,0 +1,192 @@
+import os
+import json
+import zlib
+import struct
+import logging
+import threading
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# Set up logger
+logger = logging.getLogger("web-analysis-framework.structure-store")
+
+# Compact website structure format
+#
+#   MAGIC
+#   page record ...        one zlib-compressed compact JSON object per page
+#   meta record            url, domain, category, hierarchy, layout, ...
+#   index record           {"meta": [offset, length], "pages": [[url, offset, length], ...]}
+#   footer                 index offset, index length, MAGIC
+#
+# The footer is fixed size, so a reader finds the index without scanning and
+# can then decompress any single page record on its own.
+MAGIC = b"WSTRUCT1"
+_FOOTER = struct.Struct("<QQ8s")
+
+def _encode(value: Any, level: int) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"), level)
+
+def _decode(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+class StructureWriter:
+    """Writes a website structure page by page in the compact format
+
+    Pages are compressed and written as they arrive, so the whole structure
+    never has to be held in memory. The file is written under a temporary
+    name and only replaces the target once close() has written the index.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6):
+        self.path = path
+        self.compression_level = compression_level
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._pages: List[Tuple[str, int, int]] = []
+        self._meta: Dict[str, Any] = {}
+
+    def _append(self, value: Any) -> Tuple[int, int]:
+        data = _encode(value, self.compression_level)
+        offset = self._offset
+        self._file.write(data)
+        self._offset += len(data)
+        return offset, len(data)
+
+    def write_page(self, url: str, record: Dict[str, Any]):
+        """Append one page record"""
+        offset, length = self._append(record)
+        self._pages.append((url, offset, length))
+
+    def write_meta(self, meta: Dict[str, Any]):
+        """Set the structure-level fields, written when the file is closed"""
+        self._meta.update(meta)
+
+    def close(self):
+        """Write the meta record, index and footer and move the file into place"""
+        if self._file is None:
+            return
+        meta_offset, meta_length = self._append(self._meta)
+        index_offset, index_length = self._append({
+            "meta": [meta_offset, meta_length],
+            "pages": [list(entry) for entry in self._pages]
+        })
+        self._file.write(_FOOTER.pack(index_offset, index_length, MAGIC))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+        logger.info(f"Wrote {len(self._pages)} pages to {self.path}")
+
+    def abort(self):
+        """Discard the partially written file"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class StructureReader:
+    """Random-access reader for the compact website structure format
+
+    Opening a file only reads its index. Page records are decompressed on
+    demand, one at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._lock = threading.Lock()
+        self._meta: Optional[Dict[str, Any]] = None
+        try:
+            self._read_index()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read(self, offset: int, length: int) -> bytes:
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def _read_index(self):
+        self._file.seek(0, os.SEEK_END)
+        size = self._file.tell()
+        if size < len(MAGIC) + _FOOTER.size or self._read(0, len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a compact website structure file")
+        index_offset, index_length, magic = _FOOTER.unpack(self._read(size - _FOOTER.size, _FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+        index = _decode(self._read(index_offset, index_length))
+        self._meta_location = tuple(index["meta"])
+        self._pages = {url: (offset, length) for url, offset, length in index["pages"]}
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """Structure-level fields (url, domain, category, hierarchy, layout, ...)"""
+        if self._meta is None:
+            self._meta = _decode(self._read(*self._meta_location))
+        return self._meta
+
+    @property
+    def urls(self) -> List[str]:
+        """URLs of the stored pages, in the order they were written"""
+        return list(self._pages)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._pages
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Read a single page record, or None if the page is not stored"""
+        location = self._pages.get(url)
+        if location is None:
+            return None
+        return _decode(self._read(*location))
+
+    def iter_pages(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (url, record) for every page, decompressing one at a time"""
+        for url, location in self._pages.items():
+            yield url, _decode(self._read(*location))
+
+    def load(self) -> Dict[str, Any]:
+        """Read the whole structure into the same dict the JSON file holds"""
+        # Page records are contiguous, one read is much cheaper than a seek per page
+        data = memoryview(self._read(0, self._meta_location[0]))
+        structure = dict(self.meta)
+        structure["pages"] = {
+            url: _decode(data[offset:offset + length])
+            for url, (offset, length) in self._pages.items()
+        }
+        return structure
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def write_structure(path: str, structure: Dict[str, Any], compression_level: int = 6):
+    """Write a structure dict in the compact format"""
+    with StructureWriter(path, compression_level) as writer:
+        writer.write_meta({key: value for key, value in structure.items() if key != "pages"})
+        for url, record in structure.get("pages", {}).items():
+            writer.write_page(url, record)
+
+def read_structure(path: str) -> Dict[str, Any]:
+    """Read a whole structure from a compact file"""
+    with StructureReader(path) as reader:
+        return reader.load()
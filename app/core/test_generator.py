@@ -2,13 +2,54 @@ import json
 import os
 import logging
 from datetime import datetime
+from typing import Dict, List, Any, Optional
+from app.core.structure_cache import StructureViewRegistry, load_structure
 
 # Set up logger
 logger = logging.getLogger("web-analysis-framework.test-generator")
 
+class PageIndex:
+    """Page lookups of an analysis, built once and shared by every generator call
+
+    Accepts both an analyze() result (a "pages" URL list with records under
+    "page_content" and paths under "paths") and a saved website structure
+    (records, with their paths, under "pages").
+    """
+
+    def __init__(self, analysis: Dict[str, Any]):
+        pages = analysis.get("pages", [])
+        content = analysis.get("page_content")
+        if not isinstance(content, dict):
+            content = pages if isinstance(pages, dict) else {}
+        self.urls = frozenset(pages)
+        self.content: Dict[str, Dict[str, Any]] = content
+        self.titles: Dict[str, str] = {url: record.get("title", "Unknown Page") for url, record in content.items()}
+        paths = analysis.get("paths")
+        if not isinstance(paths, dict):
+            paths = {url: record.get("paths", []) for url, record in content.items()}
+        self.paths: Dict[str, List[List[str]]] = paths
+        self.has_forms = any(record.get("forms", 0) > 0 for record in content.values())
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.urls
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def page(self, url: str) -> Dict[str, Any]:
+        return self.content.get(url, {})
+
+    def title(self, url: str) -> str:
+        return self.titles.get(url, "Unknown Page")
+
+    def paths_to(self, url: str) -> List[List[str]]:
+        return self.paths.get(url, [])
+
 class TestCaseGenerator:
-    def __init__(self, website_analysis):
+    def __init__(self, website_analysis, page_index: Optional[PageIndex] = None):
         self.analysis = website_analysis
+        # Pass the cached index of a saved structure (see page_indexes) to skip rebuilding it
+        self.pages = page_index or PageIndex(website_analysis)
         self.test_cases = []
         self.test_case_dir = "app/static/test_cases"
         
@@ -39,20 +80,20 @@ class TestCaseGenerator:
         self.test_cases = []
         
         # First, verify if the node exists in the analysis
-        if node_url not in self.analysis.get("pages", []):
+        if node_url not in self.pages:
             logger.warning(f"Node URL {node_url} not found in analysis")
             # Return empty test cases
             return self.test_cases
             
         # Extract path information from the analysis
-        paths = self.analysis.get("paths", {}).get(node_url, [])
+        paths = self.pages.paths_to(node_url)
         logger.info(f"Found {len(paths)} paths to node {node_url}")
         
         # Generate basic accessibility test for the node using path information
         self._generate_node_accessibility_test(node_url, paths)
         
         # Generate node-specific tests based on content
-        page_content = self.analysis.get("page_content", {}).get(node_url, {})
+        page_content = self.pages.page(node_url)
         self._generate_node_specific_tests(node_url, page_content)
         
         # Generate tests for the subgraph (paths to this node)
@@ -73,12 +114,11 @@ class TestCaseGenerator:
     def _generate_node_accessibility_test(self, node_url, paths=None):
         """Generate basic accessibility test for a specific node using path information"""
         # Get node info
-        page_content = self.analysis.get("page_content", {}).get(node_url, {})
-        title = page_content.get("title", "Unknown Page")
+        title = self.pages.title(node_url)
         
         # If paths not provided, try to get from analysis
         if paths is None:
-            paths = self.analysis.get("paths", {}).get(node_url, [])
+            paths = self.pages.paths_to(node_url)
         
         # If we have paths to the node, generate a navigation test
         if paths and len(paths) > 0:
@@ -91,9 +131,7 @@ class TestCaseGenerator:
             # For each step in the path (except the first and last), create a navigation step
             for i in range(1, len(shortest_path)-1):
                 current_url = shortest_path[i]
-                current_content = self.analysis.get("page_content", {}).get(current_url, {})
-                
-                steps.append(f"Find and click the link to '{current_content.get('title', 'Unknown Page')}'")
+                steps.append(f"Find and click the link to '{self.pages.title(current_url)}'")
                 steps.append(f"Wait for the page to load")
             
             # Last step to the target node
@@ -308,8 +346,6 @@ class TestCaseGenerator:
 
     def _generate_navigation_tests(self):
         """Generate basic navigation test cases"""
-        pages = self.analysis.get("pages", [])
-        
         # Basic site accessibility test
         self.test_cases.append({
             "id": 1,
@@ -326,7 +362,7 @@ class TestCaseGenerator:
         })
         
         # Navigation path tests (if there are multiple pages)
-        if len(pages) > 1:
+        if len(self.pages) > 1:
             self.test_cases.append({
                 "id": 2,
                 "title": "Basic Navigation Path Test",
@@ -518,9 +554,7 @@ class TestCaseGenerator:
         })
         
         # If there are forms on the site
-        page_with_forms = next((page for page, content in enumerate(self.analysis.get("page_content", {}).values()) 
-                                if content.get("forms", 0) > 0), None)
-        if page_with_forms:
+        if self.pages.has_forms:
             self.test_cases.append({
                 "id": len(self.test_cases) + 1,
                 "title": "Form Submission Test",
@@ -542,15 +576,12 @@ class TestCaseGenerator:
         """Generate tests based on the subgraph (paths to this node)"""
         logger.info(f"Generating subgraph tests for {node_url} with {len(paths)} paths")
         
-        page_content = self.analysis.get("page_content", {}).get(node_url, {})
-        title = page_content.get("title", "Unknown Page")
+        page_content = self.pages.page(node_url)
+        title = self.pages.title(node_url)
         
         # Generate a test for each unique path
         for idx, path in enumerate(paths[:3]):  # Limit to first 3 paths to avoid too many tests
-            path_nodes = []
-            for url in path:
-                content = self.analysis.get("page_content", {}).get(url, {})
-                path_nodes.append(content.get("title", "Unknown Page"))
+            path_nodes = [self.pages.title(url) for url in path]
             
             # Create navigation steps for this path
             steps = [f"Navigate to {self.analysis['url']}"]
@@ -577,11 +608,7 @@ class TestCaseGenerator:
         
         # Create a test for testing all outbound links from this node
         if page_content.get("links", []):
-            outbound_links = []
-            for link in page_content.get("links", []):
-                if link in self.analysis.get("pages", []):
-                    link_content = self.analysis.get("page_content", {}).get(link, {})
-                    outbound_links.append(link_content.get("title", "Unknown Page"))
+            outbound_links = [self.pages.title(link) for link in page_content.get("links", []) if link in self.pages]
             
             if outbound_links:
                 self.test_cases.append({
@@ -615,4 +642,7 @@ class TestCaseGenerator:
         # Also save individual test cases
         for test_case in self.test_cases:
             with open(f"{self.test_case_dir}/{filename_base}test_case_{test_case['id']}_{timestamp}.json", "w") as f:
-                json.dump(test_case, f, indent=2) 
\ No newline at end of file
+                json.dump(test_case, f, indent=2) 
+
+# Page indexes of saved structures, shared by the test generation requests of an exploration
+page_indexes = StructureViewRegistry(PageIndex, loader=load_structure)
@@ -2,23 +2,31 @@ import requests
 from bs4 import BeautifulSoup
 import networkx as nx
 import re
-import json
 import os
 import logging
+import yaml
 from urllib.parse import urlparse, urljoin
-from pyvis.network import Network
 
 # Cambiar la importación para usar ruta relativa
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.ml_categorizer import categorizer as ml_categorizer
+from core.graph_layout import compute_layout
+from core.explorations import new_exploration_id, save_structure, structure_path
 
 # Set up logger
 logger = logging.getLogger("web-analysis-framework.analyzer")
 
+def load_analysis_config(config_file="config.yaml"):
+    """Read the analysis section of the configuration file"""
+    with open(config_file, "r") as file:
+        config = yaml.safe_load(file) or {}
+    return config.get("analysis") or {}
+
 class WebAnalyzer:
-    def __init__(self, url):
+    def __init__(self, url, event_callback=None, exploration_id=None, persist_structure=True, layout_method=None):
         self.url = url
+        self.exploration_id = exploration_id or new_exploration_id()  # Namespace of the saved artifacts
         self.domain = urlparse(url).netloc
         self.graph = nx.DiGraph()
         self.visited = set()
@@ -27,6 +35,12 @@ class WebAnalyzer:
         self.max_pages = 500  # Aumentado de 10 a 100
         self.hierarchy = {}  # Store hierarchical structure
         self.paths = {}      # Store paths to each node
+        self.layout = {}     # Precomputed node coordinates for the visualization
+        # "hierarchical" or "spring", by default analysis.layout in config.yaml
+        self.layout_method = layout_method or load_analysis_config().get("layout", "hierarchical")
+        self.event_callback = event_callback  # Receives node/edge events while crawling
+        self.persist_structure = persist_structure  # False leaves writing self.structure to the caller
+        self.structure = None
 
     def analyze(self):
         """Main analysis method that scrapes the site and builds the graph"""
@@ -36,27 +50,42 @@ class WebAnalyzer:
             self._categorize_site()
             self._build_hierarchy()
             self._calculate_paths()
-            self._generate_graph_visualization()
-            self._save_structure_to_json()
+            self._compute_layout()
+            self.structure = self._build_structure()
+            if self.persist_structure:
+                self._save_structure_to_json()
             
             logger.info(f"Analysis complete. Found {self.graph.number_of_nodes()} pages")
+            self._emit({"type": "done", "status": "completed", "node_count": self.graph.number_of_nodes()})
             
             return {
+                "exploration_id": self.exploration_id,
                 "url": self.url,
                 "domain": self.domain,
                 "category": self.site_category,
                 "node_count": self.graph.number_of_nodes(),
                 "edge_count": self.graph.number_of_edges(),
                 "pages": list(self.graph.nodes()),
-                "visualization_path": "static/graph.html",
+                "visualization_path": "graph",
                 "page_content": self.page_content,
                 "hierarchy": self.hierarchy,
                 "paths": self.paths
             }
         except Exception as e:
             logger.error(f"Analysis failed: {str(e)}", exc_info=True)
+            self._emit({"type": "done", "status": "failed", "error": str(e)})
             raise
     
+    def _emit(self, event):
+        """Send a crawl progress event to the listener, if any"""
+        if self.event_callback is None:
+            return
+        try:
+            self.event_callback(event)
+        except Exception as e:
+            # A broken listener must never stop the crawl
+            logger.warning(f"Error sending crawl event: {str(e)}")
+    
     def _crawl(self, url, depth=0, parent_url=None):
         """Crawl the website to build the graph"""
         if url in self.visited or depth > 10 or len(self.visited) >= self.max_pages:
@@ -113,6 +142,15 @@ class WebAnalyzer:
             if parent_url:
                 self.graph.add_edge(parent_url, url)
             
+            self._emit({
+                "type": "node",
+                "url": url,
+                "title": page_title,
+                "path": page_path,
+                "depth": depth,
+                "parent": parent_url
+            })
+            
             # Find all links
             for link in soup.find_all('a', href=True):
                 href = link.get('href')
@@ -193,40 +231,51 @@ class WebAnalyzer:
             except nx.NetworkXNoPath:
                 self.paths[node] = []
     
+    def _compute_layout(self):
+        """Compute node coordinates once so the browser can skip physics simulation"""
+        logger.info(f"Computing {self.layout_method} graph layout")
+        
+        nodes = list(self.graph.nodes())
+        depths = {node: self.graph.nodes[node].get('depth', 0) for node in nodes}
+        parents = {node: self.page_content.get(node, {}).get("parent") for node in nodes}
+        self.layout = compute_layout(nodes, list(self.graph.edges()), depths, parents, method=self.layout_method)
+    
+    def _page_records(self):
+        """Yield the saved record of every crawled page"""
+        for url, content in self.page_content.items():
+            yield url, {
+                "title": content.get("title", "Unknown"),
+                "path": content.get("path", "/"),
+                "depth": content.get("depth", 0),
+                "headers": content.get("headers", []),
+                # Excerpt of the visible text, what full-text search indexes besides title and headers
+                "text_content": content.get("text_content", ""),
+                "forms": content.get("forms", 0),
+                "images": content.get("images", 0),
+                "inputs": content.get("inputs", 0),
+                "buttons": content.get("buttons", 0),
+                "parent": content.get("parent", None),
+                "links": list(dict.fromkeys(content.get("links", []))),
+                "paths": self.paths.get(url, [])
+            }
+    
+    def _build_structure(self):
+        """Build the website structure saved for the exploration"""
+        return {
+            "exploration_id": self.exploration_id,
+            "url": self.url,
+            "domain": self.domain,
+            "category": self.site_category,
+            "hierarchy": self.hierarchy,
+            "layout": self.layout,
+            "pages": dict(self._page_records())
+        }
+    
     def _save_structure_to_json(self):
-        """Save the website structure to a JSON file"""
+        """Save the website structure to a JSON file, plus a compact copy with separately readable pages"""
         try:
-            structure = {
-                "url": self.url,
-                "domain": self.domain,
-                "category": self.site_category,
-                "hierarchy": self.hierarchy,
-                "pages": {}
-            }
-            
-            # Add detailed page info
-            for url, content in self.page_content.items():
-                structure["pages"][url] = {
-                    "title": content.get("title", "Unknown"),
-                    "path": content.get("path", "/"),
-                    "depth": content.get("depth", 0),
-                    "headers": content.get("headers", []),
-                    "forms": content.get("forms", 0),
-                    "images": content.get("images", 0),
-                    "inputs": content.get("inputs", 0),
-                    "buttons": content.get("buttons", 0),
-                    "parent": content.get("parent", None),
-                    "paths": self.paths.get(url, [])
-                }
-            
-            # Ensure directory exists
-            os.makedirs("app/static", exist_ok=True)
-            
-            # Save to file
-            with open("app/static/website_structure.json", "w", encoding="utf-8") as f:
-                json.dump(structure, f, indent=2)
-                
-            logger.info("Website structure saved to JSON file")
+            save_structure(self.exploration_id, self.structure)
+            logger.info(f"Website structure saved to {structure_path(self.exploration_id)}")
         except Exception as e:
             logger.error(f"Error saving website structure to JSON: {str(e)}", exc_info=True)
     
@@ -300,524 +349,3 @@ class WebAnalyzer:
             return max(scores.items(), key=lambda x: x[1])[0]
         else:
             return "unknown"
-    
-    def _generate_graph_visualization(self):
-        """Generate a visual representation of the site graph"""
-        logger.info("Generating graph visualization")
-        
-        # Create the static directory if it doesn't exist
-        os.makedirs("app/static", exist_ok=True)
-        
-        try:
-            # First, try to use PyVis to generate the graph
-            self._generate_pyvis_graph()
-            logger.info("PyVis graph generation successful")
-        except Exception as e:
-            # If PyVis fails, fall back to manual HTML generation
-            logger.error(f"PyVis graph generation failed: {str(e)}, trying fallback method", exc_info=True)
-            try:
-                self._generate_basic_graph_html()
-                logger.info("Fallback graph generation successful")
-            except Exception as e2:
-                logger.error(f"Fallback graph generation also failed: {str(e2)}", exc_info=True)
-    
-    def _generate_pyvis_graph(self):
-        """Generate graph visualization using PyVis"""
-        # Create a network
-        net = Network(height="750px", width="100%", directed=True, notebook=False)
-        
-        # Configure to use CDN resources instead of local files
-        net.use_DOT = True
-        net.set_options("""
-        var options = {
-            "nodes": {
-                "font": {
-                    "size": 12
-                }
-            },
-            "edges": {
-                "color": {
-                    "color": "#1E90FF",
-                    "highlight": "#FF0000"
-                },
-                "smooth": {
-                    "type": "continuous"
-                }
-            },
-            "physics": {
-                "barnesHut": {
-                    "gravitationalConstant": -80000,
-                    "springLength": 250,
-                    "springConstant": 0.001
-                },
-                "maxVelocity": 50
-            },
-            "interaction": {
-                "hover": true,
-                "navigationButtons": true,
-                "keyboard": true
-            }
-        }
-        """)
-        
-        # Add nodes
-        for node in self.graph.nodes():
-            title = self.graph.nodes[node].get('title', 'No Title')
-            path = self.graph.nodes[node].get('path', '/')
-            depth = self.graph.nodes[node].get('depth', 0)
-            
-            # Use shortened labels for better visualization
-            label = path[:15] + "..." if len(path) > 15 else path
-            if label == "" or label == "/":
-                label = "Home"
-                
-            # Add custom attributes for node identification
-            net.add_node(
-                node, 
-                label=label, 
-                title=f"{title}\n{node}",
-                value=(10-depth) * 2,  # Size based on depth (higher nodes are bigger)
-                level=depth,           # Hierarchical level
-                url=node,              # Store the URL for later use
-                color="#4CAF50" if depth == 0 else "#2196F3"  # Root is green, others blue
-            )
-        
-        # Add edges
-        for edge in self.graph.edges():
-            net.add_edge(edge[0], edge[1])
-        
-        # Add custom JS to handle node clicks
-        net.set_options("""
-        var options = {
-            "configure": {
-                "enabled": false
-            },
-            "nodes": {
-                "font": {
-                    "size": 12
-                }
-            },
-            "physics": {
-                "hierarchicalRepulsion": {
-                    "centralGravity": 0
-                },
-                "minVelocity": 0.75,
-                "solver": "hierarchicalRepulsion"
-            },
-            "interaction": {
-                "navigationButtons": true,
-                "selectConnectedEdges": true
-            }
-        }
-        """)
-        
-        # Save the graph
-        net.save_graph("app/static/graph.html")
-        
-        # Fix the HTML after saving
-        self._fix_graph_html_for_cdn()
-        
-        # Add custom click event handler
-        self._add_node_click_handler()
-        
-    def _generate_basic_graph_html(self):
-        """Generate a basic HTML with the graph using custom template"""
-        logger.info("Generating basic graph HTML using custom template")
-        
-        # Create a list of nodes
-        nodes_data = []
-        for node in self.graph.nodes():
-            title = self.graph.nodes[node].get('title', 'No Title')
-            path = self.graph.nodes[node].get('path', '/')
-            depth = self.graph.nodes[node].get('depth', 0)
-            
-            # Use shortened labels for better visualization
-            label = path[:15] + "..." if len(path) > 15 else path
-            if label == "" or label == "/":
-                label = "Home"
-            
-            # Create node object with tooltip and hover info
-            tooltip = f"<div><strong>{title}</strong><br>{node}</div>"
-            
-            node_obj = {
-                "id": node,
-                "label": label,
-                "title": tooltip,
-                "value": (10-depth) * 2,
-                "level": depth,
-                "url": node,
-                "color": "#4CAF50" if depth == 0 else "#2196F3"
-            }
-            
-            nodes_data.append(node_obj)
-        
-        # Create a list of edges - make them directional
-        edges_data = []
-        for edge in self.graph.edges():
-            edge_obj = {
-                "from": edge[0],
-                "to": edge[1],
-                "arrows": {
-                    "to": {"enabled": True, "scaleFactor": 0.5}
-                },
-                "color": {
-                    "color": "#1E90FF",
-                    "highlight": "#FF0000"
-                }
-            }
-            edges_data.append(edge_obj)
-        
-        # Define physics options
-        options = {
-            "nodes": {
-                "font": {
-                    "size": 12
-                },
-                "borderWidth": 2,
-                "shadow": True
-            },
-            "edges": {
-                "color": {
-                    "color": "#1E90FF",
-                    "highlight": "#FF0000"
-                },
-                "smooth": {
-                    "type": "continuous"
-                },
-                "arrows": {
-                    "to": {
-                        "enabled": True,
-                        "scaleFactor": 0.5
-                    }
-                }
-            },
-            "physics": {
-                "barnesHut": {
-                    "gravitationalConstant": -80000,
-                    "springLength": 250,
-                    "springConstant": 0.001
-                },
-                "maxVelocity": 50,
-                "solver": "barnesHut",
-                "stabilization": {
-                    "iterations": 1000
-                }
-            },
-            "interaction": {
-                "hover": True,
-                "hoverConnectedEdges": True,
-                "navigationButtons": True,
-                "keyboard": True,
-                "selectConnectedEdges": True,
-                "tooltipDelay": 300
-            }
-        }
-        
-        # Create the HTML template
-        html_template = """<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Website Structure Visualization</title>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/vis-network@9.1.2/dist/dist/vis-network.min.css">
-    <script type="text/javascript" src="https://cdn.jsdelivr.net/npm/vis-network@9.1.2/dist/vis-network.min.js"></script>
-    <style type="text/css">
-        html, body {
-            width: 100%;
-            height: 100%;
-            margin: 0;
-            padding: 0;
-        }
-        #mynetwork {
-            width: 100%;
-            height: 100%;
-        }
-        #debug-info {
-            position: absolute;
-            top: 5px;
-            right: 5px;
-            background: rgba(0,0,0,0.7);
-            color: white;
-            padding: 5px;
-            font-size: 12px;
-            z-index: 1000;
-            border-radius: 3px;
-        }
-        #path-info {
-            position: absolute;
-            top: 5px;
-            left: 5px;
-            background: rgba(255,255,255,0.9);
-            color: #333;
-            padding: 10px;
-            border-radius: 5px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.2);
-            z-index: 1000;
-            max-width: 300px;
-            max-height: 400px;
-            overflow-y: auto;
-            font-family: Arial, sans-serif;
-            font-size: 12px;
-            display: none;
-        }
-    </style>
-</head>
-<body>
-    <div id="debug-info">Vis.js Network Graph</div>
-    <div id="path-info"></div>
-    <div id="mynetwork"></div>
-    <script type="text/javascript">
-        // Create nodes and edges
-        var nodes = new vis.DataSet({nodes_json});
-        var edges = new vis.DataSet({edges_json});
-        
-        // Create container and data
-        var container = document.getElementById("mynetwork");
-        var data = {
-            nodes: nodes,
-            edges: edges
-        };
-        
-        // Store all paths data
-        var allPathsData = {paths_json};
-        var rootNode = {root_node};
-        
-        // Create network
-        var options = {options_json};
-        window.network = new vis.Network(container, data, options);
-        
-        // Function to find all paths from root to a node
-        function findAllPaths(targetNode) {
-            if (allPathsData && allPathsData[targetNode] && allPathsData[targetNode].length > 0) {
-                return allPathsData[targetNode];
-            } 
-            return [];
-        }
-        
-        // Function to highlight paths
-        function highlightPaths(paths) {
-            // Reset all nodes and edges
-            var allNodes = nodes.get();
-            var allEdges = edges.get();
-            var updatedNodes = [];
-            var updatedEdges = [];
-            
-            // First reset all to default
-            allNodes.forEach(function(n) {
-                n.color = n.level === 0 ? '#4CAF50' : '#2196F3';
-                n.font = { color: '#000000' };
-                n.borderWidth = 1;
-                n.shadow = false;
-                n.hidden = true;  // Hide all nodes by default
-                updatedNodes.push(n);
-            });
-            
-            allEdges.forEach(function(e) {
-                e.color = '#1E90FF';
-                e.width = 1;
-                e.shadow = false;
-                e.hidden = true;  // Hide all edges by default
-                updatedEdges.push(e);
-            });
-            
-            // Update all nodes and edges with default styles
-            nodes.update(updatedNodes);
-            edges.update(updatedEdges);
-            
-            // No paths to highlight
-            if (!paths || paths.length === 0) {
-                return;
-            }
-            
-            // Get the target node URL
-            var targetNode = paths[0][paths[0].length - 1];
-            var targetNodeData = nodes.get(targetNode);
-            
-            // Show and highlight root node
-            var rootNodeData = nodes.get(rootNode);
-            if (rootNodeData) {
-                rootNodeData.color = '#4CAF50';
-                rootNodeData.shadow = true;
-                rootNodeData.borderWidth = 2;
-                rootNodeData.hidden = false;
-                nodes.update(rootNodeData);
-            }
-            
-            // Show and highlight target node
-            if (targetNodeData) {
-                targetNodeData.color = '#e91e63';
-                targetNodeData.shadow = true;
-                targetNodeData.borderWidth = 2;
-                targetNodeData.hidden = false;
-                nodes.update(targetNodeData);
-            }
-            
-            // Show and highlight all nodes and edges in the paths
-            paths.forEach(function(path) {
-                for (var i = 0; i < path.length - 1; i++) {
-                    var fromNode = path[i];
-                    var toNode = path[i + 1];
-                    
-                    // Show and highlight nodes in path
-                    var nodeData = nodes.get(fromNode);
-                    if (nodeData) {
-                        nodeData.hidden = false;
-                        nodeData.color = '#2196F3';
-                        nodes.update(nodeData);
-                    }
-                    
-                    // Show and highlight edges in path
-            var edgeIds = edges.getIds({
-                filter: function(edge) {
-                    return edge.from === fromNode && edge.to === toNode;
-                }
-            });
-                    
-                    edgeIds.forEach(function(edgeId) {
-                        var edgeData = edges.get(edgeId);
-                        if (edgeData) {
-                            edgeData.hidden = false;
-                            edgeData.color = '#FF0000';
-                            edgeData.width = 2;
-                            edges.update(edgeData);
-                        }
-                    });
-                }
-            });
-            
-            // Display path information
-            showPathInfo(paths);
-        }
-        
-        // Function to reset the view
-        function resetView() {
-            var allNodes = nodes.get();
-            var allEdges = edges.get();
-            
-            allNodes.forEach(function(n) {
-                n.hidden = false;
-                n.color = n.level === 0 ? '#4CAF50' : '#2196F3';
-                n.borderWidth = 1;
-                n.shadow = false;
-                nodes.update(n);
-            });
-            
-            allEdges.forEach(function(e) {
-                e.hidden = false;
-                e.color = '#1E90FF';
-                e.width = 1;
-                e.shadow = false;
-                edges.update(e);
-            });
-            
-            document.getElementById('path-info').style.display = 'none';
-        }
-        
-        // Show path information
-        function showPathInfo(paths) {
-            var pathInfo = document.getElementById('path-info');
-            if (!pathInfo) return;
-            
-            if (!paths || paths.length === 0) {
-                pathInfo.style.display = 'none';
-                return;
-            }
-            
-            var html = '<h3>Selected Node</h3>';
-            var targetNode = paths[0][paths[0].length - 1];
-            var targetNodeData = nodes.get(targetNode);
-            
-                html += '<div style="margin-bottom: 10px;">';
-            html += '<strong>URL:</strong> ' + targetNodeData.url + '<br>';
-            html += '<strong>Title:</strong> ' + targetNodeData.title + '<br>';
-            html += '<button onclick="resetView()" style="margin-top: 10px; padding: 5px 10px;">Reset View</button>';
-                html += '</div>';
-            
-            pathInfo.innerHTML = html;
-            pathInfo.style.display = 'block';
-        }
-        
-        // Network events
-        window.network.on("click", function(params) {
-            if (params.nodes.length > 0) {
-                var nodeId = params.nodes[0];
-                var node = window.network.body.data.nodes.get(nodeId);
-                console.log("Node clicked:", node);
-                
-                // Find all paths from root to selected node
-                var paths = findAllPaths(nodeId);
-                
-                // Highlight the paths
-                highlightPaths(paths);
-                
-                // Send message to parent window
-                window.parent.postMessage({
-                    type: 'nodeClick',
-                    nodeId: nodeId,
-                    nodeName: node.label || 'Unknown',
-                    nodeUrl: node.url || nodeId,
-                    paths: paths
-                }, '*');
-            } else {
-                // Clicked on empty space - reset view
-                resetView();
-            }
-        });
-        
-        // Double click to focus on a node
-        window.network.on("doubleClick", function(params) {
-            if (params.nodes.length > 0) {
-                var nodeId = params.nodes[0];
-                window.network.focus(nodeId, {
-                    scale: 1.2,
-                    animation: true
-                });
-            }
-        });
-        
-        // Log that network is ready
-        console.log('Graph loaded and network initialized');
-        document.addEventListener('DOMContentLoaded', function() {
-            console.log('DOM loaded, checking network');
-            setTimeout(function() {
-                if (typeof window.network !== 'undefined') {
-                    console.log('Network is available');
-                    document.getElementById('debug-info').innerHTML = 'Network loaded successfully';
-                    document.getElementById('debug-info').style.background = 'rgba(0,128,0,0.7)';
-                }
-            }, 1000);
-        });
-    </script>
-</body>
-</html>
-"""
-        
-        # Prepare paths data for the visualization
-        paths_data = {}
-        for node_url, node_paths in self.paths.items():
-            paths_data[node_url] = node_paths
-        
-        # Replace placeholders with actual JSON data
-        html = html_template.replace("{nodes_json}", json.dumps(nodes_data))
-        html = html.replace("{edges_json}", json.dumps(edges_data))
-        html = html.replace("{options_json}", json.dumps(options))
-        html = html.replace("{paths_json}", json.dumps(paths_data))
-        html = html.replace("{root_node}", json.dumps(self.url))
-        
-        # Save the HTML file
-        with open("app/static/graph.html", "w", encoding="utf-8") as f:
-            f.write(html)
-        
-        logger.info("Basic graph HTML generated successfully") 
-    
-    def _add_node_click_handler(self):
-        """Add custom JS to handle node clicks - Disabled as now included in template"""
-        logger.info("Node click handler functionality is now included in the HTML template")
-        # This method has been superseded by embedded click handler in the HTML template
-        pass
-
-    def _fix_graph_html_for_cdn(self):
-        """Fix the HTML to use CDN resources - Disabled as now included in template"""
-        logger.info("CDN resources now included in the HTML template")
-        # This method has been superseded by the correct CDN links in the HTML template
-        pass 
\ No newline at end of file
@@ -0,0 +1,489 @@
+// Graph viewer: loads the graph data of one exploration and renders it with vis-network.
+// The page itself is a static shell, so only the data has to be refetched when the graph changes.
+// The exploration is given as /graph?exploration_id=<id>, every API call is scoped to it.
+
+var viewerParams = new URLSearchParams(window.location.search);
+var explorationId = viewerParams.get('exploration_id');
+
+var nodes = new vis.DataSet([]);
+var edges = new vis.DataSet([]);
+var allPathsData = {};
+var rootNode = null;
+
+// Function to find all paths from root to a node
+function findAllPaths(targetNode) {
+    if (allPathsData && allPathsData[targetNode] && allPathsData[targetNode].length > 0) {
+        return allPathsData[targetNode];
+    }
+    return [];
+}
+
+// Index of edge ids by "from|to", kept in sync with the edges DataSet
+var edgeIndex = {};
+
+// Highlight state, so each click only touches the elements whose state changes
+var pathMode = false;   // true while everything outside the highlighted paths is hidden
+var styledNodes = {};   // node id -> 'root' | 'target' | 'path' for the visible nodes in path mode
+var styledEdges = {};   // edge id -> true for the highlighted edges in path mode
+
+var NODE_STYLES = {
+    root: { color: '#4CAF50', shadow: true, borderWidth: 2 },
+    target: { color: '#e91e63', shadow: true, borderWidth: 2 },
+    path: { color: '#2196F3', shadow: false, borderWidth: 1 }
+};
+
+function edgeKey(from, to) {
+    return from + '|' + to;
+}
+
+edges.on('add', function(event, properties) {
+    edges.get(properties.items).forEach(function(e) {
+        var key = edgeKey(e.from, e.to);
+        (edgeIndex[key] = edgeIndex[key] || []).push(e.id);
+    });
+});
+
+edges.on('remove', function(event, properties) {
+    properties.oldData.forEach(function(e) {
+        var key = edgeKey(e.from, e.to);
+        var ids = edgeIndex[key];
+        if (!ids) return;
+        var position = ids.indexOf(e.id);
+        if (position >= 0) ids.splice(position, 1);
+        if (ids.length === 0) delete edgeIndex[key];
+        delete styledEdges[e.id];
+    });
+});
+
+function defaultNodeStyle(n, hidden) {
+    return {
+        id: n.id,
+        color: n.cluster ? '#FF9800' : (n.level === 0 ? '#4CAF50' : '#2196F3'),
+        borderWidth: 1,
+        shadow: false,
+        hidden: hidden
+    };
+}
+
+function defaultEdgeStyle(id, hidden) {
+    return { id: id, color: '#1E90FF', width: 1, shadow: false, hidden: hidden };
+}
+
+// Function to highlight paths
+function highlightPaths(paths, selectedNode) {
+    // Work out the desired state of the nodes and edges on the paths
+    var desiredNodes = {};
+    var desiredEdges = {};
+    var targetNode = paths && paths.length > 0 ? paths[0][paths[0].length - 1] : selectedNode;
+
+    (paths || []).forEach(function(path) {
+        for (var i = 0; i < path.length - 1; i++) {
+            desiredNodes[path[i]] = 'path';
+            (edgeIndex[edgeKey(path[i], path[i + 1])] || []).forEach(function(edgeId) {
+                desiredEdges[edgeId] = true;
+            });
+        }
+    });
+    if (paths && paths.length > 0 && rootNode !== null) desiredNodes[rootNode] = 'root';
+    if (targetNode !== undefined && targetNode !== null) desiredNodes[targetNode] = 'target';
+
+    var nodeUpdates = [];
+    var edgeUpdates = [];
+
+    if (!pathMode) {
+        // Entering path mode hides everything that is not on a path, once
+        nodes.forEach(function(n) {
+            if (!(n.id in desiredNodes)) nodeUpdates.push(defaultNodeStyle(n, true));
+        });
+        edges.forEach(function(e) {
+            if (!(e.id in desiredEdges)) edgeUpdates.push(defaultEdgeStyle(e.id, true));
+        });
+    } else {
+        // Already in path mode, only the previously highlighted elements can change
+        Object.keys(styledNodes).forEach(function(id) {
+            if (!(id in desiredNodes)) {
+                var n = nodes.get(id);
+                if (n) nodeUpdates.push(defaultNodeStyle(n, true));
+            }
+        });
+        Object.keys(styledEdges).forEach(function(id) {
+            if (!(id in desiredEdges)) edgeUpdates.push(defaultEdgeStyle(id, true));
+        });
+    }
+
+    Object.keys(desiredNodes).forEach(function(id) {
+        var style = desiredNodes[id];
+        if (pathMode && styledNodes[id] === style) return;
+        if (nodes.get(id) === null) {
+            delete desiredNodes[id];
+            return;
+        }
+        nodeUpdates.push({
+            id: id,
+            color: NODE_STYLES[style].color,
+            shadow: NODE_STYLES[style].shadow,
+            borderWidth: NODE_STYLES[style].borderWidth,
+            hidden: false
+        });
+    });
+
+    Object.keys(desiredEdges).forEach(function(id) {
+        if (pathMode && styledEdges[id]) return;
+        edgeUpdates.push({ id: id, color: '#FF0000', width: 2, hidden: false });
+    });
+
+    // One batched update per DataSet
+    if (nodeUpdates.length > 0) nodes.update(nodeUpdates);
+    if (edgeUpdates.length > 0) edges.update(edgeUpdates);
+
+    pathMode = true;
+    styledNodes = desiredNodes;
+    styledEdges = desiredEdges;
+
+    // Display path information
+    showPathInfo(targetNode);
+}
+
+// Function to reset the view
+function resetView() {
+    document.getElementById('path-info').style.display = 'none';
+    if (!pathMode) return;
+
+    // Everything not highlighted is hidden, so every element needs its default style back
+    var nodeUpdates = [];
+    var edgeUpdates = [];
+    nodes.forEach(function(n) {
+        nodeUpdates.push(defaultNodeStyle(n, false));
+    });
+    edges.forEach(function(e) {
+        edgeUpdates.push(defaultEdgeStyle(e.id, false));
+    });
+    nodes.update(nodeUpdates);
+    edges.update(edgeUpdates);
+
+    pathMode = false;
+    styledNodes = {};
+    styledEdges = {};
+}
+
+// Show path information
+function showPathInfo(targetNode) {
+    var pathInfo = document.getElementById('path-info');
+    if (!pathInfo) return;
+
+    var targetNodeData = targetNode !== undefined ? nodes.get(targetNode) : null;
+    if (!targetNodeData) {
+        pathInfo.style.display = 'none';
+        return;
+    }
+
+    var html = '<h3>Selected Node</h3>';
+
+    html += '<div style="margin-bottom: 10px;">';
+    html += '<strong>URL:</strong> ' + targetNodeData.url + '<br>';
+    html += '<strong>Title:</strong> ' + targetNodeData.title + '<br>';
+    html += '<button onclick="resetView()" style="margin-top: 10px; padding: 5px 10px;">Reset View</button>';
+    html += '</div>';
+
+    pathInfo.innerHTML = html;
+    pathInfo.style.display = 'block';
+}
+
+// Replace a cluster node with its children fetched from the server
+function expandCluster(clusterId) {
+    fetch('/api/graph/cluster?exploration_id=' + encodeURIComponent(explorationId) + '&id=' + encodeURIComponent(clusterId))
+        .then(function(response) {
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
+            }
+            return response.json();
+        })
+        .then(function(expansion) {
+            var sources = window.network.getConnectedNodes(clusterId, 'from');
+            edges.remove(window.network.getConnectedEdges(clusterId));
+            nodes.remove(clusterId);
+
+            var newNodes = expansion.nodes.filter(function(n) {
+                return nodes.get(n.id) === null;
+            });
+            nodes.add(newNodes);
+
+            // Edges that pointed at the cluster now point at its anchor or its children
+            var targets = expansion.anchor ? [expansion.anchor] : expansion.nodes.map(function(n) { return n.id; });
+            var newEdges = expansion.edges.slice();
+            sources.forEach(function(source) {
+                targets.forEach(function(target) {
+                    newEdges.push({ from: source, to: target });
+                });
+            });
+            edges.add(newEdges);
+
+            Object.keys(expansion.paths).forEach(function(url) {
+                allPathsData[url] = expansion.paths[url];
+            });
+        })
+        .catch(function(e) {
+            console.error('Error expanding cluster:', e);
+        });
+}
+
+function reportError(message) {
+    console.error(message);
+    var debugInfo = document.getElementById('debug-info');
+    debugInfo.innerHTML = message;
+    debugInfo.style.background = 'rgba(128,0,0,0.7)';
+    window.parent.postMessage({
+        type: 'error',
+        message: message
+    }, '*');
+}
+
+// Network events, including the messages the parent window listens for
+function setupNetworkHandlers() {
+    window.network.on("click", function(params) {
+        if (params.nodes.length > 0) {
+            var nodeId = params.nodes[0];
+            var node = nodes.get(nodeId);
+            console.log("Node clicked:", node);
+
+            if (node.cluster) {
+                expandCluster(nodeId);
+                return;
+            }
+
+            // Find all paths from root to selected node
+            var paths = findAllPaths(nodeId);
+
+            // Highlight the paths
+            highlightPaths(paths, nodeId);
+
+            // Send message to parent window
+            window.parent.postMessage({
+                type: 'nodeClick',
+                nodeId: nodeId,
+                nodeName: node.label || 'Unknown',
+                nodeUrl: node.url || nodeId,
+                paths: paths
+            }, '*');
+        } else {
+            // Clicked on empty space - reset view
+            resetView();
+        }
+    });
+
+    // Double click to focus on a node
+    window.network.on("doubleClick", function(params) {
+        if (params.nodes.length > 0) {
+            var nodeId = params.nodes[0];
+            window.network.focus(nodeId, {
+                scale: 1.2,
+                animation: true
+            });
+        }
+    });
+
+    window.network.on('hoverNode', function(params) {
+        var node = nodes.get(params.node);
+        if (!node || node.cluster) return;
+        window.parent.postMessage({
+            type: 'nodeHover',
+            nodeId: params.node,
+            nodeName: node.label || 'Unknown',
+            nodeUrl: node.url || params.node
+        }, '*');
+    });
+
+    window.network.on('blurNode', function() {
+        window.parent.postMessage({
+            type: 'nodeHoverEnd'
+        }, '*');
+    });
+}
+
+function renderGraph(data) {
+    rootNode = data.root;
+    allPathsData = data.paths || {};
+    nodes.add(data.nodes);
+    edges.add(data.edges);
+
+    var container = document.getElementById("mynetwork");
+    window.network = new vis.Network(container, { nodes: nodes, edges: edges }, data.options);
+    setupNetworkHandlers();
+
+    var debugInfo = document.getElementById('debug-info');
+    debugInfo.innerHTML = data.mode === 'clustered'
+        ? 'Site map: ' + data.page_count + ' pages (click a cluster to expand)'
+        : 'Network loaded successfully';
+    debugInfo.style.background = 'rgba(0,128,0,0.7)';
+    console.log('Graph loaded and network initialized');
+}
+
+// The renderer can be forced with ?renderer=vis or ?renderer=webgl, otherwise the server decides
+var requestedRenderer = viewerParams.get('renderer');
+
+function fetchGraphData(view) {
+    // Revalidate with the server on every load, an unchanged graph comes back as a 304
+    return fetch('/api/graph-data?exploration_id=' + encodeURIComponent(explorationId) + '&view=' + view, { cache: 'no-cache' })
+        .then(function(response) {
+            if (response.status === 404) {
+                throw new Error('No graph available yet. Please analyze a website first.');
+            }
+            if (!response.ok) {
+                throw new Error('Error loading graph: HTTP ' + response.status);
+            }
+            return response.json();
+        });
+}
+
+// Very large graphs are drawn by the WebGL renderer, loaded only when needed
+function loadWebGLGraph() {
+    var script = document.createElement('script');
+    script.src = '/static/js/graph-webgl.js';
+    script.onload = function() {
+        fetchGraphData('webgl')
+            .then(function(data) {
+                WebGLGraph.render(document.getElementById('mynetwork'), data);
+                var debugInfo = document.getElementById('debug-info');
+                debugInfo.innerHTML = 'WebGL view: ' + data.page_count + ' pages (scroll to zoom, double click to fit)';
+                debugInfo.style.background = 'rgba(0,128,0,0.7)';
+            })
+            .catch(function(e) {
+                reportError(e.message);
+            });
+    };
+    script.onerror = function() {
+        reportError('Could not load the WebGL renderer');
+    };
+    document.head.appendChild(script);
+}
+
+// Live mode: with &live=1 the graph grows while the analysis is still crawling.
+// Events are buffered and applied in one batched DataSet update per frame, at most
+// LIVE_FLUSH_INTERVAL ms apart, so a fast crawl cannot flood the renderer.
+var LIVE_FLUSH_INTERVAL = 100;
+var LIVE_LEVEL_SEPARATION = 200;
+var LIVE_NODE_SPACING = 150;
+
+var liveMode = viewerParams.get('live') === '1';
+var pendingNodes = [];
+var pendingEdges = [];
+var flushScheduled = false;
+var lastFlush = 0;
+var rowSizes = {};
+var livePages = {};
+
+// Place pages row by row around the root, alternating left and right of the centre
+function livePosition(depth) {
+    var k = rowSizes[depth] || 0;
+    rowSizes[depth] = k + 1;
+    var offset = Math.ceil(k / 2) * (k % 2 === 1 ? 1 : -1);
+    return { x: offset * LIVE_NODE_SPACING, y: depth * LIVE_LEVEL_SEPARATION };
+}
+
+function flushLiveUpdates(timestamp) {
+    if (timestamp - lastFlush < LIVE_FLUSH_INTERVAL) {
+        window.requestAnimationFrame(flushLiveUpdates);
+        return;
+    }
+    flushScheduled = false;
+    lastFlush = timestamp;
+
+    // update, not add: a page repeated in a batch must not throw and stall every later flush
+    if (pendingNodes.length > 0) nodes.update(pendingNodes);
+    // An edge whose parent has not been added yet waits for a later flush
+    var readyEdges = [];
+    var waitingEdges = [];
+    pendingEdges.forEach(function(e) {
+        (nodes.get(e.from) !== null ? readyEdges : waitingEdges).push(e);
+    });
+    if (readyEdges.length > 0) edges.update(readyEdges);
+    pendingNodes = [];
+    pendingEdges = waitingEdges;
+
+    var debugInfo = document.getElementById('debug-info');
+    debugInfo.innerHTML = 'Crawling: ' + nodes.length + ' pages found';
+}
+
+function scheduleLiveFlush() {
+    if (flushScheduled) return;
+    flushScheduled = true;
+    window.requestAnimationFrame(flushLiveUpdates);
+}
+
+function startLiveGraph() {
+    var container = document.getElementById("mynetwork");
+    window.network = new vis.Network(container, { nodes: nodes, edges: edges }, {
+        physics: { enabled: false },
+        interaction: { hover: true, navigationButtons: true, keyboard: true }
+    });
+    document.getElementById('debug-info').innerHTML = 'Waiting for the crawl to start...';
+
+    var source = new EventSource('/api/crawl-events/' + encodeURIComponent(explorationId));
+
+    source.addEventListener('node', function(message) {
+        var page = JSON.parse(message.data);
+        // A reconnecting EventSource gets the whole crawl replayed, keep the pages already placed
+        if (livePages[page.url]) return;
+        livePages[page.url] = true;
+        if (rootNode === null && !page.parent) rootNode = page.url;
+        var position = livePosition(page.depth);
+        pendingNodes.push({
+            id: page.url,
+            label: page.path === '/' ? 'Home' : page.path,
+            title: page.title,
+            url: page.url,
+            level: page.depth,
+            x: position.x,
+            y: position.y,
+            color: page.depth === 0 ? '#4CAF50' : '#2196F3'
+        });
+        if (page.parent) pendingEdges.push({ id: page.parent + '->' + page.url, from: page.parent, to: page.url });
+        scheduleLiveFlush();
+    });
+
+    source.addEventListener('done', function(message) {
+        source.close();
+        var result = JSON.parse(message.data);
+        if (result.status === 'completed') {
+            // Swap the provisional layout for the final graph, an embedding page reloads us itself
+            document.getElementById('debug-info').innerHTML = 'Crawl finished, loading final layout...';
+            if (window.parent === window) window.location.replace('/graph?exploration_id=' + encodeURIComponent(explorationId));
+        } else {
+            reportError('Analysis failed: ' + (result.error || 'unknown error'));
+        }
+    });
+
+    source.onerror = function() {
+        if (source.readyState === EventSource.CLOSED) {
+            reportError('Lost the connection to the crawl');
+        }
+    };
+}
+
+function loadGraph() {
+    if (!explorationId) {
+        reportError('No exploration selected. Please analyze a website first.');
+        return;
+    }
+    if (liveMode) {
+        startLiveGraph();
+        return;
+    }
+    if (requestedRenderer === 'webgl') {
+        loadWebGLGraph();
+        return;
+    }
+    fetchGraphData('vis')
+        .then(function(data) {
+            if (data.renderer === 'webgl' && requestedRenderer !== 'vis') {
+                loadWebGLGraph();
+            } else {
+                renderGraph(data);
+            }
+        })
+        .catch(function(e) {
+            reportError(e.message);
+        });
+}
+
+loadGraph();
@@ -0,0 +1,434 @@
+// WebGL renderer for very large site graphs.
+// Nodes are drawn as points and edges as lines straight from typed arrays, so tens of
+// thousands of pages stay interactive. Node clicks and hovers are reported to the parent
+// window with the same messages as the vis-network viewer.
+
+var WebGLGraph = (function() {
+    var VERTEX_SHADER = [
+        'attribute vec2 a_position;',
+        'attribute vec3 a_color;',
+        'uniform vec2 u_offset;',
+        'uniform float u_scale;',
+        'uniform vec2 u_resolution;',
+        'uniform float u_pointSize;',
+        'varying vec3 v_color;',
+        'void main() {',
+        '    vec2 screen = (a_position - u_offset) * u_scale;',
+        '    gl_Position = vec4(screen / (u_resolution * 0.5) * vec2(1.0, -1.0), 0.0, 1.0);',
+        '    gl_PointSize = u_pointSize;',
+        '    v_color = a_color;',
+        '}'
+    ].join('\n');
+
+    var FRAGMENT_SHADER = [
+        'precision mediump float;',
+        'uniform float u_round;',
+        'varying vec3 v_color;',
+        'void main() {',
+        '    if (u_round > 0.5) {',
+        '        vec2 d = gl_PointCoord - vec2(0.5);',
+        '        if (dot(d, d) > 0.25) discard;',
+        '    }',
+        '    gl_FragColor = vec4(v_color, 1.0);',
+        '}'
+    ].join('\n');
+
+    var ROOT_COLOR = [0.298, 0.686, 0.314];     // #4CAF50
+    var NODE_COLOR = [0.129, 0.588, 0.953];     // #2196F3
+    var EDGE_COLOR = [0.706, 0.816, 0.933];
+    var PATH_COLOR = [1.0, 0.0, 0.0];           // #FF0000
+    var TARGET_COLOR = [0.914, 0.118, 0.388];   // #e91e63
+
+    var STRIDE = 5;  // x, y, r, g, b
+
+    var state = null;
+
+    function compileShader(gl, type, source) {
+        var shader = gl.createShader(type);
+        gl.shaderSource(shader, source);
+        gl.compileShader(shader);
+        if (!gl.getShaderParameter(shader, gl.COMPILE_STATUS)) {
+            throw new Error('Shader compilation failed: ' + gl.getShaderInfoLog(shader));
+        }
+        return shader;
+    }
+
+    function createProgram(gl) {
+        var program = gl.createProgram();
+        gl.attachShader(program, compileShader(gl, gl.VERTEX_SHADER, VERTEX_SHADER));
+        gl.attachShader(program, compileShader(gl, gl.FRAGMENT_SHADER, FRAGMENT_SHADER));
+        gl.linkProgram(program);
+        if (!gl.getProgramParameter(program, gl.LINK_STATUS)) {
+            throw new Error('Program link failed: ' + gl.getProgramInfoLog(program));
+        }
+        return program;
+    }
+
+    function createBuffer(gl, data) {
+        var buffer = gl.createBuffer();
+        gl.bindBuffer(gl.ARRAY_BUFFER, buffer);
+        gl.bufferData(gl.ARRAY_BUFFER, data, gl.STATIC_DRAW);
+        return buffer;
+    }
+
+    // Interleaved vertex data for every node
+    function buildNodeVertices(data) {
+        var count = data.urls.length;
+        var vertices = new Float32Array(count * STRIDE);
+        for (var i = 0; i < count; i++) {
+            var color = data.depth[i] === 0 ? ROOT_COLOR : NODE_COLOR;
+            vertices.set([data.x[i], data.y[i], color[0], color[1], color[2]], i * STRIDE);
+        }
+        return vertices;
+    }
+
+    // Two vertices per edge, drawn with gl.LINES
+    function buildEdgeVertices(data, pairs, color) {
+        var vertices = new Float32Array(pairs.length * STRIDE);
+        for (var i = 0; i < pairs.length; i++) {
+            var node = pairs[i];
+            vertices.set([data.x[node], data.y[node], color[0], color[1], color[2]], i * STRIDE);
+        }
+        return vertices;
+    }
+
+    // Uniform grid over world coordinates, used to pick the node under the cursor
+    function buildPickingGrid(data, bounds) {
+        var extent = Math.max(bounds.maxX - bounds.minX, bounds.maxY - bounds.minY, 1);
+        var cellSize = extent / 256;
+        var cells = {};
+        for (var i = 0; i < data.urls.length; i++) {
+            var key = Math.floor(data.x[i] / cellSize) + '|' + Math.floor(data.y[i] / cellSize);
+            (cells[key] = cells[key] || []).push(i);
+        }
+        return { cellSize: cellSize, cells: cells };
+    }
+
+    function computeBounds(data) {
+        var bounds = { minX: Infinity, minY: Infinity, maxX: -Infinity, maxY: -Infinity };
+        for (var i = 0; i < data.urls.length; i++) {
+            bounds.minX = Math.min(bounds.minX, data.x[i]);
+            bounds.maxX = Math.max(bounds.maxX, data.x[i]);
+            bounds.minY = Math.min(bounds.minY, data.y[i]);
+            bounds.maxY = Math.max(bounds.maxY, data.y[i]);
+        }
+        if (!isFinite(bounds.minX)) {
+            bounds = { minX: 0, minY: 0, maxX: 0, maxY: 0 };
+        }
+        return bounds;
+    }
+
+    function fitView() {
+        var b = state.bounds;
+        var width = state.canvas.clientWidth;
+        var height = state.canvas.clientHeight;
+        state.offset = [(b.minX + b.maxX) / 2, (b.minY + b.maxY) / 2];
+        state.scale = 0.9 * Math.min(width / Math.max(b.maxX - b.minX, 1), height / Math.max(b.maxY - b.minY, 1));
+        requestDraw();
+    }
+
+    function pointSize() {
+        // Node spacing is 150 world units, keep points proportional but visible at any zoom
+        return Math.max(2, Math.min(14, 150 * state.scale * 0.3));
+    }
+
+    function screenToWorld(px, py) {
+        return [
+            state.offset[0] + (px - state.canvas.clientWidth / 2) / state.scale,
+            state.offset[1] + (py - state.canvas.clientHeight / 2) / state.scale
+        ];
+    }
+
+    function pickNode(px, py) {
+        var world = screenToWorld(px, py);
+        var radius = (pointSize() / 2 + 3) / state.scale;
+        var grid = state.grid;
+        var minCX = Math.floor((world[0] - radius) / grid.cellSize);
+        var maxCX = Math.floor((world[0] + radius) / grid.cellSize);
+        var minCY = Math.floor((world[1] - radius) / grid.cellSize);
+        var maxCY = Math.floor((world[1] + radius) / grid.cellSize);
+        var best = -1;
+        var bestDistance = radius * radius;
+        for (var cx = minCX; cx <= maxCX; cx++) {
+            for (var cy = minCY; cy <= maxCY; cy++) {
+                var members = grid.cells[cx + '|' + cy];
+                if (!members) continue;
+                for (var k = 0; k < members.length; k++) {
+                    var i = members[k];
+                    var dx = state.data.x[i] - world[0];
+                    var dy = state.data.y[i] - world[1];
+                    var distance = dx * dx + dy * dy;
+                    if (distance <= bestDistance) {
+                        best = i;
+                        bestDistance = distance;
+                    }
+                }
+            }
+        }
+        return best;
+    }
+
+    function bindVertices(buffer) {
+        var gl = state.gl;
+        gl.bindBuffer(gl.ARRAY_BUFFER, buffer);
+        gl.vertexAttribPointer(state.locations.position, 2, gl.FLOAT, false, STRIDE * 4, 0);
+        gl.vertexAttribPointer(state.locations.color, 3, gl.FLOAT, false, STRIDE * 4, 8);
+    }
+
+    function draw() {
+        state.drawPending = false;
+        var gl = state.gl;
+        var canvas = state.canvas;
+        var ratio = window.devicePixelRatio || 1;
+        var width = Math.floor(canvas.clientWidth * ratio);
+        var height = Math.floor(canvas.clientHeight * ratio);
+        if (canvas.width !== width || canvas.height !== height) {
+            canvas.width = width;
+            canvas.height = height;
+        }
+
+        gl.viewport(0, 0, width, height);
+        gl.clearColor(1, 1, 1, 1);
+        gl.clear(gl.COLOR_BUFFER_BIT);
+
+        gl.useProgram(state.program);
+        gl.uniform2f(state.locations.offset, state.offset[0], state.offset[1]);
+        gl.uniform1f(state.locations.scale, state.scale);
+        gl.uniform2f(state.locations.resolution, canvas.clientWidth, canvas.clientHeight);
+        gl.uniform1f(state.locations.pointSize, pointSize() * ratio);
+
+        gl.uniform1f(state.locations.round, 0);
+        bindVertices(state.edgeBuffer);
+        gl.drawArrays(gl.LINES, 0, state.edgeVertexCount);
+
+        gl.uniform1f(state.locations.round, 1);
+        bindVertices(state.nodeBuffer);
+        gl.drawArrays(gl.POINTS, 0, state.data.urls.length);
+
+        if (state.highlight) {
+            gl.uniform1f(state.locations.round, 0);
+            bindVertices(state.highlight.lineBuffer);
+            gl.drawArrays(gl.LINES, 0, state.highlight.lineVertexCount);
+
+            gl.uniform1f(state.locations.pointSize, (pointSize() + 4) * ratio);
+            gl.uniform1f(state.locations.round, 1);
+            bindVertices(state.highlight.pointBuffer);
+            gl.drawArrays(gl.POINTS, 0, state.highlight.pointCount);
+        }
+    }
+
+    // Coalesce redraws to at most one per animation frame
+    function requestDraw() {
+        if (!state.drawPending) {
+            state.drawPending = true;
+            window.requestAnimationFrame(draw);
+        }
+    }
+
+    function clearHighlight() {
+        if (state.highlight) {
+            state.gl.deleteBuffer(state.highlight.lineBuffer);
+            state.gl.deleteBuffer(state.highlight.pointBuffer);
+            state.highlight = null;
+            requestDraw();
+        }
+    }
+
+    function highlightPath(pathIndexes, target) {
+        clearHighlight();
+        var pairs = [];
+        for (var i = 0; i < pathIndexes.length - 1; i++) {
+            pairs.push(pathIndexes[i], pathIndexes[i + 1]);
+        }
+        var points = new Float32Array((pathIndexes.length + 1) * STRIDE);
+        pathIndexes.concat([target]).forEach(function(node, i) {
+            var color = node === target ? TARGET_COLOR : PATH_COLOR;
+            points.set([state.data.x[node], state.data.y[node], color[0], color[1], color[2]], i * STRIDE);
+        });
+        state.highlight = {
+            lineBuffer: createBuffer(state.gl, buildEdgeVertices(state.data, pairs, PATH_COLOR)),
+            lineVertexCount: pairs.length,
+            pointBuffer: createBuffer(state.gl, points),
+            pointCount: pathIndexes.length + 1
+        };
+        requestDraw();
+    }
+
+    function selectNode(node) {
+        var url = state.data.urls[node];
+        var message = {
+            type: 'nodeClick',
+            nodeId: url,
+            nodeName: state.data.labels[node] || 'Unknown',
+            nodeUrl: url,
+            paths: []
+        };
+        highlightPath([], node);
+
+        // Paths are not shipped with the WebGL data, ask for the shortest one from the root
+        fetch('/api/graph/path?exploration_id=' + encodeURIComponent(state.data.exploration_id) +
+              '&source=' + encodeURIComponent(state.data.root) + '&target=' + encodeURIComponent(url))
+            .then(function(response) {
+                return response.ok ? response.json() : null;
+            })
+            .then(function(result) {
+                if (result && state.data.urls[node] === url) {
+                    var urls = result.path.map(function(step) { return step.url; });
+                    message.paths = [urls];
+                    highlightPath(urls.map(function(u) { return state.index[u]; }).filter(function(i) {
+                        return i !== undefined;
+                    }), node);
+                }
+            })
+            .catch(function(e) {
+                console.error('Error fetching path:', e);
+            })
+            .then(function() {
+                window.parent.postMessage(message, '*');
+            });
+    }
+
+    function showTooltip(node, px, py) {
+        var tooltip = state.tooltip;
+        if (node < 0) {
+            tooltip.style.display = 'none';
+            return;
+        }
+        tooltip.innerHTML = '<strong></strong><br><span></span>';
+        tooltip.firstChild.textContent = state.data.titles[node];
+        tooltip.lastChild.textContent = state.data.urls[node];
+        tooltip.style.left = (px + 12) + 'px';
+        tooltip.style.top = (py + 12) + 'px';
+        tooltip.style.display = 'block';
+    }
+
+    function setHover(node, px, py) {
+        showTooltip(node, px, py);
+        if (node === state.hovered) return;
+        if (state.hovered >= 0) {
+            window.parent.postMessage({ type: 'nodeHoverEnd' }, '*');
+        }
+        state.hovered = node;
+        if (node >= 0) {
+            window.parent.postMessage({
+                type: 'nodeHover',
+                nodeId: state.data.urls[node],
+                nodeName: state.data.labels[node] || 'Unknown',
+                nodeUrl: state.data.urls[node]
+            }, '*');
+        }
+    }
+
+    function attachInteraction() {
+        var canvas = state.canvas;
+        var drag = null;
+
+        canvas.addEventListener('mousedown', function(event) {
+            drag = { x: event.offsetX, y: event.offsetY, moved: false };
+        });
+
+        canvas.addEventListener('mousemove', function(event) {
+            if (drag) {
+                var dx = event.offsetX - drag.x;
+                var dy = event.offsetY - drag.y;
+                if (Math.abs(dx) + Math.abs(dy) > 2) drag.moved = true;
+                state.offset[0] -= dx / state.scale;
+                state.offset[1] -= dy / state.scale;
+                drag.x = event.offsetX;
+                drag.y = event.offsetY;
+                requestDraw();
+                return;
+            }
+            setHover(pickNode(event.offsetX, event.offsetY), event.offsetX, event.offsetY);
+        });
+
+        canvas.addEventListener('mouseup', function(event) {
+            var click = drag && !drag.moved;
+            drag = null;
+            if (!click) return;
+            var node = pickNode(event.offsetX, event.offsetY);
+            if (node >= 0) {
+                selectNode(node);
+            } else {
+                clearHighlight();
+            }
+        });
+
+        canvas.addEventListener('mouseleave', function() {
+            drag = null;
+            setHover(-1, 0, 0);
+        });
+
+        canvas.addEventListener('wheel', function(event) {
+            event.preventDefault();
+            // Zoom around the cursor, keeping the world point under it fixed
+            var before = screenToWorld(event.offsetX, event.offsetY);
+            state.scale *= Math.exp(-event.deltaY * 0.0015);
+            var after = screenToWorld(event.offsetX, event.offsetY);
+            state.offset[0] += before[0] - after[0];
+            state.offset[1] += before[1] - after[1];
+            requestDraw();
+        }, { passive: false });
+
+        canvas.addEventListener('dblclick', fitView);
+        window.addEventListener('resize', requestDraw);
+    }
+
+    function render(container, data) {
+        var canvas = document.createElement('canvas');
+        canvas.style.width = '100%';
+        canvas.style.height = '100%';
+        canvas.style.display = 'block';
+        container.appendChild(canvas);
+
+        var tooltip = document.createElement('div');
+        tooltip.style.cssText = 'position:absolute;display:none;pointer-events:none;background:rgba(255,255,255,0.95);' +
+            'padding:5px;border-radius:3px;box-shadow:0 2px 6px rgba(0,0,0,0.3);font:12px Arial,sans-serif;z-index:1000;';
+        container.appendChild(tooltip);
+
+        var gl = canvas.getContext('webgl', { antialias: true });
+        if (!gl) {
+            throw new Error('WebGL is not available in this browser');
+        }
+
+        var program = createProgram(gl);
+        var index = {};
+        data.urls.forEach(function(url, i) { index[url] = i; });
+        var bounds = computeBounds(data);
+
+        state = {
+            canvas: canvas,
+            tooltip: tooltip,
+            gl: gl,
+            program: program,
+            data: data,
+            index: index,
+            bounds: bounds,
+            grid: buildPickingGrid(data, bounds),
+            nodeBuffer: createBuffer(gl, buildNodeVertices(data)),
+            edgeBuffer: createBuffer(gl, buildEdgeVertices(data, data.edges, EDGE_COLOR)),
+            edgeVertexCount: data.edges.length,
+            locations: {
+                position: gl.getAttribLocation(program, 'a_position'),
+                color: gl.getAttribLocation(program, 'a_color'),
+                offset: gl.getUniformLocation(program, 'u_offset'),
+                scale: gl.getUniformLocation(program, 'u_scale'),
+                resolution: gl.getUniformLocation(program, 'u_resolution'),
+                pointSize: gl.getUniformLocation(program, 'u_pointSize'),
+                round: gl.getUniformLocation(program, 'u_round')
+            },
+            offset: [0, 0],
+            scale: 1,
+            hovered: -1,
+            highlight: null,
+            drawPending: false
+        };
+        gl.enableVertexAttribArray(state.locations.position);
+        gl.enableVertexAttribArray(state.locations.color);
+
+        attachInteraction();
+        fitView();
+    }
+
+    return { render: render };
+})();
@@ -9,12 +9,13 @@
 let currentExploration = null;
 let currentTestCases = [];
 let currentGeneratedCode = {};
+let savedExplorationsCursor = null;  // next_cursor de /api/explorations, null en la última página
 
 /**
  * Inicializa la interfaz de exploraciones guardadas
  */
 function initSavedExplorations() {
-    $('#saved-explorations-btn').on('click', loadSavedExplorations);
+    $('#saved-explorations-btn').on('click', () => loadSavedExplorations());
     $('#exploration-details-close').on('click', closeExplorationDetails);
     
     // Botones de acción
@@ -27,18 +28,23 @@ function initSavedExplorations() {
 }
 
 /**
- * Carga la lista de exploraciones guardadas
+ * Carga la lista de exploraciones guardadas, o la página siguiente si append es true
  */
-function loadSavedExplorations() {
+function loadSavedExplorations(append = false) {
     showLoading('Cargando exploraciones guardadas...');
     
-    fetch('/api/explorations')
+    const url = append && savedExplorationsCursor
+        ? `/api/explorations?cursor=${encodeURIComponent(savedExplorationsCursor)}`
+        : '/api/explorations';
+    
+    fetch(url)
         .then(response => response.json())
         .then(data => {
             hideLoading();
             
             if (data.explorations && data.explorations.length > 0) {
-                displaySavedExplorations(data.explorations);
+                savedExplorationsCursor = data.next_cursor || null;
+                displaySavedExplorations(data.explorations, append);
                 $('#saved-explorations-container').removeClass('d-none');
                 $('#website-form-container').addClass('d-none');
             } else {
@@ -55,9 +61,12 @@ function loadSavedExplorations() {
 /**
  * Muestra la lista de exploraciones guardadas
  */
-function displaySavedExplorations(explorations) {
+function displaySavedExplorations(explorations, append = false) {
     const tableBody = $('#saved-explorations-table tbody');
-    tableBody.empty();
+    if (!append) {
+        tableBody.empty();
+    }
+    const offset = tableBody.children('tr').length;
     
     explorations.forEach((exploration, index) => {
         const hasTestCases = exploration.summary && exploration.summary.has_test_cases;
@@ -66,7 +75,7 @@ function displaySavedExplorations(explorations) {
         
         const row = `
             <tr data-exploration-id="${exploration._id}">
-                <td>${index + 1}</td>
+                <td>${offset + index + 1}</td>
                 <td>
                     <strong>${exploration.name || exploration.domain || 'Sin nombre'}</strong>
                     <br>
@@ -98,15 +107,26 @@ function displaySavedExplorations(explorations) {
     });
     
     // Asigna event handlers
-    $('.load-exploration-btn').on('click', function() {
+    $('.load-exploration-btn').off('click').on('click', function() {
         const explorationId = $(this).data('exploration-id');
         loadExplorationDetails(explorationId);
     });
     
-    $('.delete-exploration-btn').on('click', function() {
+    $('.delete-exploration-btn').off('click').on('click', function() {
         const explorationId = $(this).data('exploration-id');
         confirmDeleteExploration(explorationId);
     });
+    
+    // Botón para cargar la página siguiente, visible mientras queden exploraciones
+    if ($('#load-more-explorations').length === 0) {
+        $('#saved-explorations-table').after(`
+            <button id="load-more-explorations" class="btn btn-outline-secondary btn-block d-none">
+                <i class="fas fa-chevron-down"></i> Cargar más
+            </button>
+        `);
+        $('#load-more-explorations').on('click', () => loadSavedExplorations(true));
+    }
+    $('#load-more-explorations').toggleClass('d-none', !savedExplorationsCursor);
 }
 
 /**
@@ -139,7 +159,7 @@ function displayExplorationDetails(exploration) {
     $('#exploration-date').text(new Date(exploration.created_at).toLocaleString());
     
     // Información de la estructura
-    const pageCount = exploration.data && exploration.data.pages ? Object.keys(exploration.data.pages).length : 0;
+    const pageCount = exploration.summary && exploration.summary.page_count || 0;
     $('#exploration-page-count').text(pageCount);
     
     // Muestra la sección de detalles
@@ -13,6 +13,7 @@ def ensure_directories():
             "app/static",
             "app/static/code",
             "app/static/test_cases",
+            "data/explorations",
             "app/static/pyvis_libs",
             "app/static/pyvis_libs/lib",
             "app/static/pyvis_libs/lib/bindings",
@@ -0,0 +1,101 @@
+import os
+import gzip
+import json
+import logging
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+logger = logging.getLogger("web-analysis-framework.utils")
+
+def file_etag(path):
+    """Build a strong ETag from a file's modification time and size"""
+    stat = os.stat(path)
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def gzip_etag(etag):
+    """Build the strong ETag of the gzip variant of the representation with this ETag"""
+    return etag[:-1] + '-gz"'
+
+def etag_matches(request: Request, *etags: str) -> bool:
+    """Check whether the client already holds a representation with one of these ETags"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(etag in candidates or f"W/{etag}" in candidates for etag in etags)
+
+def _qvalue(params) -> float:
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether Accept-Encoding allows gzip: listed with a non-zero q-value, or covered by *"""
+    gzip_q = None
+    wildcard_q = None
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, *params = coding.split(";")
+        name = name.strip().lower()
+        if name in ("gzip", "x-gzip"):
+            gzip_q = max(gzip_q or 0.0, _qvalue(params))
+        elif name == "*":
+            wildcard_q = _qvalue(params)
+    if gzip_q is None:
+        gzip_q = wildcard_q
+    return gzip_q is not None and gzip_q > 0
+
+def write_json_with_gzip(path, data, indent=None):
+    """Write a JSON artifact plus a precompressed .gz copy next to it"""
+    separators = (",", ":") if indent is None else None
+    body = json.dumps(data, indent=indent, separators=separators).encode("utf-8")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(body)
+    with open(path + ".gz.tmp", "wb") as f:
+        f.write(gzip.compress(body, compresslevel=6))
+    # Replace the plain file first, a .gz older than it is treated as stale
+    os.replace(path + ".tmp", path)
+    os.replace(path + ".gz.tmp", path + ".gz")
+    return len(body)
+
+def file_response(request: Request, path: str, media_type: str, cache_control: str = "no-cache") -> Response:
+    """Serve a file straight from disk with ETag revalidation and an optional .gz variant
+
+    The ETag is derived from the plain file, with a -gz suffix for the gzip
+    variant so caches keep the encodings apart. Both come from the same file,
+    so either one returns a 304 while the client's copy is still current.
+    """
+    etag = file_etag(path)
+    gzip_path = path + ".gz"
+    use_gzip = (accepts_gzip(request) and os.path.exists(gzip_path)
+                and os.path.getmtime(gzip_path) >= os.path.getmtime(path))
+    headers = {"ETag": gzip_etag(etag) if use_gzip else etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag, gzip_etag(etag)):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return FileResponse(gzip_path, media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+def bytes_response(request: Request, body: bytes, etag: str, media_type: str, gzip_body: bytes = None,
+                   cache_control: str = "no-cache") -> Response:
+    """Serve pre-serialized bytes with ETag revalidation and an optional gzip variant
+
+    The gzip variant is served under etag with a -gz suffix, see file_response.
+    """
+    use_gzip = gzip_body is not None and accepts_gzip(request)
+    headers = {"ETag": gzip_etag(etag) if use_gzip else etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag, gzip_etag(etag)):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=gzip_body, media_type=media_type, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark the storage backends on the application's workloads
+
+Usage: python benchmark_storage_backends.py [structure.json] [--explorations N] [--mongo-uri URI]
+
+Runs the same sequence of operations against SQLite (in a temporary file) and,
+when a server answers at the given URI, MongoDB (in a throwaway database).
+Without a structure file, the one of the latest analysis in data/explorations
+is used.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+# Add the project root to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.sqlite_storage import SQLiteStorage
+from app.core.explorations import EXPLORATIONS_DIR, latest_structure_path
+
+def timed(results, name, fn, repeat=1):
+    """Run fn repeat times and record the mean time in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        value = fn()
+    results[name] = (time.perf_counter() - start) * 1000 / repeat
+    return value
+
+def run_workload(storage, structure, explorations):
+    """Run the workload and return {operation: mean ms}"""
+    results = {}
+    url = structure["url"]
+    page_urls = list(structure["pages"])
+    test_cases = [
+        {"id": i, "title": f"Test {i}", "description": "Generated", "steps": ["Open page"] * 5,
+         "expected_results": ["Page loads"]}
+        for i in range(1, 21)
+    ]
+
+    ids = []
+    start = time.perf_counter()
+    for i in range(explorations):
+        ids.append(storage.save_exploration(url if i % 2 == 0 else f"{url}?site={i}", structure))
+    results["save_exploration"] = (time.perf_counter() - start) * 1000 / explorations
+
+    exploration_id = ids[-1]
+    timed(results, "get_exploration", lambda: storage.get_exploration(exploration_id), repeat=10)
+    timed(results, "get_exploration_by_url", lambda: storage.get_exploration_by_url(url), repeat=10)
+    timed(results, "get_exploration (header)",
+          lambda: storage.get_exploration(exploration_id, include_pages=False, include_graph=False), repeat=10)
+    timed(results, "get_pages (50)", lambda: storage.get_pages(exploration_id, skip=50, limit=50), repeat=10)
+    timed(results, "get_graph", lambda: storage.get_graph(exploration_id), repeat=10)
+    timed(results, "get_page", lambda: [storage.get_page(exploration_id, page) for page in page_urls[:50]])
+    results["get_page"] /= min(50, len(page_urls))
+    timed(results, "list_explorations", lambda: storage.list_explorations(limit=50), repeat=20)
+    timed(results, "save_test_cases (20)", lambda: storage.save_test_cases(exploration_id, test_cases))
+    timed(results, "save_generated_code", lambda: [storage.save_generated_code(exploration_id, tc["id"], "print('ok')")
+                                                   for tc in test_cases])
+    results["save_generated_code"] /= len(test_cases)
+    timed(results, "get_test_cases_with_code", lambda: storage.get_test_cases_with_code(exploration_id), repeat=20)
+    timed(results, "delete_exploration", lambda: [storage.delete_exploration(i) for i in ids])
+    results["delete_exploration"] /= len(ids)
+    return results
+
+def mongo_storage(uri):
+    """Connect to MongoDB in a throwaway database, or return None if no server answers"""
+    from app.core.db_manager import DatabaseManager
+    storage = DatabaseManager(mongo_uri=uri, db_name=f"benchmark_{int(time.time())}")
+    if not storage.ping():
+        print(f"MongoDB not available at {uri}, skipping it")
+        return None
+    return storage
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the storage backends")
+    parser.add_argument("structure", nargs="?", help="website structure JSON file, by default the latest exploration's")
+    parser.add_argument("--explorations", type=int, default=20)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    args = parser.parse_args()
+    if args.structure is None:
+        args.structure = latest_structure_path()
+        if args.structure is None:
+            parser.error(f"no exploration found in {EXPLORATIONS_DIR}, analyze a website or pass a structure file")
+
+    with open(args.structure, "r", encoding="utf-8") as f:
+        structure = json.load(f)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteStorage(os.path.join(tmp, "benchmark.db"))
+        results["sqlite"] = run_workload(sqlite, structure, args.explorations)
+        sqlite.close()
+
+    mongo = mongo_storage(args.mongo_uri)
+    if mongo is not None:
+        try:
+            results["mongodb"] = run_workload(mongo, structure, args.explorations)
+        finally:
+            mongo.client.drop_database(mongo.db.name)
+
+    backends = list(results)
+    print(f"Pages per exploration: {len(structure['pages'])}, explorations: {args.explorations}")
+    print(f"{'Operation (mean ms)':30}" + "".join(f"{name:>12}" for name in backends))
+    for operation in results["sqlite"]:
+        print(f"{operation:30}" + "".join(f"{results[name][operation]:12.3f}" for name in backends))
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Benchmark the compact website structure format against the indented JSON file
+
+Usage: python benchmark_structure_format.py [structure.json] [--scale N]
+
+--scale N replicates the pages of the input N times (with distinct URLs) to
+simulate larger sites.
+Without a structure file, the one of the latest analysis in data/explorations
+is used.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+# Add the project root to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.structure_store import write_structure, read_structure, StructureReader
+from app.core.explorations import EXPLORATIONS_DIR, latest_structure_path
+
+def scaled_structure(structure, scale):
+    """Copy every page scale times under distinct URLs"""
+    if scale <= 1:
+        return structure
+    pages = {}
+    for i in range(scale):
+        for url, record in structure["pages"].items():
+            pages[f"{url}#copy{i}" if i else url] = record
+    scaled = dict(structure)
+    scaled["pages"] = pages
+    return scaled
+
+def best_of(runs, fn):
+    """Fastest wall time of several runs, in milliseconds"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the compact structure format with JSON")
+    parser.add_argument("structure", nargs="?", help="website structure JSON file, by default the latest exploration's")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    if args.structure is None:
+        args.structure = latest_structure_path()
+        if args.structure is None:
+            parser.error(f"no exploration found in {EXPLORATIONS_DIR}, analyze a website or pass a structure file")
+
+    with open(args.structure, "r", encoding="utf-8") as f:
+        structure = scaled_structure(json.load(f), args.scale)
+    urls = list(structure["pages"])
+    sample = random.Random(0).sample(urls, min(20, len(urls)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "website_structure.json")
+        compact_path = os.path.join(tmp, "website_structure.wsb")
+
+        def write_json():
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(structure, f, indent=2)
+
+        write_json_ms = best_of(args.runs, write_json)
+        write_compact_ms = best_of(args.runs, lambda: write_structure(compact_path, structure))
+
+        def load_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        load_json_ms = best_of(args.runs, load_json)
+        load_compact_ms = best_of(args.runs, lambda: read_structure(compact_path))
+
+        # One page, the way /page-info needs it: JSON has to parse everything first
+        page_json_ms = best_of(args.runs, lambda: [load_json()["pages"][url] for url in sample[:1]])
+
+        def read_compact_page():
+            with StructureReader(compact_path) as reader:
+                return reader.get_page(sample[0])
+
+        page_compact_ms = best_of(args.runs, read_compact_page)
+
+        with StructureReader(compact_path) as reader:
+            random_pages_ms = best_of(args.runs, lambda: [reader.get_page(url) for url in sample]) / len(sample)
+
+        json_size = os.path.getsize(json_path)
+        compact_size = os.path.getsize(compact_path)
+
+    print(f"Pages: {len(urls)}")
+    print(f"{'':28}{'JSON':>12}{'compact':>12}")
+    print(f"{'File size (KiB)':28}{json_size / 1024:12.1f}{compact_size / 1024:12.1f}")
+    print(f"{'Write (ms)':28}{write_json_ms:12.2f}{write_compact_ms:12.2f}")
+    print(f"{'Full load (ms)':28}{load_json_ms:12.2f}{load_compact_ms:12.2f}")
+    print(f"{'Open + read one page (ms)':28}{page_json_ms:12.2f}{page_compact_ms:12.2f}")
+    print(f"{'Read page, open reader (ms)':28}{'-':>12}{random_pages_ms:12.3f}")
+    print(f"Size ratio: {compact_size / json_size:.2%} of JSON")
+
+if __name__ == "__main__":
+    main()
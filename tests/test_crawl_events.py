@@ -0,0 +1,57 @@
+import asyncio
+from app.core.crawl_events import CrawlEventBroker
+
+def _node(url):
+    return {"type": "node", "url": url}
+
+async def _collect(broker, stream_id):
+    return [event async for event in broker.subscribe(stream_id)]
+
+def test_late_subscriber_gets_the_whole_history():
+    broker = CrawlEventBroker()
+    broker.publish("crawl", _node("/"))
+    broker.publish("crawl", _node("/a"))
+    broker.close("crawl", {"type": "done", "status": "completed"})
+
+    events = asyncio.run(_collect(broker, "crawl"))
+
+    assert [event.get("url") for event in events] == ["/", "/a", None]
+    assert events[-1]["type"] == "done"
+
+def test_reconnecting_subscriber_gets_the_history_replayed():
+    broker = CrawlEventBroker()
+
+    async def scenario():
+        broker.publish("crawl", _node("/"))
+        first = broker.subscribe("crawl")
+        assert (await first.__anext__())["url"] == "/"
+        await first.aclose()
+
+        broker.publish("crawl", _node("/a"))
+        second = broker.subscribe("crawl")
+        replayed = [(await second.__anext__())["url"], (await second.__anext__())["url"]]
+        broker.close("crawl", {"type": "done", "status": "completed"})
+        rest = [event async for event in second]
+        return replayed, rest
+
+    replayed, rest = asyncio.run(scenario())
+
+    assert replayed == ["/", "/a"]
+    assert [event["type"] for event in rest] == ["done"]
+
+def test_closed_stream_ignores_later_events():
+    broker = CrawlEventBroker()
+    broker.close("crawl", {"type": "done", "status": "failed"})
+    broker.publish("crawl", _node("/late"))
+
+    events = asyncio.run(_collect(broker, "crawl"))
+
+    assert events == [{"type": "done", "status": "failed"}]
+
+def test_only_the_most_recent_finished_streams_are_kept():
+    broker = CrawlEventBroker(max_finished=2)
+    for stream_id in ("one", "two", "three"):
+        broker.publish(stream_id, _node("/"))
+        broker.close(stream_id, {"type": "done", "status": "completed"})
+
+    assert list(broker._finished) == ["two", "three"]
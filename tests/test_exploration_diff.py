@@ -0,0 +1,65 @@
+from app.core.exploration_diff import ExplorationSnapshot, diff_snapshots
+
+ROOT = "https://example.com/"
+
+def _snapshot(pages, category=None):
+    return ExplorationSnapshot({"url": ROOT, "category": category, "pages": pages})
+
+def test_pages_are_classified():
+    base = _snapshot({
+        ROOT: {"title": "Home", "links": ["/a", "/gone"]},
+        "/a": {"title": "A", "parent": ROOT},
+        "/b": {"title": "B", "parent": ROOT},
+        "/gone": {"title": "Gone", "parent": ROOT}
+    })
+    target = _snapshot({
+        "/new": {"title": "New", "parent": ROOT},
+        ROOT: {"title": "Home", "links": ["/a", "/new"]},
+        "/a": {"title": "A", "parent": ROOT},
+        "/b": {"title": "B, edited", "parent": ROOT}
+    })
+
+    diff = diff_snapshots(base, target)
+
+    assert diff["pages_added"] == ["/new"]
+    assert diff["pages_removed"] == ["/gone"]
+    assert diff["pages_changed"] == ["/b"]
+    assert diff["counts"]["pages_unchanged"] == 2
+    assert {"source": ROOT, "target": "/new"} in diff["edges_added"]
+    assert diff["edges_removed"] == [{"source": ROOT, "target": "/gone"}]
+
+def test_moved_page_only_changes_edges():
+    base = _snapshot({
+        ROOT: {"title": "Home"},
+        "/a": {"title": "A", "parent": ROOT, "depth": 1},
+        "/b": {"title": "B", "parent": ROOT, "depth": 1}
+    })
+    target = _snapshot({
+        ROOT: {"title": "Home"},
+        "/a": {"title": "A", "parent": ROOT, "depth": 1},
+        "/b": {"title": "B", "parent": "/a", "depth": 2, "paths": [[ROOT, "/a", "/b"]]}
+    })
+
+    diff = diff_snapshots(base, target)
+
+    assert diff["counts"]["pages_changed"] == 0
+    assert diff["edges_added"] == [{"source": "/a", "target": "/b"}]
+    assert diff["edges_removed"] == [{"source": ROOT, "target": "/b"}]
+
+def test_site_category_change():
+    base = _snapshot({ROOT: {"title": "Home"}}, category="blog")
+    target = _snapshot({ROOT: {"title": "Home"}}, category="ecommerce")
+
+    diff = diff_snapshots(base, target)
+
+    assert diff["site_category"] == {"from": "blog", "to": "ecommerce", "changed": True}
+    assert diff_snapshots(base, base)["site_category"]["changed"] is False
+
+def test_limit_truncates_lists_but_not_counts():
+    base = _snapshot({ROOT: {"title": "Home"}})
+    target = _snapshot({ROOT: {"title": "Home"}, **{f"/p{i}": {"title": str(i)} for i in range(5)}})
+
+    diff = diff_snapshots(base, target, limit=2)
+
+    assert diff["counts"]["pages_added"] == 5
+    assert len(diff["pages_added"]) == 2
@@ -0,0 +1,82 @@
+from app.core.graph_clustering import CLUSTER_PREFIX, SiteMap
+
+ROOT = "https://example.com/"
+
+def _site(paths, layout=None):
+    pages = {ROOT: {"path": "/", "depth": 0}}
+    for path in paths:
+        pages["https://example.com" + path] = {"path": path, "depth": path.count("/")}
+    return SiteMap(ROOT, pages, layout)
+
+def test_variable_segments_share_a_cluster():
+    site = _site([f"/products/{n}" for n in range(30)] + ["/about"])
+
+    assert site.page_count == 32
+    root = site.expand(CLUSTER_PREFIX + "/")
+    ids = [n["id"] for n in root["nodes"]]
+    assert ROOT in ids
+    assert "https://example.com/about" in ids
+    assert CLUSTER_PREFIX + "/products" in ids
+    # The site root anchors the expansion
+    assert root["anchor"] == ROOT
+    assert {"from": ROOT, "to": CLUSTER_PREFIX + "/products"} in root["edges"]
+
+    products = site.expand(CLUSTER_PREFIX + "/products")
+    assert len(products["nodes"]) == 1
+    assert products["nodes"][0]["id"] == CLUSTER_PREFIX + "/products/{id}"
+    assert products["nodes"][0]["count"] == 30
+
+def test_expand_pages_through_more_cluster():
+    site = _site([f"/blog/post-{n}" for n in range(12)])
+
+    first = site.expand(CLUSTER_PREFIX + "/blog", limit=5)
+    assert len(first["nodes"]) == 6
+    more = first["nodes"][-1]
+    assert more["id"] == CLUSTER_PREFIX + "/blog|5"
+    assert more["count"] == 7
+
+    seen = {n["id"] for n in first["nodes"][:-1]}
+    second = site.expand(more["id"], limit=5)
+    third = site.expand(second["nodes"][-1]["id"], limit=5)
+    seen |= {n["id"] for n in second["nodes"][:-1]}
+    seen |= {n["id"] for n in third["nodes"]}
+    assert len(seen) == 12
+    assert not any(n.get("cluster") for n in third["nodes"])
+
+def test_unknown_cluster_returns_none():
+    site = _site(["/a"])
+
+    assert site.expand(CLUSTER_PREFIX + "/missing") is None
+    assert site.expand("https://example.com/a") is None
+
+def test_initial_view_stays_within_budget():
+    paths = [f"/section-{s}/page-{p}" for s in range(10) for p in range(40)]
+    site = _site(paths)
+
+    view = site.initial_view(budget=60)
+    ids = {n["id"] for n in view["nodes"]}
+    assert len(view["nodes"]) <= 60
+    assert ROOT in ids
+    # Every edge connects visible nodes
+    for edge in view["edges"]:
+        assert edge["from"] in ids and edge["to"] in ids
+    # Collapsed clusters plus visible pages account for the whole site
+    total = sum(n["count"] if n.get("cluster") else 1 for n in view["nodes"])
+    assert total == site.page_count
+
+def test_initial_view_expands_small_sites_fully():
+    site = _site(["/a", "/a/b", "/c/d", "/c/e"])
+
+    view = site.initial_view(budget=200)
+    assert not any(n.get("cluster") for n in view["nodes"])
+    assert len(view["nodes"]) == 5
+
+def test_cluster_position_is_centroid_of_layout():
+    layout = {
+        "https://example.com/docs/x": [0.0, 10.0],
+        "https://example.com/docs/y": [20.0, 30.0]
+    }
+    site = _site(["/docs/x", "/docs/y", "/other"], layout)
+
+    docs = next(n for n in site.expand(CLUSTER_PREFIX + "/")["nodes"] if n["id"] == CLUSTER_PREFIX + "/docs")
+    assert (docs["x"], docs["y"]) == (10.0, 20.0)
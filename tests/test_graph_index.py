@@ -0,0 +1,35 @@
+from app.core.graph_index import GraphIndex
+
+def _index(pages):
+    return GraphIndex({"url": "/", "pages": pages})
+
+def test_shortest_path_prefers_fewest_hops():
+    index = _index({
+        "/": {"links": ["/a", "/shortcut"]},
+        "/a": {"parent": "/", "links": ["/b"]},
+        "/b": {"parent": "/a", "links": ["/target"]},
+        "/shortcut": {"parent": "/", "links": ["/target"]},
+        "/target": {"parent": "/b"}
+    })
+
+    assert index.shortest_path("/", "/target") == ["/", "/shortcut", "/target"]
+
+def test_shortest_path_follows_edge_direction():
+    index = _index({
+        "/": {"links": ["/a"]},
+        "/a": {"parent": "/"}
+    })
+
+    assert index.shortest_path("/", "/a") == ["/", "/a"]
+    assert index.shortest_path("/a", "/") is None
+
+def test_shortest_path_edge_cases():
+    index = _index({
+        "/": {"links": ["/outside"]},
+        "/island": {}
+    })
+
+    assert index.shortest_path("/", "/") == ["/"]
+    assert index.shortest_path("/", "/island") is None
+    # Links to pages that were not crawled are not edges
+    assert index.shortest_path("/", "/outside") is None
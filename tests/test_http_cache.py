@@ -0,0 +1,57 @@
+import gzip
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.utils.http_cache import bytes_response, file_response, gzip_etag, write_json_with_gzip
+
+BODY = b'{"pages": {}}'
+
+@pytest.fixture
+def client(tmp_path):
+    path = str(tmp_path / "structure.json")
+    write_json_with_gzip(path, {"pages": {}})
+    app = FastAPI()
+
+    @app.get("/file")
+    def serve_file(request: Request):
+        return file_response(request, path, "application/json")
+
+    @app.get("/bytes")
+    def serve_bytes(request: Request):
+        return bytes_response(request, BODY, '"abc"', "application/json", gzip_body=gzip.compress(BODY))
+
+    return TestClient(app)
+
+@pytest.mark.parametrize("route", ["/file", "/bytes"])
+def test_gzip_variant_has_its_own_etag(client, route):
+    plain = client.get(route, headers={"Accept-Encoding": "identity"})
+    compressed = client.get(route, headers={"Accept-Encoding": "gzip"})
+
+    assert plain.headers.get("content-encoding") is None
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == gzip_etag(plain.headers["etag"])
+    assert compressed.content == plain.content
+
+@pytest.mark.parametrize("route", ["/file", "/bytes"])
+def test_either_etag_revalidates(client, route):
+    etag = client.get(route, headers={"Accept-Encoding": "identity"}).headers["etag"]
+
+    for if_none_match in (etag, gzip_etag(etag), f"W/{etag}", f'"other", {gzip_etag(etag)}', "*"):
+        response = client.get(route, headers={"Accept-Encoding": "gzip", "If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.headers["etag"] == gzip_etag(etag)
+    assert client.get(route, headers={"If-None-Match": '"other"'}).status_code == 200
+
+@pytest.mark.parametrize("accept_encoding, compressed", [
+    ("gzip", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.0, identity", False),
+    ("br, *;q=0.5", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("identity", False)
+])
+def test_accept_encoding_q_values(client, accept_encoding, compressed):
+    response = client.get("/file", headers={"Accept-Encoding": accept_encoding})
+
+    assert (response.headers.get("content-encoding") == "gzip") == compressed
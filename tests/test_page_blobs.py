@@ -0,0 +1,59 @@
+import pytest
+from app.core.sqlite_storage import SQLiteStorage
+from app.core.storage import page_content_hash, split_page_record, join_page_record
+
+HOME = "https://example.com/"
+ABOUT = "https://example.com/about"
+
+def _exploration(about_parent=HOME, about_depth=1):
+    return {
+        "url": HOME,
+        "domain": "example.com",
+        "pages": {
+            HOME: {"title": "Home", "headers": ["Welcome"], "parent": None, "depth": 0, "links": [ABOUT]},
+            ABOUT: {"title": "About", "headers": [], "parent": about_parent, "depth": about_depth, "links": []}
+        }
+    }
+
+@pytest.fixture
+def storage():
+    storage = SQLiteStorage(":memory:")
+    yield storage
+    storage.close()
+
+def _blob_refs(storage):
+    return sorted(row["refs"] for row in storage.conn.execute("SELECT refs FROM page_blobs"))
+
+def test_split_and_join_round_trip():
+    page = _exploration()["pages"][HOME]
+    content, position = split_page_record(page)
+
+    assert "links" not in content and "parent" not in content
+    assert join_page_record(content, position) == page
+
+def test_hash_ignores_position_in_the_crawl():
+    page = _exploration()["pages"][ABOUT]
+    moved = dict(page, parent=None, depth=3, paths=[[HOME, ABOUT]])
+
+    assert page_content_hash(page) == page_content_hash(moved)
+    assert page_content_hash(page) != page_content_hash(dict(page, title="About us"))
+
+def test_same_content_is_stored_once(storage):
+    first = storage.save_exploration(HOME, _exploration())
+    # Same content reached through another path in the second crawl
+    second = storage.save_exploration(HOME, _exploration(about_parent=None, about_depth=3))
+
+    assert _blob_refs(storage) == [2, 2]
+    assert storage.get_page_hashes(first) == storage.get_page_hashes(second)
+    assert storage.get_page(first, ABOUT)["depth"] == 1
+    assert storage.get_page(second, ABOUT)["depth"] == 3
+    assert storage.get_pages(first) == _exploration()["pages"]
+
+def test_delete_releases_blob_refs(storage):
+    first = storage.save_exploration(HOME, _exploration())
+    second = storage.save_exploration(HOME, _exploration())
+
+    assert storage.delete_exploration(first)
+    assert _blob_refs(storage) == [1, 1]
+    assert storage.delete_exploration(second)
+    assert _blob_refs(storage) == []
@@ -0,0 +1,47 @@
+import pytest
+from app.core.sqlite_storage import SQLiteStorage
+from app.core.storage import InvalidCursorError
+
+HOME = "https://example.com/"
+
+@pytest.fixture
+def storage():
+    storage = SQLiteStorage(":memory:")
+    yield storage
+    storage.close()
+
+def _exploration():
+    return {"url": HOME, "domain": "example.com", "pages": {HOME: {"title": "Home", "headers": []}}}
+
+def _collect(fetch, limit):
+    seen = []
+    cursor = None
+    while True:
+        page = fetch(limit, cursor)
+        assert len(page["items"]) <= limit
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return seen
+
+def test_exploration_cursor_pages_through_everything(storage):
+    saved = [storage.save_exploration(HOME, _exploration()) for _ in range(5)]
+
+    seen = _collect(storage.list_explorations_page, 2)
+
+    # Most recent first, every exploration exactly once
+    assert [item["_id"] for item in seen] == list(reversed(saved))
+
+def test_test_case_cursor_keeps_ties_in_insertion_order(storage):
+    exploration_id = storage.save_exploration(HOME, _exploration())
+    # Saved in one write, so they all share created_at
+    storage.save_test_cases(exploration_id, [{"id": i, "title": f"Test {i}"} for i in range(7)])
+
+    seen = _collect(lambda limit, cursor: storage.list_test_cases_page(exploration_id, limit, cursor), 3)
+
+    assert [item["id"] for item in seen] == list(range(7))
+
+def test_invalid_cursor_is_rejected(storage):
+    storage.save_exploration(HOME, _exploration())
+    with pytest.raises(InvalidCursorError):
+        storage.list_explorations_page(limit=2, cursor="not-a-cursor")
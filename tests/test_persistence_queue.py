@@ -0,0 +1,94 @@
+import time
+import pytest
+from app.core import persistence_queue
+from app.core.persistence_queue import PersistenceQueue
+from app.core.sqlite_storage import SQLiteStorage
+
+STRUCTURE = {
+    "url": "https://example.com/",
+    "domain": "example.com",
+    "pages": {"https://example.com/": {"title": "Home", "headers": [], "depth": 0, "links": []}}
+}
+
+class FlakyStorage:
+    """SQLite storage whose first saves fail, optionally after the data was written"""
+
+    def __init__(self, failures, fail_after_write=False):
+        self.storage = SQLiteStorage(":memory:")
+        self.failures = failures
+        self.fail_after_write = fail_after_write
+        self.calls = []
+
+    def ping(self):
+        return True
+
+    def save_exploration(self, url, data, exploration_id=None):
+        self.calls.append(exploration_id)
+        if len(self.calls) <= self.failures:
+            if self.fail_after_write:
+                # Written, but the caller never hears back
+                self.storage.save_exploration(url, data, exploration_id)
+            raise ConnectionError("connection reset")
+        return self.storage.save_exploration(url, data, exploration_id)
+
+@pytest.fixture(autouse=True)
+def written_files(monkeypatch):
+    written = []
+    monkeypatch.setattr(persistence_queue, "save_structure",
+                        lambda exploration_id, structure: written.append(exploration_id))
+    return written
+
+def _run(storage, exploration_id, **config):
+    queue = PersistenceQueue({"retry_delay_seconds": 0, "max_attempts": 3, **config}, lambda: storage)
+    queue.start()
+    try:
+        queue.submit(exploration_id, STRUCTURE)
+        deadline = time.monotonic() + 5
+        while queue.status(exploration_id)["state"] in ("pending", "retrying"):
+            assert time.monotonic() < deadline, "persistence did not finish"
+            time.sleep(0.01)
+        return queue.status(exploration_id)
+    finally:
+        queue.stop(timeout=5)
+
+def test_failed_save_is_retried(written_files):
+    storage = FlakyStorage(failures=1)
+    status = _run(storage, "analysis1")
+
+    assert status["state"] == "durable"
+    assert status["attempts"] == 2
+    assert status["storage_id"] == "analysis1"
+    assert storage.calls == ["analysis1", "analysis1"]
+    # Files are written once, the retry only repeats the failed step
+    assert written_files == ["analysis1"]
+
+def test_retry_after_a_lost_acknowledgement_does_not_duplicate():
+    storage = FlakyStorage(failures=2, fail_after_write=True)
+    status = _run(storage, "analysis1")
+
+    assert status["state"] == "durable"
+    conn = storage.storage.conn
+    assert conn.execute("SELECT COUNT(*) FROM explorations").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0] == 1
+    assert [row["refs"] for row in conn.execute("SELECT refs FROM page_blobs")] == [1]
+
+def test_gives_up_after_max_attempts():
+    storage = FlakyStorage(failures=10)
+    status = _run(storage, "analysis1", max_attempts=3)
+
+    assert status["state"] == "failed"
+    assert status["storage"] == "failed"
+    assert status["files"] == "done"
+    assert status["attempts"] == 3
+    assert "connection reset" in status["error"]
+
+def test_saving_again_under_the_same_id_replaces_the_save():
+    storage = SQLiteStorage(":memory:")
+    storage.save_exploration(STRUCTURE["url"], STRUCTURE, "analysis1")
+    storage.save_test_cases("analysis1", [{"id": 1, "title": "Open the home page"}])
+    assert storage.save_exploration(STRUCTURE["url"], STRUCTURE, "analysis1") == "analysis1"
+
+    assert storage.conn.execute("SELECT COUNT(*) FROM explorations").fetchone()[0] == 1
+    assert [row["refs"] for row in storage.conn.execute("SELECT refs FROM page_blobs")] == [1]
+    assert storage.get_exploration("analysis1")["summary"]["has_test_cases"]
+    assert len(storage.get_test_cases("analysis1")) == 1
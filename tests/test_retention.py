@@ -0,0 +1,61 @@
+import os
+import time
+import pytest
+from app.core import explorations
+from app.core.retention import evict_directory, evict_explorations
+
+DAY = 24 * 60 * 60
+
+def _write(path, size, age):
+    with open(path, "wb") as file:
+        file.write(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def explorations_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(explorations, "EXPLORATIONS_DIR", str(tmp_path))
+    return tmp_path
+
+def _exploration(root, exploration_id, size, age):
+    path = root / exploration_id
+    path.mkdir()
+    _write(path / "website_structure.json", size, age)
+
+def test_evict_directory_by_age(tmp_path):
+    _write(tmp_path / "old.py", 10, 10 * DAY)
+    _write(tmp_path / "new.py", 10, 0)
+    _write(tmp_path / ".keep", 10, 10 * DAY)
+
+    report = evict_directory(str(tmp_path), max_age_seconds=7 * DAY)
+
+    assert report == {"files": 1, "bytes": 10, "kept_bytes": 10}
+    assert sorted(os.listdir(tmp_path)) == [".keep", "new.py"]
+
+def test_evict_directory_by_size_removes_oldest_first(tmp_path):
+    for n, age in enumerate([3, 2, 1]):
+        _write(tmp_path / f"{n}.py", 100, age * DAY)
+
+    report = evict_directory(str(tmp_path), max_bytes=150)
+
+    assert report == {"files": 2, "bytes": 200, "kept_bytes": 100}
+    assert os.listdir(tmp_path) == ["2.py"]
+
+def test_evict_directory_missing_path(tmp_path):
+    assert evict_directory(str(tmp_path / "missing"), max_bytes=0)["files"] == 0
+
+def test_evict_explorations_deletes_whole_directories(explorations_dir):
+    _exploration(explorations_dir, "a" * 32, 100, 40 * DAY)
+    _exploration(explorations_dir, "b" * 32, 100, 2 * DAY)
+    _exploration(explorations_dir, "c" * 32, 100, 1 * DAY)
+
+    report = evict_explorations(max_bytes=150, max_age_seconds=30 * DAY)
+
+    assert report == {"explorations": 2, "bytes": 200, "kept_bytes": 100}
+    assert os.listdir(explorations_dir) == ["c" * 32]
+
+def test_evict_explorations_within_limits(explorations_dir):
+    _exploration(explorations_dir, "a" * 32, 100, 1 * DAY)
+
+    assert evict_explorations(max_bytes=1000, max_age_seconds=30 * DAY)["explorations"] == 0
+    assert os.listdir(explorations_dir) == ["a" * 32]
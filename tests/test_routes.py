@@ -0,0 +1,186 @@
+import asyncio
+import base64
+from urllib.parse import quote
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import routes
+from app.core import explorations
+from app.core.crawl_events import crawl_events
+from app.core.search_index import SearchIndex
+
+class FakeQueue:
+    """Stands in for the persistence queue, recording what was submitted"""
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.submitted = {}
+        self.files_wait = 0
+
+    def submit(self, exploration_id, structure):
+        self.calls.append(("submit", exploration_id))
+        self.submitted[exploration_id] = structure
+        return {"exploration_id": exploration_id, "state": "pending"}
+
+    def status(self, exploration_id):
+        return {"state": "pending"} if exploration_id in self.submitted else None
+
+    def files_pending(self, exploration_id):
+        return False
+
+class FakeAnalyzer:
+    """Emits the events of a one-page crawl, or fails if the URL asks for it"""
+
+    def __init__(self, url, event_callback=None, exploration_id=None, persist_structure=True):
+        self.url = url
+        self.emit = event_callback
+        self.exploration_id = exploration_id
+        self.structure = {"url": url, "pages": {url: {"title": "Home"}}}
+
+    def analyze(self):
+        self.emit({"type": "node", "url": self.url, "parent": None, "depth": 0})
+        if "fail" in self.url:
+            self.emit({"type": "done", "status": "failed", "error": "crawl failed"})
+            raise RuntimeError("crawl failed")
+        self.emit({"type": "done", "status": "completed", "node_count": 1})
+        return {"exploration_id": self.exploration_id, "url": self.url}
+
+@pytest.fixture
+def calls():
+    return []
+
+@pytest.fixture
+def client(monkeypatch, calls):
+    queue = FakeQueue(calls)
+    monkeypatch.setattr(routes, "get_persistence_queue", lambda: queue)
+    monkeypatch.setattr(routes, "WebAnalyzer", FakeAnalyzer)
+    close = crawl_events.close
+    def recording_close(stream_id, event):
+        calls.append(("close", stream_id, event["status"]))
+        close(stream_id, event)
+    monkeypatch.setattr(crawl_events, "close", recording_close)
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    return TestClient(app)
+
+def _events(client, exploration_id):
+    response = client.get(f"/api/crawl-events/{exploration_id}")
+    return [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+
+def test_done_event_is_sent_after_the_result_is_queued(client, calls):
+    response = client.post("/api/analyze", json={"url": "https://example.com/"})
+    exploration_id = response.json()["exploration_id"]
+
+    assert response.status_code == 200
+    assert calls == [("submit", exploration_id), ("close", exploration_id, "completed")]
+    assert _events(client, exploration_id) == ["node", "done"]
+
+def test_failed_analysis_still_ends_the_stream(client, calls):
+    response = client.post("/api/analyze", json={"url": "https://example.com/fail"})
+
+    assert response.status_code == 500
+    assert [call[0] for call in calls] == ["close"]
+    assert calls[0][2] == "failed"
+
+def test_search_pagination(client, monkeypatch):
+    index = SearchIndex(":memory:")
+    index.index_pages("e1", {f"https://example.com/{n}": {"title": f"Page {n}", "text_content": "shared"}
+                             for n in range(3)})
+    monkeypatch.setattr(routes, "get_search_index", lambda: index)
+
+    first = client.get("/api/search", params={"q": "shared", "limit": 2}).json()
+    second = client.get("/api/search", params={"q": "shared", "limit": 2, "cursor": first["next_cursor"]}).json()
+    assert len(first["results"]) == 2
+    assert len(second["results"]) == 1 and second["next_cursor"] is None
+
+    assert client.get("/api/search", params={"q": "shared", "cursor": "bogus"}).status_code == 400
+    assert client.get("/api/search", params={"q": "shared", "kind": "image"}).status_code == 400
+    index.close()
+
+@pytest.fixture
+def explorations_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(explorations, "EXPLORATIONS_DIR", str(tmp_path))
+    return tmp_path
+
+def _site(paths, url="https://example.com/"):
+    return {"url": url, "pages": {url + path: {"title": path, "parent": url} for path in paths}}
+
+def test_diff_limit_keeps_full_counts(client, explorations_dir):
+    explorations.save_structure("a" * 32, _site(["one"]))
+    explorations.save_structure("b" * 32, _site(["one", "two", "three", "four"]))
+
+    diff = client.get("/api/diff", params={"base": "a" * 32, "target": "b" * 32, "limit": 2}).json()
+    assert diff["counts"]["pages_added"] == 3
+    assert len(diff["pages_added"]) == 2
+    full = client.get("/api/diff", params={"base": "a" * 32, "target": "b" * 32, "limit": 0}).json()
+    assert len(full["pages_added"]) == 3
+
+def test_diff_errors(client, explorations_dir):
+    explorations.save_structure("a" * 32, _site(["one"]))
+    explorations.save_structure("c" * 32, _site(["one"], url="https://other.example/"))
+
+    assert client.get("/api/diff", params={"base": "a" * 32, "target": "c" * 32}).status_code == 400
+    assert client.get("/api/diff", params={"base": "a" * 32, "target": "d" * 32}).status_code == 404
+    assert client.get("/api/diff", params={"base": "a" * 32, "target": "../x"}).status_code == 400
+    assert client.get("/api/diff", params={"base": "a" * 32, "target": "a" * 32, "limit": -1}).status_code == 422
+
+class FakeAsyncStorage:
+    """Answers existence checks for the explorations saved in the database"""
+
+    def __init__(self, saved):
+        self.saved = saved
+        self.lookups = []
+
+    async def get_exploration(self, exploration_id, include_pages=True, include_graph=True):
+        self.lookups.append(exploration_id)
+        return {"_id": exploration_id} if exploration_id in self.saved else None
+
+def test_analyze_rejects_taken_exploration_ids(client, calls, explorations_dir, monkeypatch):
+    monkeypatch.setattr(routes, "get_async_storage", lambda: FakeAsyncStorage({"saved-run"}))
+    explorations.save_structure("a" * 32, _site(["one"]))
+    client.post("/api/analyze", json={"url": "https://example.com/", "exploration_id": "queued-run"})
+    monkeypatch.setattr(routes, "_active_analyses", {"running-run"})
+
+    def analyze(exploration_id):
+        return client.post("/api/analyze", json={"url": "https://example.com/", "exploration_id": exploration_id})
+
+    # Saved files, a queued result, a database copy and a running analysis all take an ID
+    for exploration_id in ("a" * 32, "queued-run", "saved-run", "running-run"):
+        assert analyze(exploration_id).status_code == 409
+    assert analyze("../escape").status_code == 400
+    assert analyze("new-run").status_code == 200
+    assert [call[1] for call in calls if call[0] == "submit"] == ["queued-run", "new-run"]
+
+def test_page_info_of_one_node(client, explorations_dir):
+    structure = _site(["", "café?page=2"])
+    explorations.save_structure("a" * 32, structure)
+    # Encoded the way index.html does: btoa(encodeURIComponent(url))
+    url = "https://example.com/café?page=2"
+    encoded = base64.b64encode(quote(url, safe="-_.!~*'()").encode("ascii")).decode("ascii")
+
+    response = client.get(f"/api/page-info/{encoded}", params={"exploration_id": "a" * 32})
+    assert response.status_code == 200
+    assert response.json()["info"]["title"] == "café?page=2"
+    missing = base64.b64encode(b"https%3A%2F%2Fexample.com%2Fmissing").decode("ascii")
+    assert client.get(f"/api/page-info/{missing}", params={"exploration_id": "a" * 32}).status_code == 404
+
+class SlowAsyncStorage(FakeAsyncStorage):
+    async def get_exploration(self, exploration_id, include_pages=True, include_graph=True):
+        self.lookups.append(exploration_id)
+        await asyncio.sleep(5)
+
+def test_exists_check_asks_the_database_only_when_needed(client, explorations_dir, monkeypatch):
+    storage = SlowAsyncStorage(set())
+    monkeypatch.setattr(routes, "get_async_storage", lambda: storage)
+    monkeypatch.setattr(routes, "EXISTS_CHECK_TIMEOUT", 0.05)
+
+    def analyze(exploration_id):
+        return client.post("/api/analyze", json={"url": "https://example.com/", "exploration_id": exploration_id})
+
+    # IDs in the generated format are decided by the files and the queue alone
+    assert analyze("e" * 32).status_code == 200
+    assert storage.lookups == []
+    # Other IDs are looked up once, and a slow database does not hold up the crawl
+    assert analyze("named-run").status_code == 200
+    assert storage.lookups == ["named-run"]
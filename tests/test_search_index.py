@@ -0,0 +1,64 @@
+import pytest
+from app.core.search_index import SearchIndex, match_expression
+from app.core.storage import InvalidCursorError
+
+PAGE = {"title": "Checkout", "headers": ["Payment options"], "text_content": "Pay with a crédit card"}
+
+@pytest.fixture
+def index():
+    search_index = SearchIndex(":memory:")
+    yield search_index
+    search_index.close()
+
+def _refs(result):
+    return [(item["kind"], item["exploration_id"], item["ref"]) for item in result["items"]]
+
+def test_match_expression_quotes_words():
+    assert match_expression('pay OR "card"*') == '"pay" "OR" "card"'
+    assert match_expression("  -- ") is None
+
+def test_search_pages_test_cases_and_code(index):
+    index.index_pages("e1", {"https://example.com/checkout": PAGE})
+    index.index_test_cases("e1", [{"id": 1, "title": "Pay by card", "steps": ["Open checkout"]}])
+    index.index_code("e1", 1, "page.click('#pay-card')")
+
+    # Every word must match, accents and case are ignored
+    assert _refs(index.search("credit CARD")) == [("page", "e1", "https://example.com/checkout")]
+    assert {kind for kind, _, _ in _refs(index.search("card"))} == {"page", "test_case", "code"}
+    assert _refs(index.search("card", kind="test_case")) == [("test_case", "e1", "1")]
+    assert index.search("missing")["items"] == []
+
+def test_shared_pages_survive_removal_of_one_exploration(index):
+    index.index_pages("e1", {"https://example.com/checkout": PAGE})
+    index.index_pages("e2", {"https://example.com/checkout": PAGE})
+
+    assert len(index.search("payment")["items"]) == 2
+    index.remove_exploration("e1")
+    assert _refs(index.search("payment")) == [("page", "e2", "https://example.com/checkout")]
+    index.remove_exploration("e2")
+    assert index.search("payment")["items"] == []
+    assert index.conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()[0] == 0
+
+def test_code_is_replaced_by_newer_version(index):
+    index.index_code("e1", 3, "old_selector()")
+    index.index_code("e1", 3, "new_selector()")
+
+    assert index.search("old_selector")["items"] == []
+    assert _refs(index.search("new_selector")) == [("code", "e1", "3")]
+
+def test_cursor_pagination(index):
+    index.index_pages("e1", {f"https://example.com/{n}": {"title": f"Page {n}", "text_content": "shared"}
+                             for n in range(5)})
+
+    seen = []
+    cursor = None
+    while True:
+        result = index.search("shared", limit=2, cursor=cursor)
+        seen.extend(item["ref"] for item in result["items"])
+        cursor = result["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(f"https://example.com/{n}" for n in range(5))
+
+    with pytest.raises(InvalidCursorError):
+        index.search("shared", cursor="not-a-cursor")
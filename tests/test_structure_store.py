@@ -0,0 +1,61 @@
+import os
+import pytest
+from app.core.structure_store import StructureReader, StructureWriter, read_structure, write_structure
+
+STRUCTURE = {
+    "url": "https://example.com/",
+    "domain": "example.com",
+    "category": "blog",
+    "layout": {"https://example.com/": [0.0, 0.0]},
+    "pages": {
+        "https://example.com/": {"title": "Home", "depth": 0, "links": ["https://example.com/a"]},
+        "https://example.com/a": {"title": "A", "depth": 1, "parent": "https://example.com/", "text": "ü" * 100}
+    }
+}
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "structure.wst")
+    write_structure(path, STRUCTURE)
+
+    assert read_structure(path) == STRUCTURE
+    assert not os.path.exists(path + ".tmp")
+
+def test_reader_random_access(tmp_path):
+    path = str(tmp_path / "structure.wst")
+    write_structure(path, STRUCTURE)
+
+    with StructureReader(path) as reader:
+        assert len(reader) == 2
+        assert reader.urls == list(STRUCTURE["pages"])
+        assert "https://example.com/a" in reader
+        assert reader.get_page("https://example.com/a") == STRUCTURE["pages"]["https://example.com/a"]
+        assert reader.get_page("https://example.com/missing") is None
+        assert reader.meta["category"] == "blog"
+        assert "pages" not in reader.meta
+        assert dict(reader.iter_pages()) == STRUCTURE["pages"]
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = str(tmp_path / "structure.wst")
+    write_structure(path, STRUCTURE)
+
+    with pytest.raises(RuntimeError):
+        with StructureWriter(path) as writer:
+            writer.write_page("https://example.com/new", {})
+            raise RuntimeError("crawl failed")
+
+    assert read_structure(path) == STRUCTURE
+    assert not os.path.exists(path + ".tmp")
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "structure.json"
+    path.write_text('{"pages": {}}')
+
+    with pytest.raises(ValueError):
+        StructureReader(str(path))
+
+    # A write that never reached close() has no footer
+    truncated = tmp_path / "truncated.wst"
+    write_structure(str(truncated), STRUCTURE)
+    truncated.write_bytes(truncated.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        StructureReader(str(truncated))